@@ -1,16 +1,31 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from src.core.security import verify_token
 from src.services.auth import get_user_by_email
+from src.services.admin import AdminService
+from src.services.container import ServiceContainer
+from src.services.search import SearchService
 from src.schemas.user import User
 from src.db.vector_store import VectorStore
 import logging
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_vector_store() -> VectorStore:
-    """Get vector store instance"""
-    return VectorStore()
+def get_services(request: Request) -> ServiceContainer:
+    """Get the application-scoped services created at startup"""
+    return request.app.state.services
+
+def get_vector_store(services: ServiceContainer = Depends(get_services)) -> VectorStore:
+    """Get the shared vector store instance"""
+    return services.vector_store
+
+def get_search_service(services: ServiceContainer = Depends(get_services)) -> SearchService:
+    """Get the shared search service"""
+    return services.search_service
+
+def get_admin_service(services: ServiceContainer = Depends(get_services)) -> AdminService:
+    """Get the shared admin service"""
+    return services.admin_service
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Get current user from token"""
@@ -1,21 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional
+from datetime import datetime
 from src.schemas.ticket import Ticket
 from src.services.admin import AdminService
-from src.api.dependencies import get_current_admin_user, get_vector_store, get_current_user
+from src.services.search import SearchService
+from src.api.dependencies import get_current_admin_user, get_vector_store, get_current_user, get_admin_service
 from src.schemas.user import User
 from src.db.vector_store import VectorStore
+import itertools
+import json
 import logging
 
 router = APIRouter()
 
 @router.get("/stats", response_model=Dict)
 def get_stats(
-    current_admin: User = Depends(get_current_admin_user)
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
 ) -> Dict:
     """Get system statistics"""
     try:
-        admin_service = AdminService()
         stats = admin_service.get_stats()
         return stats
     except Exception as e:
@@ -26,14 +31,20 @@ def get_stats(
         )
 
 @router.post("/clear-embeddings", response_model=Dict[str, bool])
-def clear_embeddings(
+async def clear_embeddings(
     current_admin: User = Depends(get_current_admin_user),
-    vector_store: VectorStore = Depends(get_vector_store)
+    admin_service: AdminService = Depends(get_admin_service)
 ) -> Dict[str, bool]:
-    """Clear all embeddings from the vector store"""
+    """Clear all embeddings by swapping in an empty collection version"""
     try:
-        success = vector_store.clear_all_data()
-        return {"success": success}
+        status = await admin_service.clear_data()
+        return {"success": status["state"] == "completed"}
+    except ValueError as e:
+        # A reindex is running
+        raise HTTPException(
+            status_code=409,
+            detail=str(e)
+        )
     except Exception as e:
         logging.error(f"Error clearing embeddings: {str(e)}")
         raise HTTPException(
@@ -42,14 +53,14 @@ def clear_embeddings(
         )
 
 @router.post("/upload", response_model=Dict)
-def upload_file(
+async def upload_file(
     file: UploadFile = File(...),
-    current_admin: User = Depends(get_current_admin_user)
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
 ) -> Dict:
     """Upload and process a file"""
     try:
-        admin_service = AdminService()
-        result = admin_service.process_file(file)
+        result = await admin_service.process_file(file)
         return result
     except Exception as e:
         logging.error(f"Error processing file: {str(e)}")
@@ -58,36 +69,173 @@ def upload_file(
             detail=f"Error processing file: {str(e)}"
         )
 
+@router.post("/reindex", response_model=Dict)
+async def start_reindex(
+    file: Optional[UploadFile] = File(None),
+    empty: bool = False,
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
+) -> Dict:
+    """Rebuild the vector store into a new collection version without interrupting searches"""
+    if file is not None and empty:
+        raise HTTPException(status_code=400, detail="An empty reindex does not take a file")
+    if file is not None and not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    try:
+        return await admin_service.start_reindex(file, empty=empty)
+    except ValueError as e:
+        # A reindex is already running
+        raise HTTPException(
+            status_code=409,
+            detail=str(e)
+        )
+    except Exception as e:
+        logging.error(f"Error starting reindex: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error starting reindex: {str(e)}"
+        )
+
+@router.get("/reindex", response_model=Dict)
+def get_reindex_status(
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
+) -> Dict:
+    """Progress of the last reindex"""
+    try:
+        return admin_service.get_reindex_status()
+    except Exception as e:
+        logging.error(f"Error getting reindex status: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting reindex status: {str(e)}"
+        )
+
+@router.get("/snapshots", response_model=List[Dict])
+def list_snapshots(
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
+) -> List[Dict]:
+    """List vector store snapshots"""
+    try:
+        return admin_service.list_snapshots()
+    except Exception as e:
+        logging.error(f"Error listing snapshots: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error listing snapshots: {str(e)}"
+        )
+
+@router.post("/snapshots", response_model=Dict)
+async def create_snapshot(
+    name: Optional[str] = None,
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
+) -> Dict:
+    """Export the vector store to a binary snapshot"""
+    try:
+        return await admin_service.create_snapshot(name)
+    except Exception as e:
+        logging.error(f"Error creating snapshot: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error creating snapshot: {str(e)}"
+        )
+
+@router.post("/snapshots/{name}/restore", response_model=Dict)
+async def restore_snapshot(
+    name: str,
+    replace: bool = False,
+    current_admin: User = Depends(get_current_admin_user),
+    admin_service: AdminService = Depends(get_admin_service)
+) -> Dict:
+    """Restore the vector store from a snapshot, without re-embedding"""
+    try:
+        return await admin_service.restore_snapshot(name, replace=replace)
+    except Exception as e:
+        logging.error(f"Error restoring snapshot: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error restoring snapshot: {str(e)}"
+        )
+
+@router.get("/vector-store/records")
+def list_vector_store_records(
+    limit: int = Query(100, ge=0, description="Records to return; 0 streams every matching record"),
+    offset: int = Query(0, ge=0),
+    fields: str = Query("document,metadata", description="Comma-separated: document, metadata, embedding"),
+    issue_type: Optional[str] = None,
+    affected_system: Optional[str] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+    current_admin: User = Depends(get_current_admin_user),
+    vector_store: VectorStore = Depends(get_vector_store)
+):
+    """Stream stored records as NDJSON, one record per line, filtered and paged in the vector store"""
+    try:
+        filter_criteria = SearchService.build_filter_criteria(
+            issue_type, affected_system, status,
+            created_after, created_before, updated_after, updated_before
+        )
+        records = vector_store.iter_records(
+            filter_criteria,
+            fields=[field.strip() for field in fields.split(",") if field.strip()],
+            offset=offset,
+            limit=limit or None
+        )
+        # Read the first page here, so errors are reported before the response starts
+        first = next(records, None)
+    except ValueError as e:
+        # Unknown fields
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except Exception as e:
+        logging.error(f"Error reading vector store records: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reading vector store records: {str(e)}"
+        )
+
+    def stream():
+        if first is None:
+            return
+        for record in itertools.chain([first], records):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.get("/debug/vector-store")
-async def get_vector_store_debug(
+def get_vector_store_debug(
+    current_admin: User = Depends(get_current_admin_user),
     vector_store: VectorStore = Depends(get_vector_store)
 ):
     """Get debug information about the vector store"""
     try:
-        admin_service = AdminService()
         store_stats = vector_store.get_stats()
         
-        # Get collection info
-        collection_data = vector_store.collection.get()
+        # Collection size and two samples, without reading the rest of the collection
+        samples = list(vector_store.iter_records(limit=2))
         
         debug_info = {
             "stats": store_stats,
             "collection_info": {
-                "total_items": len(collection_data["ids"]) if collection_data["ids"] else 0,
-                "sample_items": []
+                "total_items": vector_store.collection.count(),
+                "sample_items": [
+                    {
+                        "id": record["id"],
+                        "metadata": record["metadata"],
+                        "document_preview": record["document"][:200] + "..."
+                    }
+                    for record in samples
+                ]
             }
         }
         
-        # Add sample items
-        if collection_data["ids"] and len(collection_data["ids"]) > 0:
-            for i in range(min(2, len(collection_data["ids"]))):
-                sample_item = {
-                    "id": collection_data["ids"][i],
-                    "metadata": collection_data["metadatas"][i],
-                    "document_preview": collection_data["documents"][i][:200] + "..."
-                }
-                debug_info["collection_info"]["sample_items"].append(sample_item)
-        
         return debug_info
     except Exception as e:
         logging.error(f"Error getting vector store debug info: {e}", exc_info=True)
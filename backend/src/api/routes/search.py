@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
-from src.schemas.ticket import TicketSearch, Ticket
+import json
+from src.core.config import settings
+from src.schemas.ticket import BatchTicketSearch, TicketSearch, Ticket
 from src.services.search import SearchService
-from src.api.dependencies import get_current_user
+from src.api.dependencies import get_current_user, get_search_service
 
 router = APIRouter()
 
@@ -10,7 +13,7 @@ router = APIRouter()
 async def search_tickets(
     query: TicketSearch,
     current_user = Depends(get_current_user),
-    search_service: SearchService = Depends()
+    search_service: SearchService = Depends(get_search_service)
 ):
     """
     Search for similar tickets based on description and optional filters
@@ -20,7 +23,12 @@ async def search_tickets(
             description=query.description,
             issue_type=query.issue_type,
             affected_system=query.affected_system,
-            limit=query.num_results
+            limit=query.num_results,
+            status=query.status,
+            created_after=query.created_after,
+            created_before=query.created_before,
+            updated_after=query.updated_after,
+            updated_before=query.updated_before
         )
         return results
     except Exception as e:
@@ -28,3 +36,34 @@ async def search_tickets(
             status_code=500,
             detail=f"Error performing search: {str(e)}"
         )
+
+@router.post("/batch")
+async def search_tickets_batch(
+    batch: BatchTicketSearch,
+    current_user = Depends(get_current_user),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """
+    Search for many descriptions at once. Results are streamed as NDJSON, one
+    {"index": ..., "results": [...]} line per query in completion order;
+    queries with generate_answer come last, as their AI answers finish.
+    """
+    if len(batch.queries) > settings.SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many queries: {len(batch.queries)} (maximum {settings.SEARCH_BATCH_MAX_QUERIES})"
+        )
+    try:
+        results = await search_service.search_similar_tickets_batch(batch.queries)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error performing batch search: {str(e)}"
+        )
+
+    async def stream():
+        async for index, tickets in search_service.answer_batch(batch.queries, results):
+            line = {"index": index, "results": [ticket.model_dump(mode="json") for ticket in tickets]}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -17,14 +17,75 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
-    # Azure OpenAI
-    AZURE_OPENAI_API_KEY: str
-    AZURE_OPENAI_ENDPOINT: str
-    AZURE_OPENAI_API_VERSION: str
+    # LLM provider: "azure" or "offline" (deterministic local stand-in for load tests)
+    LLM_PROVIDER: str = "azure"
+    OFFLINE_PROVIDER_LATENCY_MS: float = 0.0  # Simulated latency per offline API call
+    OFFLINE_PROVIDER_ERROR_RATE: float = 0.0  # Fraction of offline API calls failing with 429/500
+    
+    # Azure OpenAI (required when LLM_PROVIDER=azure)
+    AZURE_OPENAI_API_KEY: str = ""
+    AZURE_OPENAI_ENDPOINT: str = ""
+    AZURE_OPENAI_API_VERSION: str = ""
+    EMBEDDING_DIMENSION: int = 1536  # text-embedding-ada-002
+    EMBEDDING_BASE64_ENCODING: bool = True  # Request base64 payloads instead of JSON float arrays
+    EMBEDDING_MAX_IN_FLIGHT: int = 4  # Concurrent embedding requests per service
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8191  # Context length of text-embedding-ada-002
+    EMBEDDING_MAX_BATCH_TOKENS: int = 60000  # Total tokens per embeddings request
+    EMBEDDING_MAX_BATCH_ITEMS: int = 256  # Inputs per embeddings request
+    EMBEDDING_OVERFLOW_STRATEGY: str = "split"  # "split" or "truncate" inputs over the context length
+    QUERY_BATCH_WINDOW_MS: float = 5.0  # Collect concurrent search queries for this long (0 disables)
+    QUERY_BATCH_MAX_SIZE: int = 32  # Send early once this many queries are waiting
+    QUERY_CACHE_MAX_ENTRIES: int = 2048  # In-memory query embeddings kept for repeated searches
+    QUERY_CACHE_TTL_SECONDS: float = 900.0
+    SEARCH_BATCH_MAX_QUERIES: int = 500  # Descriptions accepted by one /search/batch request
+    
+    # Azure OpenAI quotas (per deployment) and retry policy
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 720
+    EMBEDDING_TOKENS_PER_MINUTE: int = 120000
+    CHAT_REQUESTS_PER_MINUTE: int = 60
+    CHAT_TOKENS_PER_MINUTE: int = 10000
+    OPENAI_MAX_RETRIES: int = 6
+    OPENAI_RETRY_BASE_DELAY: float = 1.0  # Seconds, doubled on every retry
+    OPENAI_RETRY_MAX_DELAY: float = 60.0
+    
+    # Shared HTTP transport for all Azure OpenAI clients
+    OPENAI_HTTP2: bool = True  # Multiplex requests over one connection (needs the h2 package)
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_EXPIRY: float = 120.0  # Seconds an idle connection stays open
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 60.0
+    OPENAI_WARMUP_CONNECTIONS: int = 2  # Connections opened at startup (one over HTTP/2)
+    WARMUP_QUERY: str = "warm up"  # Embedded and searched at startup to prime the query path (empty = skip the embedding call)
     
     # Database
     CHROMA_PERSIST_DIRECTORY: str = "c:/Code/Work/AgentSupport/backend/data/chroma"
     SQLITE_DATABASE_URL: str = "sqlite:///c:/Code/Work/AgentSupport/backend/data/app.db"
+    CHROMA_SERVER_URL: str = ""  # Shared Chroma server, e.g. http://localhost:8001, so several workers can use one store (empty = in-process client)
+    CHROMA_SERVER_POOL_SIZE: int = 32  # HTTP connections kept to the Chroma server per worker
+    CHROMA_SERVER_CONNECT_TIMEOUT: float = 30.0  # Seconds to wait for the Chroma server at startup
+    CHROMA_SERVER_SYNC_SECONDS: float = 2.0  # Interval at which workers pick up changes made by other workers
+    VECTOR_STORE_BACKEND: str = "chroma"  # Search engine: "chroma" (HNSW) or "numpy" (exact, in-process)
+    VECTOR_STORE_STATS_FLUSH_SECONDS: float = 30.0  # Interval at which changed stats and search indexes are written to disk (0 = on every write)
+    VECTOR_STORE_BULK_BATCH_SIZE: int = 5000  # Records per Chroma write in bulk-load mode, capped at Chroma's maximum (0 = maximum)
+    VECTOR_STORE_PARTITION_BY_SYSTEM: bool = False  # One collection per affected system; existing data is moved on startup
+    VECTOR_STORE_PARTITION_QUERY_THREADS: int = 8  # Partitions searched in parallel by unfiltered queries
+    VECTOR_STORE_RETIRE_GRACE_SECONDS: float = 60.0  # Time a replaced collection version stays readable by in-flight searches before it is dropped
+    VECTOR_STORE_INSPECT_PAGE_SIZE: int = 500  # Records read per collection page by the /admin/vector-store/records endpoint
+    LEXICAL_INDEX_ENABLED: bool = True  # Inverted index over ticket keys, titles and resolutions; identifier queries skip the embedding call
+    LEXICAL_MAX_CANDIDATES: int = 1000  # Lexical hits considered per query before filters and fusion
+    LEXICAL_RRF_K: int = 60  # Reciprocal rank fusion constant for queries mixing identifiers and text
+    SNAPSHOT_DIRECTORY: str = "c:/Code/Work/AgentSupport/backend/data/snapshots"  # Vector store snapshots (embeddings.npy + columns)
+    
+    # HNSW index; construction_ef and M apply when the collection is created, search_ef at startup
+    HNSW_CONSTRUCTION_EF: int = 100  # Candidate list size while building, higher = better graph, slower inserts
+    HNSW_M: int = 16  # Links per node, higher = better recall, more memory
+    HNSW_SEARCH_EF: int = 10  # Candidate list size while querying, higher = better recall, slower queries
+    
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "c:/Code/Work/AgentSupport/backend/data/embedding_cache.db"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 300000  # ~1.8GB of ada-002 vectors
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,216 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+STOPWORDS = {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or", "the", "to", "was", "with"}
+# Token weight per indexed metadata field; a hit on the ticket key counts most
+FIELD_WEIGHTS = (("Issue key", 3), ("Summary", 2), ("Resolution", 1))
+
+def tokenize(text) -> List[str]:
+    """Lowercased words and identifiers; keys like SUP-12 or v1.2 stay one token"""
+    return [token for token in TOKEN_PATTERN.findall(str(text or "").lower()) if token not in STOPWORDS]
+
+def is_identifier(token: str) -> bool:
+    """Ticket keys, error codes, SKUs: tokens of 3+ characters with a digit"""
+    return len(token) >= 3 and any(char.isdigit() for char in token)
+
+def classify_query(query: str) -> str:
+    """
+    "identifier" when every token is an identifier, "mixed" when some are,
+    "text" otherwise
+    """
+    tokens = tokenize(query)
+    identifiers = sum(1 for token in tokens if is_identifier(token))
+    if not identifiers:
+        return "text"
+    return "identifier" if identifiers == len(tokens) else "mixed"
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Dict]], limit: int, k: int = 60) -> List[Dict]:
+    """Merge result lists by summing 1 / (k + rank) per ticket ID"""
+    scores: Dict[str, float] = {}
+    tickets: Dict[str, Dict] = {}
+    for ranking in rankings:
+        for rank, ticket in enumerate(ranking, start=1):
+            scores[ticket["id"]] = scores.get(ticket["id"], 0.0) + 1.0 / (k + rank)
+            tickets.setdefault(ticket["id"], ticket)
+    ranked = sorted(scores, key=lambda record_id: scores[record_id], reverse=True)
+    return [tickets[record_id] for record_id in ranked[:limit]]
+
+class LexicalIndex:
+    """
+    Inverted index over ticket keys, titles and resolution text, for queries
+    that are identifiers rather than descriptions. Like the numpy search index
+    it mirrors Chroma: it is updated on every write, synced from the
+    collection on startup and persisted as one JSON file.
+    """
+    FORMAT = 2
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._dirty = False
+        # Record ID -> (content hash, token -> weight)
+        self._records: Dict[str, Tuple[str, Dict[str, int]]] = {}
+        # Token -> record ID -> weight
+        self._postings: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def count(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def _weights(metadata: Dict) -> Dict[str, int]:
+        weights: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(metadata.get(field)):
+                weights[token] = weights.get(token, 0) + weight
+        return weights
+
+    def _add(self, record_id: str, content_hash: str, weights: Dict[str, int]):
+        self._remove(record_id)
+        self._records[record_id] = (content_hash, weights)
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[record_id] = weight
+
+    def _remove(self, record_id: str):
+        previous = self._records.pop(record_id, None)
+        if previous is None:
+            return
+        for token in previous[1]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(record_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def upsert(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        """Index records by ID, replacing earlier versions"""
+        with self._lock:
+            for record_id, metadata in zip(ids, metadatas):
+                metadata = metadata or {}
+                self._add(record_id, metadata.get("content_hash", ""), self._weights(metadata))
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._records = {}
+            self._postings = {}
+            self._dirty = True
+            self.flush()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(record ID, score) of records sharing tokens with the query, best first"""
+        with self._lock:
+            total = len(self._records)
+            scores: Dict[str, float] = {}
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for record_id, weight in postings.items():
+                    scores[record_id] = scores.get(record_id, 0.0) + idf * weight
+        ranked = sorted(scores.items(), key=lambda hit: (-hit[1], hit[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def flush(self):
+        """Persist the index if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "format": self.FORMAT,
+                "records": {record_id: [content_hash, weights] for record_id, (content_hash, weights) in self._records.items()}
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _load(self) -> bool:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("format") != self.FORMAT:
+                return False
+            self._records = {}
+            self._postings = {}
+            for record_id, (content_hash, weights) in data["records"].items():
+                self._add(record_id, content_hash, weights)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logging.warning(f"Could not load lexical index, rebuilding: {e}")
+            return False
+
+    def sync(self, collection, page_size: int = 5000):
+        """
+        Make the index match the Chroma collection: the persisted index is
+        loaded on first use, then records added or changed since (e.g. by other
+        workers) are re-indexed and records no longer stored are removed
+        """
+        with self._lock:
+            if not self._records:
+                self._load()
+            indexed = {record_id: record[0] for record_id, record in self._records.items()}
+
+        # Read the collection without holding the lock, searches keep running
+        changed_ids = []
+        changed_metadatas = []
+        stored = set()
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for record_id, metadata in zip(page["ids"], page["metadatas"]):
+                stored.add(record_id)
+                if indexed.get(record_id) != (metadata or {}).get("content_hash", ""):
+                    changed_ids.append(record_id)
+                    changed_metadatas.append(metadata)
+
+        with self._lock:
+            # Records indexed while reading were written after the snapshot, keep them
+            removed = [record_id for record_id in indexed if record_id not in stored and record_id in self._records]
+            for record_id in removed:
+                self._remove(record_id)
+            if changed_ids:
+                self.upsert(changed_ids, changed_metadatas)
+            if removed or changed_ids:
+                self._dirty = True
+                logging.info(
+                    f"Lexical index synced: {len(changed_ids)} records indexed, {len(removed)} removed, {self.count} total"
+                )
+                self.flush()
+            else:
+                logging.info(f"Loaded lexical index with {self.count} records")
+
+    def sync_ids(self, collection, ids: Sequence[str], page_size: int = 5000) -> int:
+        """
+        Re-index the given records from the collection, e.g. after other workers
+        wrote them; records no longer stored are removed. Returns how many were read.
+        """
+        ids = list(dict.fromkeys(ids))
+        read = 0
+        for start in range(0, len(ids), page_size):
+            batch = ids[start:start + page_size]
+            page = collection.get(ids=batch, include=["metadatas"])
+            with self._lock:
+                for record_id in set(batch) - set(page["ids"]):
+                    self._remove(record_id)
+                self.upsert(page["ids"], page["metadatas"])
+            read += len(page["ids"])
+        return read
+
+    def close(self):
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"records": len(self._records), "tokens": len(self._postings)}
@@ -0,0 +1,311 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import tempfile
+import threading
+import numpy as np
+
+class NumpySearchIndex:
+    """
+    Exact cosine search over a contiguous, memory-mapped float32 matrix.
+    At tens of thousands of tickets one matrix-vector product plus argpartition
+    is exact and faster than an HNSW query through Chroma's client. Chroma stays
+    the system of record: the index mirrors its vectors and the categorical
+    fields used for filtering, and documents are read back from Chroma for the
+    top-k only.
+    """
+    # Filter key -> metadata field, stored as integer codes per row
+    FILTER_COLUMNS = {
+        "issue_type": "Issue Type",
+        "affected_system": "Affected System",
+        "status": "Status"
+    }
+    # Date column -> metadata field, stored as epoch seconds per row (0 = no date)
+    RANGE_COLUMNS = {
+        "created": "Created",
+        "updated": "Updated"
+    }
+    # Range filter key -> (date column, bound is inclusive lower / exclusive upper)
+    RANGE_FILTERS = {
+        "created_after": ("created", "lower"),
+        "created_before": ("created", "upper"),
+        "updated_after": ("updated", "lower"),
+        "updated_before": ("updated", "upper")
+    }
+    MATRIX_FILE = "embeddings.f32"
+    TABLE_FILE = "table.npz"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, directory: str, dimension: int):
+        self.directory = directory
+        self.dimension = dimension
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._dirty = False
+        self.matrix: Optional[np.memmap] = None
+        self.capacity = 0
+        self.count = 0
+        self.ids: List[str] = []
+        self.content_hashes: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._codes: Dict[str, np.ndarray] = {key: np.zeros(0, dtype=np.int32) for key in self.FILTER_COLUMNS}
+        self._values: Dict[str, List[str]] = {key: [] for key in self.FILTER_COLUMNS}
+        self._value_codes: Dict[str, Dict[str, int]] = {key: {} for key in self.FILTER_COLUMNS}
+        self._dates: Dict[str, np.ndarray] = {key: np.zeros(0, dtype=np.int64) for key in self.RANGE_COLUMNS}
+
+    def _reset(self, capacity: int = 1024):
+        """Empty index with room for capacity rows"""
+        self.count = 0
+        self.ids = []
+        self.content_hashes = []
+        self._rows = {}
+        self._codes = {key: np.zeros(capacity, dtype=np.int32) for key in self.FILTER_COLUMNS}
+        self._values = {key: [] for key in self.FILTER_COLUMNS}
+        self._value_codes = {key: {} for key in self.FILTER_COLUMNS}
+        self._dates = {key: np.zeros(capacity, dtype=np.int64) for key in self.RANGE_COLUMNS}
+        self._open_matrix(capacity, create=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _close_matrix(self):
+        """Unmap the embeddings file (required before resizing it on Windows)"""
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix._mmap.close()
+            self.matrix = None
+
+    def _open_matrix(self, capacity: int, create: bool = False):
+        """Map the embeddings file, sized for capacity rows"""
+        self._close_matrix()
+        path = self._path(self.MATRIX_FILE)
+        size = capacity * self.dimension * 4
+        with open(path, "w+b" if create else "r+b") as f:
+            f.truncate(size)
+        self.capacity = capacity
+        self.matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _grow(self, needed: int):
+        """Double the capacity until needed rows fit"""
+        if self.matrix is None:
+            # Neither synced nor loaded yet
+            self._reset(max(1024, needed))
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self._open_matrix(capacity)
+        for key, codes in self._codes.items():
+            grown = np.zeros(capacity, dtype=np.int32)
+            grown[:self.count] = codes[:self.count]
+            self._codes[key] = grown
+        for key, dates in self._dates.items():
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[:self.count] = dates[:self.count]
+            self._dates[key] = grown
+
+    def _code(self, key: str, value) -> int:
+        """Integer code of a categorical value; 0 is reserved for empty"""
+        value = "" if value is None else str(value)
+        if not value:
+            return 0
+        codes = self._value_codes[key]
+        if value not in codes:
+            self._values[key].append(value)
+            codes[value] = len(self._values[key])
+        return codes[value]
+
+    def upsert(self, ids: Sequence[str], embeddings: np.ndarray, metadatas: Sequence[Dict]):
+        """Insert or overwrite rows"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            new_ids = [record_id for record_id in ids if record_id not in self._rows]
+            self._grow(self.count + len(new_ids))
+            for record_id, embedding, metadata in zip(ids, embeddings, metadatas):
+                row = self._rows.get(record_id)
+                if row is None:
+                    row = self.count
+                    self._rows[record_id] = row
+                    self.ids.append(record_id)
+                    self.content_hashes.append("")
+                    self.count += 1
+                self.matrix[row] = embedding
+                self.content_hashes[row] = metadata.get("content_hash", "")
+                for key, field in self.FILTER_COLUMNS.items():
+                    self._codes[key][row] = self._code(key, metadata.get(field))
+                for key, field in self.RANGE_COLUMNS.items():
+                    value = metadata.get(field)
+                    self._dates[key][row] = value if isinstance(value, (int, float)) else 0
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._dirty = True
+        self.flush()
+
+    def _filter_rows(self, filter_criteria: Optional[Dict], count: int) -> Optional[np.ndarray]:
+        """Rows matching the filters, or None when unfiltered (an empty array if nothing matches)"""
+        mask = None
+        for key, value in (filter_criteria or {}).items():
+            if value is None or value == "":
+                continue
+            if key in self.RANGE_FILTERS:
+                column, bound = self.RANGE_FILTERS[key]
+                dates = self._dates[column][:count]
+                column_mask = (dates >= value) if bound == "lower" else (dates < value)
+                column_mask &= dates > 0
+                mask = column_mask if mask is None else mask & column_mask
+                continue
+            if key not in self.FILTER_COLUMNS:
+                raise ValueError(f"Unsupported filter for the numpy backend: {key}")
+            code = self._value_codes[key].get(str(value))
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            column_mask = self._codes[key][:count] == code
+            mask = column_mask if mask is None else mask & column_mask
+        return None if mask is None else np.flatnonzero(mask)
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        filter_criteria: Optional[Dict] = None,
+        limit: int = 5
+    ) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity) pairs, best first"""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.search_batch(query, filter_criteria, limit)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        filter_criteria: Optional[Dict] = None,
+        limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Top-k (id, cosine similarity) pairs for each row of a query matrix, in one matrix product"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        with self._lock:
+            count = self.count
+            if count == 0 or limit <= 0:
+                return [[] for _ in range(len(queries))]
+            rows = self._filter_rows(filter_criteria, count)
+            if rows is not None and rows.size == 0:
+                return [[] for _ in range(len(queries))]
+
+            candidates = self.matrix[:count] if rows is None else self.matrix[rows]
+            # (queries, candidates) similarity matrix
+            scores = queries @ candidates.T
+            k = min(limit, scores.shape[1])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            result_rows = top if rows is None else rows[top]
+            return [
+                [(self.ids[row], float(score)) for row, score in zip(row_ids, row_scores)]
+                for row_ids, row_scores in zip(result_rows, top_scores)
+            ]
+
+    def flush(self):
+        """Persist the matrix and the metadata table if they changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.matrix.flush()
+            table = {
+                "ids": np.array(self.ids, dtype=str),
+                "content_hashes": np.array(self.content_hashes, dtype=str)
+            }
+            for key in self.FILTER_COLUMNS:
+                table[f"codes_{key}"] = self._codes[key][:self.count]
+                table[f"values_{key}"] = np.array(self._values[key], dtype=str)
+            for key in self.RANGE_COLUMNS:
+                table[f"dates_{key}"] = self._dates[key][:self.count]
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **table)
+            os.replace(tmp_path, self._path(self.TABLE_FILE))
+            self._write_manifest()
+            self._dirty = False
+
+    def _write_manifest(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"count": self.count, "capacity": self.capacity, "dimension": self.dimension}, f)
+        os.replace(tmp_path, self._path(self.MANIFEST_FILE))
+
+    def _load(self) -> bool:
+        """Open the persisted index; False if there is none or it does not fit this configuration"""
+        try:
+            with open(self._path(self.MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+            if manifest["dimension"] != self.dimension:
+                return False
+            table = np.load(self._path(self.TABLE_FILE), allow_pickle=False)
+            if len(table["ids"]) != manifest["count"]:
+                return False
+            self._open_matrix(manifest["capacity"])
+            self.count = manifest["count"]
+            self.ids = table["ids"].tolist()
+            self.content_hashes = table["content_hashes"].tolist()
+            self._rows = {record_id: row for row, record_id in enumerate(self.ids)}
+            for key in self.FILTER_COLUMNS:
+                codes = np.zeros(self.capacity, dtype=np.int32)
+                codes[:self.count] = table[f"codes_{key}"]
+                self._codes[key] = codes
+                self._values[key] = table[f"values_{key}"].tolist()
+                self._value_codes[key] = {value: code + 1 for code, value in enumerate(self._values[key])}
+            for key in self.RANGE_COLUMNS:
+                dates = np.zeros(self.capacity, dtype=np.int64)
+                dates[:self.count] = table[f"dates_{key}"]
+                self._dates[key] = dates
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logging.warning(f"Could not load numpy search index, rebuilding: {e}")
+            return False
+
+    def sync(self, collection, page_size: int = 5000):
+        """
+        Make the index match the Chroma collection. The persisted index is reused
+        when its IDs and content hashes match the collection, otherwise it is
+        rebuilt from the stored embeddings.
+        """
+        with self._lock:
+            stored = {}
+            for offset in range(0, collection.count(), page_size):
+                page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                for record_id, metadata in zip(page["ids"], page["metadatas"]):
+                    stored[record_id] = (metadata or {}).get("content_hash", "")
+
+            if self._load() and dict(zip(self.ids, self.content_hashes)) == stored:
+                logging.info(f"Loaded numpy search index with {self.count} vectors")
+                return
+
+            logging.info(f"Building numpy search index from {len(stored)} stored vectors")
+            self._reset(max(1024, len(stored)))
+            for offset in range(0, len(stored), page_size):
+                page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+                embeddings = np.asarray(page["embeddings"], dtype=np.float32).reshape(-1, self.dimension)
+                self.upsert(page["ids"], embeddings, [metadata or {} for metadata in page["metadatas"]])
+            self._dirty = True
+            self.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._close_matrix()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "vectors": self.count,
+                "capacity": self.capacity,
+                "matrix_mb": round(self.capacity * self.dimension * 4 / (1024 * 1024), 1)
+            }
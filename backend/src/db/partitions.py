@@ -0,0 +1,308 @@
+"""
+Partitioning of the ticket store into one Chroma collection per affected
+system. PartitionedCollection implements the subset of Chroma's Collection
+API that VectorStore uses, so the rest of the store does not need to know
+whether it is partitioned:
+
+- writes are routed to the partition of each record's "Affected System"
+- queries filtered on an affected system go to that partition only, with the
+  system condition removed from the where clause
+- other queries fan out to all partitions concurrently and the top-k are merged
+  by distance
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import re
+import threading
+
+PARTITION_FIELD = "Affected System"
+GET_INCLUDE = ["metadatas", "documents"]
+QUERY_INCLUDE = ["metadatas", "documents", "distances"]
+RESULT_FIELDS = ["embeddings", "metadatas", "documents"]
+
+def partition_name(base_name: str, system: str) -> str:
+    """Collection name of a partition; the digest keeps names of similar systems apart"""
+    slug = re.sub(r"[^a-z0-9]+", "_", system.lower()).strip("_")[:32] or "unassigned"
+    digest = hashlib.sha1(system.encode("utf-8")).hexdigest()[:8]
+    return f"{base_name}__{slug}_{digest}"
+
+def partition_of(metadata: Optional[Dict]) -> str:
+    return str((metadata or {}).get(PARTITION_FIELD) or "")
+
+def route_where(where: Optional[Dict]) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Split an affected system equality condition off a where clause.
+    Returns (system or None, remaining where clause or None).
+    """
+    def system_of(condition: Dict) -> Optional[str]:
+        if len(condition) != 1 or PARTITION_FIELD not in condition:
+            return None
+        value = condition[PARTITION_FIELD]
+        if isinstance(value, dict):
+            return value.get("$eq") if list(value) == ["$eq"] else None
+        return value
+
+    if not where:
+        return None, where
+    system = system_of(where)
+    if system is not None:
+        return system, None
+    conditions = where.get("$and") if list(where) == ["$and"] else None
+    if conditions:
+        for i, condition in enumerate(conditions):
+            system = system_of(condition)
+            if system is not None:
+                rest = conditions[:i] + conditions[i + 1:]
+                if not rest:
+                    return system, None
+                return system, rest[0] if len(rest) == 1 else {"$and": rest}
+    return None, where
+
+def empty_result(include: Sequence[str], rows: Optional[int] = None) -> Dict[str, Any]:
+    """A get result (rows=None) or a query result for rows queries, with nothing in it"""
+    result: Dict[str, Any] = {"ids": [] if rows is None else [[] for _ in range(rows)]}
+    for field in RESULT_FIELDS + ["distances"]:
+        if field in include:
+            result[field] = [] if rows is None else [[] for _ in range(rows)]
+        else:
+            result[field] = None
+    return result
+
+def move_records(source, target, page_size: int = 5000) -> int:
+    """Copy every record of source into target, deleting it from source as it goes"""
+    moved = 0
+    while True:
+        page = source.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=0)
+        if not page["ids"]:
+            return moved
+        target.upsert(
+            ids=page["ids"],
+            embeddings=[list(embedding) for embedding in page["embeddings"]],
+            documents=page["documents"],
+            metadatas=page["metadatas"]
+        )
+        source.delete(ids=page["ids"])
+        moved += len(page["ids"])
+
+class PartitionedCollection:
+    def __init__(self, client, name: str, metadata: Dict, embedding_function, query_threads: int = 8):
+        self.client = client
+        self.name = name
+        self.metadata = metadata
+        self.embedding_function = embedding_function
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, query_threads), thread_name_prefix="partition-query")
+        # Affected system -> collection
+        self._partitions: Dict[str, Any] = {}
+        self.reload()
+        logging.info(f"Opened {len(self._partitions)} partitions of {name}")
+
+    def reload(self) -> int:
+        """Pick up partitions created since opening, e.g. by other workers; returns how many"""
+        added = 0
+        for collection in self.client.list_collections():
+            collection_metadata = collection.metadata or {}
+            system = collection_metadata.get("affected_system", "")
+            if collection_metadata.get("partition_of") != self.name:
+                continue
+            with self._lock:
+                if system in self._partitions:
+                    continue
+                self._partitions[system] = self.client.get_collection(
+                    collection.name, embedding_function=self.embedding_function
+                )
+            added += 1
+        return added
+
+    def partition(self, system: str, create: bool = False):
+        """Collection of an affected system, created on first write"""
+        with self._lock:
+            collection = self._partitions.get(system)
+            if collection is None and create:
+                collection = self.client.get_or_create_collection(
+                    name=partition_name(self.name, system),
+                    metadata={**self.metadata, "partition_of": self.name, "affected_system": system},
+                    embedding_function=self.embedding_function
+                )
+                self._partitions[system] = collection
+                logging.info(f"Created partition {collection.name} for affected system '{system}'")
+            return collection
+
+    def partitions(self) -> List:
+        """All partition collections, in a stable order"""
+        with self._lock:
+            return sorted(self._partitions.values(), key=lambda collection: collection.name)
+
+    def get_partition_counts(self) -> Dict[str, int]:
+        with self._lock:
+            partitions = dict(self._partitions)
+        return {system: collection.count() for system, collection in partitions.items()}
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.partitions())
+
+    def _targets(self, where: Optional[Dict]) -> Tuple[List, Optional[Dict]]:
+        """Partitions a where clause can match, and the clause to run on them"""
+        system, rest = route_where(where)
+        if system is None:
+            return self.partitions(), where
+        collection = self.partition(system)
+        return ([collection] if collection is not None else []), rest
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = GET_INCLUDE
+    ) -> Dict[str, Any]:
+        targets, where = self._targets(where)
+        result = empty_result(include)
+        skip = offset or 0
+        remaining = limit
+        # Partitions are read in order, so an offset first skips whole partitions
+        for collection in targets:
+            if remaining is not None and remaining <= 0:
+                break
+            if skip:
+                if ids is None and where is None:
+                    size = collection.count()
+                else:
+                    size = len(collection.get(ids=ids, where=where, include=[])["ids"])
+                if skip >= size:
+                    skip -= size
+                    continue
+            page = collection.get(ids=ids, where=where, limit=remaining, offset=skip or None, include=include)
+            skip = 0
+            self._extend(result, page, include)
+            if remaining is not None:
+                remaining -= len(page["ids"])
+        return result
+
+    @staticmethod
+    def _extend(result: Dict, page: Dict, include: Sequence[str]):
+        result["ids"].extend(page["ids"])
+        for field in RESULT_FIELDS:
+            if field in include:
+                result[field].extend(page[field])
+
+    def query(
+        self,
+        query_embeddings: Optional[Sequence] = None,
+        query_texts: Optional[Sequence[str]] = None,
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+        include: Sequence[str] = QUERY_INCLUDE
+    ) -> Dict[str, Any]:
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(list(query_texts))
+        rows = len(query_embeddings)
+        targets, where = self._targets(where)
+        if not targets:
+            return empty_result(include, rows)
+        if len(targets) == 1:
+            return targets[0].query(
+                query_embeddings=query_embeddings, n_results=n_results, where=where, include=include
+            )
+
+        # Fan out for IDs and distances only; hnswlib releases the GIL, so
+        # partitions are searched in parallel
+        pages = list(self._executor.map(
+            lambda collection: collection.query(
+                query_embeddings=query_embeddings, n_results=n_results, where=where, include=["distances"]
+            ),
+            targets
+        ))
+        result = empty_result(include, rows)
+        winners: Dict[int, List[str]] = {}
+        for row in range(rows):
+            hits = sorted(
+                (distance, p, i)
+                for p, page in enumerate(pages)
+                for i, distance in enumerate(page["distances"][row])
+            )[:n_results]
+            for distance, p, i in hits:
+                record_id = pages[p]["ids"][row][i]
+                result["ids"][row].append(record_id)
+                if "distances" in include:
+                    result["distances"][row].append(distance)
+                winners.setdefault(p, []).append(record_id)
+
+        # Read documents and metadata for the merged top-k only
+        fields = [field for field in RESULT_FIELDS if field in include]
+        if fields:
+            records = {}
+            for p, ids in winners.items():
+                page = targets[p].get(ids=list(dict.fromkeys(ids)), include=fields)
+                for i, record_id in enumerate(page["ids"]):
+                    records[record_id] = {field: page[field][i] for field in fields}
+            for row in range(rows):
+                for record_id in result["ids"][row]:
+                    for field in fields:
+                        result[field][row].append(records[record_id][field])
+        return result
+
+    def _locate(self, ids: Sequence[str]) -> Dict[str, Any]:
+        """Record ID -> partition currently holding it"""
+        locations = {}
+        for collection in self.partitions():
+            for record_id in collection.get(ids=list(ids), include=[])["ids"]:
+                locations[record_id] = collection
+        return locations
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence, metadatas: Sequence[Dict], documents: Sequence[str]):
+        """Write records to the partitions of their affected systems, moving tickets whose system changed"""
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(partition_of(metadata), []).append(i)
+        locations = self._locate(ids)
+        for system, rows in groups.items():
+            collection = self.partition(system, create=True)
+            moved = {}
+            for i in rows:
+                previous = locations.get(ids[i])
+                if previous is not None and previous.name != collection.name:
+                    moved.setdefault(previous.name, (previous, []))[1].append(ids[i])
+            for previous, moved_ids in moved.values():
+                previous.delete(ids=moved_ids)
+            collection.upsert(
+                ids=[ids[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows],
+                documents=[documents[i] for i in rows]
+            )
+
+    def update(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        """Update metadata in place; changing the affected system requires an upsert"""
+        locations = self._locate(ids)
+        groups: Dict[str, Tuple[Any, List[int]]] = {}
+        for i, record_id in enumerate(ids):
+            collection = locations.get(record_id)
+            if collection is None:
+                continue
+            if PARTITION_FIELD in metadatas[i] and partition_of(metadatas[i]) != collection.metadata.get("affected_system", ""):
+                raise ValueError(f"Cannot change the affected system of {record_id} with an update, upsert it instead")
+            groups.setdefault(collection.name, (collection, []))[1].append(i)
+        for collection, rows in groups.values():
+            collection.update(ids=[ids[i] for i in rows], metadatas=[metadatas[i] for i in rows])
+
+    def delete(self, ids: Sequence[str]):
+        locations = self._locate(ids)
+        groups: Dict[str, Tuple[Any, List[str]]] = {}
+        for record_id, collection in locations.items():
+            groups.setdefault(collection.name, (collection, []))[1].append(record_id)
+        for collection, record_ids in groups.values():
+            collection.delete(ids=record_ids)
+
+    def drop(self):
+        """Delete every partition"""
+        with self._lock:
+            partitions, self._partitions = list(self._partitions.values()), {}
+        for collection in partitions:
+            self.client.delete_collection(collection.name)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,187 @@
+"""
+Binary snapshots of the vector store, for fast cold starts and restores
+without re-embedding.
+
+A snapshot is a directory with:
+    manifest.json      count, dimension, columns and source collection settings
+    embeddings.npy     float32 matrix, one row per record
+    columns/*.jsonl    one file per column (id, document, metadata fields),
+                       one JSON value per line, row-aligned with the matrix
+
+Export pages through the collection and writes each page straight into the
+files, so the collection is never held in memory. Import memory-maps the
+matrix and bulk-loads it in batches.
+"""
+from typing import Dict, List, Optional, Tuple
+from contextlib import ExitStack
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import numpy as np
+from src.db.vector_store import VectorStore
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+COLUMNS_DIR = "columns"
+# Metadata fields written by VectorStore; anything else goes to the extra column
+METADATA_FIELDS = [
+    "id", "Summary", "Issue Type", "Affected System", "Status", "Resolution",
+    "Steps", "Created", "Updated", "content_hash", "metadata_version", "Issue key"
+]
+EXTRA_COLUMN = "_extra"
+
+def _column_files(fields: List[str]) -> Dict[str, str]:
+    """Column name -> file name; metadata field names contain spaces, so they are numbered"""
+    files = {"_id": "ids.jsonl", "_document": "documents.jsonl", EXTRA_COLUMN: "extra.jsonl"}
+    for i, field in enumerate(fields):
+        files[field] = f"metadata_{i:02d}.jsonl"
+    return files
+
+def read_manifest(path: str) -> Dict:
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    return manifest
+
+def export_snapshot(vector_store: VectorStore, path: str, page_size: int = 5000) -> Dict:
+    """Write the collection to a snapshot directory at path"""
+    if os.path.exists(path):
+        raise ValueError(f"Snapshot already exists: {path}")
+    start = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(os.path.join(tmp_path, COLUMNS_DIR))
+
+    collection = vector_store.collection
+    dimension = vector_store.embedding_service.dimension
+    expected = collection.count()
+    files = _column_files(METADATA_FIELDS)
+    matrix = np.lib.format.open_memmap(
+        os.path.join(tmp_path, EMBEDDINGS_FILE), mode="w+", dtype=np.float32, shape=(expected, dimension)
+    )
+    written = 0
+    try:
+        with ExitStack() as stack:
+            handles = {
+                column: stack.enter_context(open(os.path.join(tmp_path, COLUMNS_DIR, name), "w", encoding="utf-8"))
+                for column, name in files.items()
+            }
+            for offset in range(0, expected, page_size):
+                page = collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=min(page_size, expected - offset),
+                    offset=offset
+                )
+                if not page["ids"]:
+                    break
+                rows = len(page["ids"])
+                matrix[written:written + rows] = np.asarray(page["embeddings"], dtype=np.float32)
+                for record_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                    metadata = dict(metadata or {})
+                    handles["_id"].write(json.dumps(record_id) + "\n")
+                    handles["_document"].write(json.dumps(document) + "\n")
+                    for field in METADATA_FIELDS:
+                        handles[field].write(json.dumps(metadata.pop(field, None)) + "\n")
+                    handles[EXTRA_COLUMN].write(json.dumps(metadata) + "\n")
+                written += rows
+        matrix.flush()
+    finally:
+        del matrix
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "count": written,
+        "dimension": dimension,
+        "collection": collection.name,
+        "collection_metadata": collection.metadata,
+        "columns": files,
+        "created_at": datetime.now().isoformat()
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+    logging.info(f"Exported {written} records to snapshot {path} in {time.perf_counter() - start:.2f}s")
+    return manifest
+
+def _read_rows(handles: Dict, fields: List[str], matrix: np.ndarray, offset: int, batch_size: int) -> Dict[str, Tuple]:
+    """The next batch of snapshot rows in stored form (document, metadata, embedding) by ID"""
+    rows = {}
+    # Copy the batch out of the memory map; Chroma needs its own lists anyway
+    embeddings = np.array(matrix[offset:offset + batch_size], dtype=np.float32)
+    for embedding in embeddings:
+        record_id = json.loads(handles["_id"].readline())
+        document = json.loads(handles["_document"].readline())
+        metadata = json.loads(handles[EXTRA_COLUMN].readline())
+        for field in fields:
+            value = json.loads(handles[field].readline())
+            if value is not None:
+                metadata[field] = value
+        rows[record_id] = (document, metadata, embedding)
+    return rows
+
+async def import_snapshot(
+    vector_store: VectorStore,
+    path: str,
+    replace: bool = False,
+    batch_size: Optional[int] = None
+) -> Dict:
+    """
+    Load a snapshot into the vector store without re-embedding.
+    With replace, the snapshot is loaded into a new collection version that
+    replaces the active one when complete; otherwise records are upserted.
+    """
+    start = time.perf_counter()
+    manifest = read_manifest(path)
+    dimension = vector_store.embedding_service.dimension
+    if manifest["dimension"] != dimension:
+        raise ValueError(f"Snapshot dimension {manifest['dimension']} does not match the store ({dimension})")
+    count = manifest["count"]
+    matrix = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+    columns = manifest["columns"]
+    fields = [column for column in columns if column not in ("_id", "_document", EXTRA_COLUMN)]
+
+    # A replacing import is loaded into a new collection version and swapped in
+    # once complete; searches keep reading the current version until then
+    staging = await asyncio.to_thread(vector_store.create_version) if replace else None
+    try:
+        async with vector_store.bulk_load(staging) as loader:
+            batch_size = batch_size or loader.batch_size
+            with ExitStack() as stack:
+                handles = {
+                    column: stack.enter_context(open(os.path.join(path, COLUMNS_DIR, name), encoding="utf-8"))
+                    for column, name in columns.items()
+                }
+                for offset in range(0, count, batch_size):
+                    # Reading and parsing a batch is blocking work, keep it off the event loop
+                    rows = await asyncio.to_thread(_read_rows, handles, fields, matrix, offset, batch_size)
+                    await loader.add_rows(rows)
+        del matrix
+        # Snapshots taken before metadata version 2 hold date strings and pipe-joined steps
+        await asyncio.to_thread(vector_store.migrate_metadata, collection=staging)
+        if staging is not None:
+            if loader.failed_ids:
+                raise ValueError(f"{len(loader.failed_ids)} records failed to load")
+            await asyncio.to_thread(vector_store.activate_version, staging)
+    except Exception:
+        if staging is not None:
+            logging.error(f"Error importing snapshot {path}, discarding {staging.name}")
+            await asyncio.to_thread(vector_store.discard_version)
+        raise
+
+    result = {
+        "snapshot": os.path.basename(path.rstrip("/\\")),
+        "records": count - len(loader.failed_ids),
+        "failed_records": len(loader.failed_ids),
+        "replaced": replace,
+        "seconds": round(time.perf_counter() - start, 2),
+        "write_throughput": loader.get_stats()
+    }
+    logging.info(f"Imported {count} records from snapshot {path} in {result['seconds']}s")
+    return result
@@ -1,16 +1,30 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import re
+import shutil
 import chromadb
+from chromadb.utils.read_write_lock import WriteRWLock
 from src.core.config import settings
 import numpy as np
 from datetime import datetime
 import logging
 import os
 import json
+import hashlib
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from src.db.lexical_index import LexicalIndex
+from src.db.numpy_index import NumpySearchIndex
+from src.db.partitions import PartitionedCollection, move_records
 from src.services.embedding import EmbeddingService
 
 class AzureOpenAIEmbeddingFunction:
-    def __init__(self):
-        self.embedding_service = EmbeddingService()
+    def __init__(self, embedding_service: Optional[EmbeddingService] = None):
+        self.embedding_service = embedding_service or EmbeddingService()
         
     def __call__(self, input: List[str]) -> List[List[float]]:
         """
@@ -25,13 +39,201 @@ class AzureOpenAIEmbeddingFunction:
         
         try:
             embeddings = self.embedding_service.batch_generate_embeddings_sync(input)
-            return [e.tolist() for e in embeddings]
+            # ChromaDB only accepts nested lists, so convert the whole matrix in one pass
+            return embeddings.tolist()
         except Exception as e:
             logging.error(f"Error generating embeddings: {e}")
             raise
 
+def get_index_segment(client, collection):
+    """
+    Chroma's local HNSW segment for a collection, or None when it is not
+    reachable (e.g. a client/server deployment). Chroma has no public API for
+    index settings after creation, so this relies on its internals and every
+    use of it has to be optional.
+    """
+    try:
+        from chromadb.segment import VectorReader
+        segment = client._server._manager.get_segment(collection.id, VectorReader)
+        if hasattr(segment, "_params") and hasattr(segment, "_lock"):
+            return segment
+    except Exception as e:
+        logging.warning(f"HNSW segment not accessible, keeping default index settings: {e}")
+    return None
+
+def set_index_search_ef(segment, search_ef: int):
+    """Change search_ef on a loaded HNSW segment; applies to every following query"""
+    with WriteRWLock(segment._lock):
+        segment._params.search_ef = search_ef
+        # The index only exists once the first vectors are written
+        if segment._index is not None:
+            segment._index.set_ef(search_ef)
+
+def connect_chroma_server(url: str, pool_size: int, timeout: float):
+    """
+    HttpClient for a Chroma server, retried until timeout so workers can start
+    alongside a server that is still loading. requests keeps 10 connections per
+    host, fewer than the request threads of a worker, so the client's session
+    gets a pool of pool_size instead; like get_index_segment this reaches into
+    Chroma internals and is skipped when they change.
+    """
+    parsed = urlparse(url)
+    ssl = parsed.scheme == "https"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client = chromadb.HttpClient(
+                host=parsed.hostname,
+                port=str(parsed.port or (443 if ssl else 8000)),
+                ssl=ssl,
+                settings=chromadb.Settings(anonymized_telemetry=False)
+            )
+            client.heartbeat()
+            break
+        except Exception as e:
+            if time.monotonic() >= deadline:
+                raise Exception(f"Error connecting to Chroma server at {url}: {str(e)}")
+            logging.info(f"Waiting for Chroma server at {url}: {e}")
+            time.sleep(1.0)
+    try:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        client._server._session.mount("http://", adapter)
+        client._server._session.mount("https://", adapter)
+    except Exception as e:
+        logging.warning(f"Chroma client session not accessible, keeping the default connection pool: {e}")
+    return client
+
+COLLECTION_NAME = "support_tickets"
+
+# Layout of the stored ticket metadata; 2 stores dates as epoch seconds and steps as a JSON list
+METADATA_VERSION = 2
+# Stored for tickets without a date; never matched by date range filters
+MISSING_DATE = 0
+# Size at which the shared change log is started over; workers then refresh in full
+CHANGES_LOG_MAX_BYTES = 16 * 1024 * 1024
+
+def parse_date(value) -> Optional[datetime]:
+    """Parse an ISO or DD-MM-YYYY HH:mm date string, None if it is neither"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            return datetime.strptime(value, "%d-%m-%Y %H:%M")
+        except ValueError:
+            return None
+
+def process_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this ID is running on this host"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def to_epoch(value) -> int:
+    """Epoch seconds of a datetime, date string or number; MISSING_DATE when empty or unparseable"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str) and value.strip():
+        parsed = parse_date(value.strip())
+        if parsed is not None:
+            return int(parsed.timestamp())
+    return MISSING_DATE
+
+class BulkLoader:
+    """
+    Write buffer handed out by VectorStore.bulk_load(). Records are collected
+    until a full Chroma batch is ready and written in one upsert. Rows stay
+    buffered until their write succeeds; rows that still cannot be written
+    when the load ends are reported in failed_ids.
+    """
+    def __init__(self, vector_store: "VectorStore", batch_size: int, collection=None):
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        # None writes to the active collection; otherwise a version being built
+        self.collection = collection
+        self._pending: Dict[str, Tuple[str, Dict, np.ndarray]] = {}
+        self.failed_ids: List[str] = []
+        self._started = time.monotonic()
+        self.stats = {
+            "records_written": 0,
+            "batches": 0,
+            "failed_writes": 0,
+            "write_seconds": 0.0
+        }
+
+    async def add_records(self, records: List[Dict]) -> int:
+        """Buffer records, writing a batch whenever the buffer is full"""
+        await self.add_rows(self.vector_store._prepare_rows(records))
+        return len(records)
+
+    async def add_rows(self, rows: Dict[str, Tuple[str, Dict, np.ndarray]]):
+        """Buffer rows already in stored form (document, metadata, embedding) by ID"""
+        for record_id, row in rows.items():
+            self._pending.pop(record_id, None)
+            self._pending[record_id] = row
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """
+        Write everything buffered so far. Returns False if a write failed; its
+        rows and the ones after it stay buffered for the next flush.
+        """
+        while self._pending:
+            rows = {record_id: self._pending[record_id] for record_id in list(self._pending)[:self.batch_size]}
+            start = time.perf_counter()
+            try:
+                # Large upserts take seconds, keep them off the event loop
+                written = await asyncio.to_thread(self.vector_store._write_rows, rows, self.collection)
+            except Exception as e:
+                self.stats["failed_writes"] += 1
+                logging.error(f"Error writing {len(rows)} records in bulk load, keeping them buffered: {str(e)}")
+                return False
+            finally:
+                self.stats["write_seconds"] += time.perf_counter() - start
+            for record_id, row in rows.items():
+                # Unless the record was buffered again while it was being written
+                if self._pending.get(record_id) is row:
+                    del self._pending[record_id]
+            self.stats["records_written"] += written
+            self.stats["batches"] += 1
+        return True
+
+    def fail_pending(self) -> List[str]:
+        """Give up on the rows still buffered, recording them in failed_ids"""
+        failed = list(self._pending)
+        self._pending.clear()
+        self.failed_ids.extend(failed)
+        return failed
+
+    def get_stats(self) -> Dict:
+        """Write throughput of this bulk load"""
+        stats = dict(self.stats)
+        stats["failed_records"] = len(self.failed_ids)
+        stats["write_seconds"] = round(stats["write_seconds"], 3)
+        stats["elapsed_seconds"] = round(time.monotonic() - self._started, 3)
+        stats["records_per_second"] = (
+            round(stats["records_written"] / self.stats["write_seconds"], 1)
+            if self.stats["write_seconds"] else 0.0
+        )
+        return stats
+
+    def log_throughput(self):
+        stats = self.get_stats()
+        logging.info(
+            f"Bulk load wrote {stats['records_written']} records in {stats['batches']} batches, "
+            f"{stats['records_per_second']} records/s over {stats['write_seconds']}s of writes"
+        )
+
 class VectorStore:
-    def __init__(self):
+    def __init__(self, embedding_service: Optional[EmbeddingService] = None):
         # Ensure the ChromaDB directory exists
         chroma_dir = settings.CHROMA_PERSIST_DIRECTORY
         if not os.path.exists(chroma_dir):
@@ -40,48 +242,601 @@ class VectorStore:
         
         logging.info(f"Initializing ChromaDB with persist directory: {chroma_dir}")
         
-        # Initialize embedding service
-        self.embedding_service = EmbeddingService()
+        # Initialize embedding service, shared with the collection's embedding function
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.embedding_function = AzureOpenAIEmbeddingFunction(self.embedding_service)
         
-        # Initialize ChromaDB with persistence
-        self.client = chromadb.PersistentClient(
-            path=chroma_dir,
-            settings=chromadb.Settings(anonymized_telemetry=False)
-        )
+        # Initialize ChromaDB with persistence, in process or through a shared
+        # server so several workers can use the same store
+        self.remote = bool(settings.CHROMA_SERVER_URL)
+        if self.remote:
+            if settings.VECTOR_STORE_BACKEND == "numpy":
+                raise ValueError("VECTOR_STORE_BACKEND 'numpy' keeps a per-process index and cannot be used with CHROMA_SERVER_URL")
+            logging.info(f"Connecting to Chroma server at {settings.CHROMA_SERVER_URL}")
+            self.client = connect_chroma_server(
+                settings.CHROMA_SERVER_URL,
+                settings.CHROMA_SERVER_POOL_SIZE,
+                settings.CHROMA_SERVER_CONNECT_TIMEOUT
+            )
+        else:
+            self.client = chromadb.PersistentClient(
+                path=chroma_dir,
+                settings=chromadb.Settings(anonymized_telemetry=False)
+            )
+        
+        # The active collection version is named in collections.json; reindexing
+        # builds the next version alongside it and swaps it in
+        self.versions_file = os.path.join(chroma_dir, "collections.json")
+        self._version_lock = threading.RLock()
+        self._versions = self._load_versions()
+        self._staging = None
+        # Whether this instance is building _staging, rather than following another worker's build
+        self._building_here = False
+        self._drop_inactive_versions()
         
         # Get or create collection with embedding function
-        self.collection = self.client.get_or_create_collection(
-            name="support_tickets",
-            metadata={"hnsw:space": "cosine", "dimension": 1536},  # Azure OpenAI dimension
-            embedding_function=AzureOpenAIEmbeddingFunction()
-        )
+        self.collection = self._open_collection(self._versions["active"])
         logging.info(f"Connected to ChromaDB collection: {self.collection.name}")
+        if not self.remote:
+            # Single process: a build recorded in collections.json was cut short by a restart
+            self.drop_unfinished_version()
+        # A version another worker is building receives this worker's writes too
+        self._follow_building()
+        self._check_index_params()
         
-        # Initialize stats file
+        # Stats are kept in memory, updated incrementally and flushed to disk periodically
         self.stats_file = os.path.join(chroma_dir, "stats.json")
-        if not os.path.exists(self.stats_file):
-            self._save_stats({
-                "total_records": 0,
-                "embedding_count": 0,
-                "last_updated": None,
-                "healthy": True,
-                "sample_records": []
-            })
+        self._stats_lock = threading.Lock()
+        self._stats_dirty = False
+        self._stats = {
+            "total_records": 0,
+            "embedding_count": 0,
+            "last_updated": None,
+            "healthy": True,
+            "sample_records": []
+        }
+        self._stats.update(self._load_stats())
+        self._refresh_count()
+        
+        # Search engine: Chroma's HNSW index, or an exact in-process matrix kept in sync with it
+        if settings.VECTOR_STORE_BACKEND not in ("chroma", "numpy"):
+            raise ValueError(
+                f"Unknown VECTOR_STORE_BACKEND '{settings.VECTOR_STORE_BACKEND}', expected 'chroma' or 'numpy'"
+            )
+        # With a Chroma server other workers write to the same store; each write
+        # is appended to the change log with the IDs written, and the other
+        # workers pick the change up. Read from here on: the indexes opened
+        # next are synced with everything written before.
+        self.changes_file = os.path.join(chroma_dir, "changes.log")
+        self._changes_position = self._changes_end()
+        
+        self.search_index: Optional[NumpySearchIndex] = self._open_search_index(self.collection)
+        # Inverted index for ticket keys and error codes, answered without embeddings
+        self.lexical_index: Optional[LexicalIndex] = self._open_lexical_index(self.collection)
+        # After the indexes are open, so the numpy index gets the migrated dates too
+        self.migrate_metadata()
+        
+        self._closed = threading.Event()
+        if self.remote:
+            threading.Thread(target=self._refresh_loop, name="vector-store-refresh", daemon=True).start()
+        # Changed stats and indexes are written by a timer, not on the write path
+        if settings.VECTOR_STORE_STATS_FLUSH_SECONDS > 0:
+            threading.Thread(target=self._flush_loop, name="vector-store-flush", daemon=True).start()
+
+    def _open_search_index(self, collection) -> Optional[NumpySearchIndex]:
+        """The numpy search index of a collection version, synced with it; None with the chroma backend"""
+        if settings.VECTOR_STORE_BACKEND != "numpy":
+            return None
+        search_index = NumpySearchIndex(self._search_index_path(collection.name), settings.EMBEDDING_DIMENSION)
+        search_index.sync(collection)
+        return search_index
+
+    @staticmethod
+    def _search_index_path(name: str) -> str:
+        directory = "numpy_index" if name == COLLECTION_NAME else f"numpy_index_{name}"
+        return os.path.join(settings.CHROMA_PERSIST_DIRECTORY, directory)
+
+    def _open_lexical_index(self, collection) -> Optional[LexicalIndex]:
+        """The lexical index of a collection version, synced with it; None when disabled"""
+        if not settings.LEXICAL_INDEX_ENABLED:
+            return None
+        lexical_index = LexicalIndex(self._lexical_index_path(collection.name))
+        lexical_index.sync(collection)
+        return lexical_index
+
+    @staticmethod
+    def _lexical_index_path(name: str) -> str:
+        file_name = "lexical_index.json" if name == COLLECTION_NAME else f"lexical_index_{name}.json"
+        return os.path.join(settings.CHROMA_PERSIST_DIRECTORY, file_name)
+
+    def _open_collection(self, name: str = COLLECTION_NAME):
+        """
+        The ticket collection, or one collection per affected system when
+        VECTOR_STORE_PARTITION_BY_SYSTEM is set. Records stored under the other
+        layout are moved over, without re-embedding.
+        """
+        partitioned = PartitionedCollection(
+            self.client,
+            name,
+            self._collection_metadata(),
+            self.embedding_function,
+            query_threads=settings.VECTOR_STORE_PARTITION_QUERY_THREADS
+        )
+        existing = [collection.name for collection in self.client.list_collections()]
+        if settings.VECTOR_STORE_PARTITION_BY_SYSTEM:
+            if name in existing:
+                collection = self.client.get_collection(name, embedding_function=self.embedding_function)
+                moved = move_records(collection, partitioned)
+                self.client.delete_collection(name)
+                logging.info(f"Partitioned {moved} records of {name} by affected system")
+            return partitioned
+
+        collection = self.client.get_or_create_collection(
+            name=name,
+            metadata=self._collection_metadata(),
+            embedding_function=self.embedding_function
+        )
+        if partitioned.partitions():
+            moved = move_records(partitioned, collection)
+            partitioned.drop()
+            logging.info(f"Merged {moved} partitioned records back into {name}")
+        partitioned.close()
+        return collection
+
+    def _collections(self, collection=None) -> List:
+        """The Chroma collections holding the tickets of a version (default: the active one)"""
+        collection = collection or self.collection
+        if isinstance(collection, PartitionedCollection):
+            return collection.partitions()
+        return [collection]
+
+    def _drop_collection(self, collection):
+        """Delete a collection version, partitioned or not"""
+        # Chroma only removes the HNSW files of segments it has loaded
+        self._get_index_segments(collection)
+        if isinstance(collection, PartitionedCollection):
+            collection.drop()
+            collection.close()
+        else:
+            self.client.delete_collection(collection.name)
+
+    def _load_versions(self) -> Dict:
+        """Contents of collections.json; stores created before versioning use the unversioned collection"""
+        versions = {"active": COLLECTION_NAME, "version": 0, "activated_at": None, "building": None, "building_pid": None}
+        if os.path.exists(self.versions_file):
+            try:
+                with open(self.versions_file, 'r') as f:
+                    versions.update(json.load(f))
+            except Exception as e:
+                logging.error(f"Error loading collection versions: {e}")
+        return versions
+
+    def _save_versions(self):
+        """Point collections.json at the active version atomically"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.versions_file), suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._versions, f)
+        os.replace(tmp_path, self.versions_file)
+
+    def _building(self) -> Optional[str]:
+        """The version being built, unless the worker building it has exited"""
+        building = self._versions.get("building")
+        if building and process_alive(self._versions.get("building_pid")):
+            return building
+        return None
+
+    def _follow_building(self):
+        """
+        Open the version being built, so writes reach it; let go of it once it
+        is discarded. The worker building it owns it, only it activates or drops it.
+        """
+        building = self._building()
+        if self._staging is not None and self._staging.name not in (building, self._versions["active"]):
+            staging, self._staging = self._staging, None
+            if isinstance(staging, PartitionedCollection):
+                staging.close()
+        if building and self._staging is None and building != self.collection.name:
+            self._staging = self._open_collection(building)
+            logging.info(f"Writing to collection version {building}, being built by another worker")
+
+    def _sync_versions(self):
+        """With a shared server, re-read collections.json for versions other workers started or swapped in"""
+        if self.remote:
+            with self._version_lock:
+                self._versions = self._load_versions()
+                self._follow_building()
+
+    def _write_targets(self) -> List:
+        """
+        Versions besides the active collection that a write must reach: the
+        version being built and, with a shared server, the version another worker
+        swapped in since the last refresh. Read after writing to the active
+        collection, so a version published before then cannot miss the write.
+        """
+        self._sync_versions()
+        if self._staging is not None and self._staging.name != self.collection.name:
+            return [self._staging]
+        return []
+
+    def _is_version(self, name: str) -> bool:
+        return name == COLLECTION_NAME or re.fullmatch(rf"{COLLECTION_NAME}_v\d+", name) is not None
+
+    @staticmethod
+    def _version_number(name: str) -> int:
+        return 0 if name == COLLECTION_NAME else int(name.rsplit("_v", 1)[1])
+
+    def _drop_inactive_versions(self):
+        """
+        Delete versions left behind by a restart: retired versions whose grace
+        period was cut short and versions of an unfinished reindex. With a shared
+        server, newer versions may be a reindex running in another worker and
+        are kept.
+        """
+        active = self._versions["active"]
+        for collection in self.client.list_collections():
+            version = (collection.metadata or {}).get("partition_of") or collection.name
+            if not self._is_version(version) or version == active:
+                continue
+            if self.remote and self._version_number(version) > self._versions["version"]:
+                continue
+            get_index_segment(self.client, collection)
+            self.client.delete_collection(collection.name)
+            shutil.rmtree(self._search_index_path(version), ignore_errors=True)
+            if os.path.exists(self._lexical_index_path(version)):
+                os.remove(self._lexical_index_path(version))
+            logging.info(f"Dropped inactive collection {collection.name}")
+
+    def _changes_end(self) -> Tuple[Optional[int], int]:
+        """(inode, size) of the change log, the position later changes are read from"""
+        try:
+            stat = os.stat(self.changes_file)
+            return stat.st_ino, stat.st_size
+        except FileNotFoundError:
+            return None, 0
+
+    def _log_change(self, ids: Sequence[str] = ()):
+        """Tell the other workers sharing the Chroma server that the store changed, and which records"""
+        if not self.remote:
+            return
+        try:
+            # One append per change; workers on the same host never interleave lines
+            with open(self.changes_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"pid": os.getpid(), "ids": list(ids)}) + "\n")
+                size = f.tell()
+            if size > CHANGES_LOG_MAX_BYTES:
+                self._restart_change_log()
+        except Exception as e:
+            logging.error(f"Error writing store change log: {e}")
+
+    def _restart_change_log(self):
+        """Replace the change log with an empty one; other workers notice and refresh in full"""
+        if not self.remote:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.changes_file), suffix=".tmp")
+            os.close(fd)
+            os.replace(tmp_path, self.changes_file)
+        except Exception as e:
+            logging.error(f"Error restarting store change log: {e}")
+
+    def _read_changes(self) -> Optional[List[List[str]]]:
+        """
+        The IDs of each change other workers logged since the last call, or None
+        when the log was restarted since and changes may have been missed
+        """
+        inode, position = self._changes_position
+        try:
+            with open(self.changes_file, "rb") as f:
+                current = os.fstat(f.fileno())
+                restarted = current.st_ino != inode or current.st_size < position
+                start = 0 if restarted else position
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            self._changes_position = (None, 0)
+            return None if inode is not None else []
+        # A line still being appended is read next time
+        complete = data.rfind(b"\n") + 1
+        self._changes_position = (current.st_ino, start + complete)
+        if restarted and inode is not None:
+            return None
+
+        changes = []
+        for i, line in enumerate(data[:complete].splitlines()):
+            try:
+                change = json.loads(line)
+            except ValueError:
+                if i == 0 and start:
+                    # The tail of a line being appended when this worker started;
+                    # what it lists was written before the indexes were synced
+                    continue
+                raise
+            if change["pid"] != os.getpid():
+                changes.append(change["ids"])
+        return changes
+
+    def _refresh_loop(self):
+        """Poll the change log and refresh after changes made by other workers"""
+        while not self._closed.wait(settings.CHROMA_SERVER_SYNC_SECONDS):
+            try:
+                changes = self._read_changes()
+                if changes is None:
+                    self.refresh()
+                elif changes:
+                    self.refresh([record_id for ids in changes for record_id in ids])
+            except Exception as e:
+                logging.error(f"Error refreshing vector store after a change by another worker: {e}")
+
+    def refresh(self, changed_ids: Optional[Sequence[str]] = None):
+        """
+        Pick up what other workers changed through the shared server: the active
+        and the building version, partitions of new affected systems, lexical
+        index entries and the record count. Vector searches already go to the
+        server. The collection is only re-opened when another version was
+        swapped in; otherwise the lexical index re-reads changed_ids, or every
+        record when they are not known.
+        """
+        with self._version_lock:
+            previous = self.collection
+            self._versions = self._load_versions()
+            if self._versions["active"] != previous.name:
+                if self._staging is not None and self._staging.name == self._versions["active"]:
+                    self.collection, self._staging = self._staging, None
+                else:
+                    self.collection = self._open_collection(self._versions["active"])
+            self._follow_building()
+            collections = [self.collection, self._staging]
+        swapped = self.collection is not previous
+        for collection in collections:
+            if isinstance(collection, PartitionedCollection):
+                collection.reload()
+        if swapped and isinstance(previous, PartitionedCollection):
+            # Searches still running may be fanning out on its executor
+            timer = threading.Timer(settings.VECTOR_STORE_RETIRE_GRACE_SECONDS, previous.close)
+            timer.daemon = True
+            timer.start()
+        if self.lexical_index is not None:
+            if swapped:
+                self.lexical_index = self._open_lexical_index(self.collection)
+            elif changed_ids is None:
+                self.lexical_index.sync(self.collection)
+            elif changed_ids:
+                self.lexical_index.sync_ids(self.collection, changed_ids)
+        self._refresh_count()
+
+    def get_version_info(self) -> Dict:
+        """Active collection version and the version being built, if any"""
+        with self._version_lock:
+            return {
+                "active": self._versions["active"],
+                "version": self._versions["version"],
+                "activated_at": self._versions["activated_at"],
+                "building": self._building()
+            }
+
+    def create_version(self):
+        """
+        Start a new, empty collection version next to the active one. Until it is
+        activated, searches use the active version and every write to the store,
+        from any worker, goes to both.
+        """
+        with self._version_lock:
+            self._sync_versions()
+            if self._staging is not None:
+                raise ValueError(f"Collection version {self._staging.name} is already being built")
+            name = f"{COLLECTION_NAME}_v{self._versions['version'] + 1}"
+            if self._versions.get("building") == name:
+                # Left behind by a worker that exited while building it
+                self._drop_collection(self._open_collection(name))
+            self._staging = self._open_collection(name)
+            self._building_here = True
+            # Published, so every worker writes to it as well
+            self._versions.update({"building": name, "building_pid": os.getpid()})
+            self._save_versions()
+            logging.info(f"Building collection version {name}")
+        self._log_change()
+        return self._staging
+
+    def discard_version(self):
+        """Drop the version being built by this worker, e.g. after a failed reindex"""
+        with self._version_lock:
+            if self._staging is not None and not self._building_here:
+                raise ValueError(f"Collection version {self._staging.name} is being built by another worker")
+            staging, self._staging = self._staging, None
+            self._building_here = False
+            if staging is not None:
+                self._versions.update({"building": None, "building_pid": None})
+                self._save_versions()
+        if staging is not None:
+            self._drop_collection(staging)
+            self._log_change()
+            logging.info(f"Discarded collection version {staging.name}")
+
+    def drop_unfinished_version(self):
+        """
+        Drop the version recorded as being built. Only for startup, while no
+        other worker can be building it.
+        """
+        with self._version_lock:
+            building = self._versions.get("building")
+            if not building:
+                return
+            self._versions.update({"building": None, "building_pid": None})
+            self._save_versions()
+            staging, self._staging = self._staging, None
+            self._building_here = False
+            if staging is None:
+                staging = self._open_collection(building)
+        self._drop_collection(staging)
+        logging.info(f"Dropped unfinished collection version {building}")
+
+    def copy_to_version(self, collection, page_size: int = 5000) -> int:
+        """
+        Copy every stored record of the active version into a new version
+        without re-embedding; the new version is created with the current HNSW
+        and partitioning settings.
+        """
+        copied = 0
+        offset = 0
+        while True:
+            # Hold the version lock per page so writes to both versions cannot
+            # land between reading a record and copying it
+            with self._version_lock:
+                page = self.collection.get(
+                    include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset
+                )
+                if not page["ids"]:
+                    return copied
+                collection.upsert(
+                    ids=page["ids"],
+                    embeddings=[list(embedding) for embedding in page["embeddings"]],
+                    documents=page["documents"],
+                    metadatas=page["metadatas"]
+                )
+            copied += len(page["ids"])
+            offset += len(page["ids"])
+
+    def activate_version(self, collection, grace_seconds: Optional[float] = None):
+        """
+        Swap a built version in as the active collection. Searches already
+        running finish on the old version, which is dropped after grace_seconds
+        (default VECTOR_STORE_RETIRE_GRACE_SECONDS).
+        """
+        grace_seconds = settings.VECTOR_STORE_RETIRE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        # Writes wait while the new version's search index is built, so it
+        # cannot miss any of them
+        with self._version_lock:
+            if collection is not self._staging or not self._building_here:
+                raise ValueError(f"{collection.name} is not the collection version being built here")
+            search_index = self._open_search_index(collection)
+            lexical_index = self._open_lexical_index(collection)
+            old = (self.collection, self.search_index, self.lexical_index)
+            self.collection, self.search_index, self.lexical_index = collection, search_index, lexical_index
+            self._staging = None
+            self._building_here = False
+            self._versions = {
+                "active": collection.name,
+                "version": self._version_number(collection.name),
+                "activated_at": datetime.now().isoformat(),
+                "building": None,
+                "building_pid": None
+            }
+            self._save_versions()
+            self._check_index_params()
+        self._refresh_count()
+        self.flush()
+        self._restart_change_log()
+        logging.info(f"Activated collection version {collection.name}, dropping {old[0].name} in {grace_seconds}s")
+
+        timer = threading.Timer(grace_seconds, self._retire_version, args=old)
+        timer.daemon = True
+        timer.start()
+
+    def _retire_version(
+        self,
+        collection,
+        search_index: Optional[NumpySearchIndex],
+        lexical_index: Optional[LexicalIndex]
+    ):
+        """Drop a version that is no longer active"""
+        try:
+            self._drop_collection(collection)
+            if search_index is not None:
+                search_index.close()
+                shutil.rmtree(search_index.directory, ignore_errors=True)
+            if lexical_index is not None and os.path.exists(lexical_index.path):
+                os.remove(lexical_index.path)
+            logging.info(f"Dropped retired collection version {collection.name}")
+        except Exception as e:
+            # Dropped on the next startup instead
+            logging.error(f"Error dropping retired collection version {collection.name}: {e}")
+
+    @staticmethod
+    def _collection_metadata() -> Dict:
+        """Collection settings, including the HNSW parameters fixed at creation"""
+        return {
+            "hnsw:space": "cosine",
+            "hnsw:construction_ef": settings.HNSW_CONSTRUCTION_EF,
+            "hnsw:M": settings.HNSW_M,
+            "hnsw:search_ef": settings.HNSW_SEARCH_EF,
+            "dimension": settings.EMBEDDING_DIMENSION
+        }
+
+    def get_index_params(self) -> Dict:
+        """
+        HNSW parameters of the index. get_or_create_collection overwrites the
+        collection metadata with the current settings, so the segment, which keeps
+        the values the index was built with, is the authoritative source.
+        """
+        segments = self._get_index_segments()
+        if segments:
+            segment = segments[0]
+            return {
+                "construction_ef": segment._params.construction_ef,
+                "M": segment._params.M,
+                "search_ef": segment._params.search_ef
+            }
+        metadata = self.collection.metadata or {}
+        return {
+            "construction_ef": metadata.get("hnsw:construction_ef", 100),
+            "M": metadata.get("hnsw:M", 16),
+            "search_ef": metadata.get("hnsw:search_ef", 10)
+        }
+
+    def _check_index_params(self):
+        """
+        construction_ef and M only take effect when a collection is created, so an
+        existing collection keeps its own values until it is rebuilt. search_ef can
+        be changed on the loaded index and is applied here.
+        """
+        params = self.get_index_params()
+        for name, configured in (("construction_ef", settings.HNSW_CONSTRUCTION_EF), ("M", settings.HNSW_M)):
+            if params[name] != configured:
+                logging.warning(
+                    f"Collection was built with hnsw {name}={params[name]}, setting is {configured}; "
+                    f"reindex (POST /admin/reindex) to apply it"
+                )
+        if params["search_ef"] != settings.HNSW_SEARCH_EF:
+            self.set_search_ef(settings.HNSW_SEARCH_EF)
+
+    def set_search_ef(self, search_ef: int) -> bool:
+        """
+        Change the HNSW search_ef of the loaded index. Chroma has no per-query ef,
+        so this applies to every following query in the process.
+        Returns False if the index is not reachable in this deployment.
+        """
+        segments = self._get_index_segments()
+        if not segments:
+            return False
+        for segment in segments:
+            set_index_search_ef(segment, search_ef)
+        logging.info(f"HNSW search_ef set to {search_ef}")
+        return True
+
+    def get_partition_counts(self) -> Dict[str, int]:
+        """Records per affected system partition; empty when the store is not partitioned"""
+        if isinstance(self.collection, PartitionedCollection):
+            return self.collection.get_partition_counts()
+        return {}
 
     def get_store_path(self) -> str:
         """Get the vector store directory path"""
         return settings.CHROMA_PERSIST_DIRECTORY
 
     def _save_stats(self, stats: Dict):
-        """Save stats to file"""
+        """Save stats to file atomically, so readers never see a partial write"""
         try:
-            with open(self.stats_file, 'w') as f:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.stats_file), suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
                 json.dump(stats, f)
+            os.replace(tmp_path, self.stats_file)
         except Exception as e:
             logging.error(f"Error saving stats: {e}")
 
     def _load_stats(self) -> Dict:
         """Load stats from file"""
+        if not os.path.exists(self.stats_file):
+            return {}
         try:
             with open(self.stats_file, 'r') as f:
                 return json.load(f)
@@ -89,110 +844,468 @@ class VectorStore:
             logging.error(f"Error loading stats: {e}")
             return {}
 
-    def _update_stats(self) -> Dict:
-        """Update stats from collection"""
+    def _refresh_count(self):
+        """Reconcile the in-memory counters with the collection"""
         try:
-            stats = self._load_stats()
-            
-            # Get collection data safely
+            count = self.collection.count()
+            self._update_stats(total_records=count)
+        except Exception as e:
+            logging.error(f"Error getting collection data: {e}")
+            with self._stats_lock:
+                self._stats.update({"healthy": False, "last_error": str(e)})
+
+    def _update_stats(self, added: int = 0, total_records: Optional[int] = None):
+        """Apply a change to the in-memory counters; _flush_loop writes them out"""
+        with self._stats_lock:
+            count = total_records if total_records is not None else self._stats["total_records"] + added
+            self._stats.update({
+                "total_records": count,
+                "embedding_count": count,  # Each record has one embedding
+                "last_updated": datetime.now().isoformat(),
+                "healthy": True
+            })
+            self._stats.pop("last_error", None)
+            self._stats_dirty = True
+        if settings.VECTOR_STORE_STATS_FLUSH_SECONDS <= 0:
+            self.flush()
+
+    def flush_stats(self):
+        """Write the counters to stats.json if they changed since the last flush"""
+        with self._stats_lock:
+            if not self._stats_dirty:
+                return
+            snapshot = dict(self._stats)
+            self._stats_dirty = False
+        self._save_stats(snapshot)
+
+    def _flush_loop(self):
+        """Write changed stats and search indexes every VECTOR_STORE_STATS_FLUSH_SECONDS"""
+        while not self._closed.wait(settings.VECTOR_STORE_STATS_FLUSH_SECONDS):
             try:
-                # Get collection count
-                count = self.collection.count()
-                
-                # Update stats
-                stats.update({
-                    "total_records": count,
-                    "embedding_count": count,  # Each record has one embedding
-                    "last_updated": datetime.now().isoformat(),
-                    "healthy": True
-                })
-                
-                # Save updated stats
-                self._save_stats(stats)
-                
-                return stats
-                
+                self.flush()
             except Exception as e:
-                logging.error(f"Error getting collection data: {e}")
-                stats.update({
-                    "healthy": False,
-                    "last_error": str(e)
-                })
-                return stats
-                
-        except Exception as e:
-            logging.error(f"Error updating stats: {e}")
-            return {
-                "total_records": 0,
-                "embedding_count": 0,
-                "last_updated": None,
-                "healthy": False,
-                "last_error": str(e)
-            }
+                logging.error(f"Error flushing vector store state: {e}")
 
-    def _generate_id(self, index: int) -> str:
-        """Generate a unique ID for a record"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        return f"doc_{index}_{timestamp}"
+    def flush(self):
+        """Persist the stats and, with the numpy backend, the search index"""
+        self.flush_stats()
+        if self.search_index is not None:
+            self.search_index.flush()
+        if self.lexical_index is not None:
+            self.lexical_index.flush()
 
-    async def add_records(self, records: List[Dict]):
-        """Add records to the vector store"""
-        try:
-            # Prepare data for ChromaDB
-            ids = []
-            embeddings = []
-            documents = []
-            metadatas = []
+    def close(self):
+        """Persist pending state on shutdown"""
+        self._closed.set()
+        self.flush()
+        if self.search_index is not None:
+            self.search_index.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+        if isinstance(self.collection, PartitionedCollection):
+            self.collection.close()
+
+    @staticmethod
+    def record_id(record: Dict) -> str:
+        """
+        Stable ID for a record: the ticket key when there is one, otherwise a hash
+        of the title and description, so re-uploads of the same ticket map to the
+        same entry
+        """
+        key = record.get('id')
+        if key is not None and not (isinstance(key, float) and np.isnan(key)) and str(key).strip():
+            if isinstance(key, float) and key.is_integer():
+                key = int(key)
+            return str(key).strip()
+        digest = hashlib.sha256(f"{record.get('title', '')}\x00{record.get('description', '')}".encode("utf-8"))
+        return f"doc_{digest.hexdigest()[:32]}"
+
+    @staticmethod
+    def content_hash(record: Dict) -> str:
+        """Hash of every stored field of a record, used to skip unchanged tickets"""
+        fields = [
+            record.get('title', ''),
+            record.get('description', ''),
+            record.get('issue_type', ''),
+            record.get('affected_system', ''),
+            record.get('status', ''),
+            record.get('resolution', ''),
+            '|'.join(record.get('steps') or []),
+            str(record.get('created_at', '')),
+            str(record.get('updated_at', ''))
+        ]
+        # Only when set, so tickets without a key keep their hash
+        if record.get('issue_key'):
+            fields.append(record['issue_key'])
+        return hashlib.sha256("\x00".join(str(field) for field in fields).encode("utf-8")).hexdigest()
+
+    def get_content_hashes(self, ids: List[str], collection=None) -> Dict[str, str]:
+        """
+        Content hashes stored for the given IDs; IDs not in the store are left out.
+        While a version is being built, IDs it does not hold with the same hash are
+        left out too, so writes skipped as unchanged still reach the new version.
+        """
+        if not ids:
+            return {}
+        if collection is None:
+            self._sync_versions()
+        staging = self._staging if collection is None else None
+        hashes = {}
+        for target in [collection or self.collection] + ([staging] if staging is not None else []):
+            existing = target.get(ids=ids, include=["metadatas"])
+            found = {
+                record_id: (metadata or {}).get('content_hash', '')
+                for record_id, metadata in zip(existing["ids"], existing["metadatas"])
+            }
+            if target is staging:
+                return {record_id: h for record_id, h in hashes.items() if found.get(record_id) == h}
+            hashes = found
+        return hashes
+
+    def _prepare_rows(self, records: List[Dict]) -> Dict[str, Tuple[str, Dict, np.ndarray]]:
+        """
+        Map records to (document, metadata, embedding) keyed by record ID.
+        Later rows win when a ticket appears more than once.
+        """
+        rows = {}
+        for record in records:
+            record_id = self.record_id(record)
             
-            for i, record in enumerate(records):
-                record_id = str(record.get('id', f'gen_{i}'))
-                ids.append(record_id)
-                embeddings.append(record['embedding'])
-                
-                # Create document text combining title and description
-                doc_text = f"Title: {record['title']}\nDescription: {record['description']}"
-                documents.append(doc_text)
-                
-                # Prepare metadata including all fields
-                metadata = {
-                    'id': record_id,
-                    'Summary': record['title'],
-                    'Issue Type': record.get('issue_type', ''),
-                    'Affected System': record.get('affected_system', ''),
-                    'Status': record.get('status', ''),
-                    'Resolution': record.get('resolution', ''),
-                    'Steps': '|'.join(record.get('steps', [])) if record.get('steps') else '',
-                    'Created': record.get('created_at', '').isoformat() if isinstance(record.get('created_at'), datetime) else str(record.get('created_at', '')),
-                    'Updated': record.get('updated_at', '').isoformat() if isinstance(record.get('updated_at'), datetime) else str(record.get('updated_at', ''))
-                }
-                metadatas.append(metadata)
+            # Create document text combining title and description
+            doc_text = f"Title: {record['title']}\nDescription: {record['description']}"
             
-            # Add to collection
-            self.collection.add(
+            # Prepare metadata including all fields
+            metadata = {
+                'id': record_id,
+                'Issue key': record.get('issue_key') or '',
+                'Summary': record['title'],
+                'Issue Type': record.get('issue_type', ''),
+                'Affected System': record.get('affected_system', ''),
+                'Status': record.get('status', ''),
+                'Resolution': record.get('resolution', ''),
+                'Steps': json.dumps(list(record.get('steps') or [])),
+                'Created': to_epoch(record.get('created_at')),
+                'Updated': to_epoch(record.get('updated_at')),
+                'content_hash': record.get('content_hash') or self.content_hash(record),
+                'metadata_version': METADATA_VERSION
+            }
+            rows.pop(record_id, None)
+            rows[record_id] = (doc_text, metadata, record['embedding'])
+        return rows
+
+    def _write_rows(self, rows: Dict[str, Tuple[str, Dict, np.ndarray]], collection=None) -> int:
+        """
+        Upsert prepared rows in a single Chroma call. By default they go to the
+        active version and to the version being built, if any; with collection
+        set, only to that version.
+        """
+        if not rows:
+            return 0
+        ids = list(rows)
+        documents = []
+        metadatas = []
+        embeddings = np.empty((len(rows), settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        for i, (document, metadata, embedding) in enumerate(rows.values()):
+            documents.append(document)
+            metadatas.append(metadata)
+            embeddings[i] = embedding
+        
+        embedding_lists = embeddings.tolist()
+        with self._version_lock:
+            if collection is not None and collection is not self.collection:
+                # A version being built; nothing searchable changes yet
+                collection.upsert(ids=ids, embeddings=embedding_lists, documents=documents, metadatas=metadatas)
+                return len(ids)
+
+            # Batches never exceed Chroma's max_batch_size, which fits SQLite's variable limit
+            existing = len(self.collection.get(ids=ids, include=[])["ids"])
+            # Upsert into collection (ChromaDB only accepts nested lists)
+            self.collection.upsert(
                 ids=ids,
-                embeddings=embeddings,
+                embeddings=embedding_lists,
                 documents=documents,
                 metadatas=metadatas
             )
-            
-            return len(ids)
+            if collection is None:
+                for target in self._write_targets():
+                    target.upsert(ids=ids, embeddings=embedding_lists, documents=documents, metadatas=metadatas)
+            if self.search_index is not None:
+                self.search_index.upsert(ids, embeddings, metadatas)
+            if self.lexical_index is not None:
+                self.lexical_index.upsert(ids, metadatas)
+        self._update_stats(added=len(ids) - existing)
+        self._log_change(ids)
+        return len(ids)
+
+    async def add_records(self, records: List[Dict]):
+        """
+        Insert or update records in the vector store.
+        IDs are stable per ticket, so re-uploading an export updates the existing
+        entries instead of failing on duplicates.
+        """
+        try:
+            return self._write_rows(self._prepare_rows(records))
             
         except Exception as e:
             logging.error(f"Error adding records to vector store: {str(e)}", exc_info=True)
             raise
 
-    def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string in various formats to datetime object."""
+    @staticmethod
+    def _parse_steps(value) -> List[str]:
+        """Stored steps: a JSON list, or pipe-joined in records from before METADATA_VERSION 2"""
+        if not value:
+            return []
         try:
-            # Try ISO format first
-            return datetime.fromisoformat(date_str)
-        except ValueError:
+            steps = json.loads(value)
+            if isinstance(steps, list):
+                return steps
+        except (TypeError, ValueError):
+            pass
+        return [step for step in str(value).split("|") if step]
+
+    @classmethod
+    def _migrate_metadata_record(cls, metadata: Dict) -> Dict:
+        """Metadata of a record written before METADATA_VERSION 2, in the current layout"""
+        return {
+            "Created": to_epoch(metadata.get("Created")),
+            "Updated": to_epoch(metadata.get("Updated")),
+            "Steps": json.dumps(cls._parse_steps(metadata.get("Steps"))),
+            "metadata_version": METADATA_VERSION
+        }
+
+    def migrate_metadata(self, page_size: int = 5000, collection=None) -> int:
+        """
+        Convert records stored before METADATA_VERSION 2 (ISO date strings,
+        pipe-joined steps) in place. Only metadata is rewritten, no re-embedding;
+        the numpy search index is updated along with Chroma. collection migrates
+        a version being built instead of the active one; its search index is
+        built from the migrated records when it is activated.
+        Returns the number of migrated records.
+        """
+        collection = self.collection if collection is None else collection
+        search_index = self.search_index if collection is self.collection else None
+        total = collection.count()
+        if total == 0:
+            return 0
+        current = collection.get(where={"metadata_version": METADATA_VERSION}, include=[])
+        if len(current["ids"]) == total:
+            return 0
+
+        logging.info(f"Migrating {total - len(current['ids'])} records to metadata version {METADATA_VERSION}")
+        migrated = 0
+        # The numpy index takes whole rows, so it needs the embeddings as well
+        include = ["metadatas", "embeddings"] if search_index is not None else ["metadatas"]
+        for offset in range(0, total, page_size):
+            page = collection.get(include=include, limit=page_size, offset=offset)
+            ids = []
+            metadatas = []
+            rows = []
+            for i, (record_id, metadata) in enumerate(zip(page["ids"], page["metadatas"])):
+                metadata = metadata or {}
+                if metadata.get("metadata_version") == METADATA_VERSION:
+                    continue
+                ids.append(record_id)
+                metadatas.append(self._migrate_metadata_record(metadata))
+                if search_index is not None:
+                    rows.append((page["embeddings"][i], {**metadata, **metadatas[-1]}))
+            if ids:
+                collection.update(ids=ids, metadatas=metadatas)
+                if search_index is not None:
+                    search_index.upsert(
+                        ids,
+                        np.asarray([embedding for embedding, _ in rows], dtype=np.float32),
+                        [metadata for _, metadata in rows]
+                    )
+                migrated += len(ids)
+        logging.info(f"Migrated {migrated} records to metadata version {METADATA_VERSION}")
+        return migrated
+
+    def _get_index_segments(self, collection=None) -> List:
+        """Chroma's HNSW segments of a version's collections that are reachable"""
+        if self.remote:
+            # The index lives in the server process
+            return []
+        segments = [get_index_segment(self.client, c) for c in self._collections(collection)]
+        return [segment for segment in segments if segment is not None]
+
+    @asynccontextmanager
+    async def bulk_load(self, collection=None):
+        """
+        Bulk-load mode for large ingestions: records are buffered into writes of up
+        to Chroma's maximum batch size. collection loads into a version being
+        built instead of the active one. Records that could not be written are
+        in loader.failed_ids afterwards.
+
+            async with vector_store.bulk_load() as loader:
+                await loader.add_records(records)
+        """
+        batch_size = settings.VECTOR_STORE_BULK_BATCH_SIZE or self.client.max_batch_size
+        loader = BulkLoader(self, min(batch_size, self.client.max_batch_size), collection)
+        try:
+            yield loader
+        finally:
             try:
-                # Try DD-MM-YYYY HH:mm format
-                return datetime.strptime(date_str, "%d-%m-%Y %H:%M")
-            except ValueError:
-                # Return current time if parsing fails
-                return datetime.now()
+                # Last attempt for anything a failed write left buffered
+                if not await loader.flush():
+                    logging.error(f"Bulk load could not write {len(loader.fail_pending())} records")
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logging.error(f"Error finishing bulk load: {str(e)}", exc_info=True)
+                loader.fail_pending()
+            loader.log_throughput()
+
+    @staticmethod
+    def _from_epoch(value) -> datetime:
+        """Stored epoch seconds as a datetime; tickets without a date report the current time"""
+        if not value:
+            return datetime.now()
+        return datetime.fromtimestamp(value)
+
+    # Search filter key -> metadata field, matched for equality
+    FILTER_FIELDS = {
+        "issue_type": "Issue Type",
+        "affected_system": "Affected System",
+        "status": "Status"
+    }
+    # Range filter key -> (metadata field, operator); bounds are datetimes or epoch seconds
+    RANGE_FILTERS = {
+        "created_after": ("Created", "$gte"),
+        "created_before": ("Created", "$lt"),
+        "updated_after": ("Updated", "$gte"),
+        "updated_before": ("Updated", "$lt")
+    }
+
+    def _to_ticket(self, metadata: Dict, document: str, index: int) -> Dict:
+        """Build ticket data from a stored record"""
+        steps = self._parse_steps(metadata.get("Steps"))
+        
+        return {
+            "id": metadata.get("id", f"unknown_{index}"),
+            "title": metadata.get("Summary", "No Title"),
+            "description": document,
+            "issue_type": metadata.get("Issue Type", ""),
+            "affected_system": metadata.get("Affected System", ""),
+            "status": metadata.get("Status", "Unknown"),
+            "resolution": metadata.get("Resolution", ""),
+            "steps": steps,
+            "created_at": self._from_epoch(metadata.get("Created")),
+            "updated_at": self._from_epoch(metadata.get("Updated"))
+        }
+
+    def _normalize_filters(self, filter_criteria: Optional[Dict]) -> Dict:
+        """Non-empty filters, with range bounds as epoch seconds"""
+        normalized = {}
+        for key, value in (filter_criteria or {}).items():
+            if value is None or value == "":
+                continue
+            normalized[key] = to_epoch(value) if key in self.RANGE_FILTERS else value
+        return normalized
+
+    def _where_clause(self, filter_criteria: Optional[Dict]) -> Optional[Dict]:
+        """Chroma where clause for the filters, so they prune candidates before ranking"""
+        conditions = []
+        dated_fields = []
+        for key, value in self._normalize_filters(filter_criteria).items():
+            if key in self.RANGE_FILTERS:
+                field, operator = self.RANGE_FILTERS[key]
+                conditions.append({field: {operator: value}})
+                if field not in dated_fields:
+                    dated_fields.append(field)
+            else:
+                conditions.append({self.FILTER_FIELDS.get(key, key): {"$eq": value}})
+        # Tickets without a date are stored as MISSING_DATE and never match a range
+        conditions.extend({field: {"$gt": MISSING_DATE}} for field in dated_fields)
+        if not conditions:
+            return None
+        return {"$and": conditions} if len(conditions) > 1 else conditions[0]
+
+    def _hydrate(self, hit_ids: List[List[str]]) -> List[List[Dict]]:
+        """Read documents and metadata for the hits of several queries in one get"""
+        unique_ids = list(dict.fromkeys(record_id for ids in hit_ids for record_id in ids))
+        if not unique_ids:
+            return [[] for _ in hit_ids]
+        records = self.collection.get(ids=unique_ids, include=["documents", "metadatas"])
+        by_id = {
+            record_id: (metadata, document)
+            for record_id, metadata, document in zip(records["ids"], records["metadatas"], records["documents"])
+        }
+        return [
+            [self._to_ticket(*by_id[record_id], i) for i, record_id in enumerate(ids) if record_id in by_id]
+            for ids in hit_ids
+        ]
+
+    def _search_index(self, query_embeddings: np.ndarray, filter_criteria: Optional[Dict], limit: int) -> List[List[Dict]]:
+        """Exact search in the numpy index, reading documents back from Chroma for the hits"""
+        hits = self.search_index.search_batch(query_embeddings, self._normalize_filters(filter_criteria), limit)
+        return self._hydrate([[record_id for record_id, _ in query_hits] for query_hits in hits])
+
+    def _search_chroma(self, query_embeddings: np.ndarray, filter_criteria: Optional[Dict], limit: int) -> List[List[Dict]]:
+        """One Chroma query for all rows of the query matrix"""
+        results = self.collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+            where=self._where_clause(filter_criteria),
+            n_results=limit
+        )
+        # Filtered queries can return more than n_results hits (sorted by distance), trim them
+        return [
+            [
+                self._to_ticket(metadata, document, i)
+                for i, (metadata, document) in enumerate(zip(metadatas[:limit], documents[:limit]))
+            ]
+            for metadatas, documents in zip(results["metadatas"], results["documents"])
+        ]
+
+    def _search_rows(self, query_embeddings: np.ndarray, filter_criteria: Optional[Dict], limit: int) -> List[List[Dict]]:
+        """Results per row of a query matrix sharing one filter, from the configured backend"""
+        if self.search_index is not None:
+            return self._search_index(query_embeddings, filter_criteria, limit)
+        return self._search_chroma(query_embeddings, filter_criteria, limit)
+
+    def _search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        filter_criteria: Optional[List[Optional[Dict]]],
+        limit: int
+    ) -> List[List[Dict]]:
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        filter_criteria = filter_criteria or [None] * len(query_embeddings)
+        groups: Dict[str, List[int]] = {}
+        for row, criteria in enumerate(filter_criteria):
+            key = json.dumps(self._normalize_filters(criteria), sort_keys=True, default=str)
+            groups.setdefault(key, []).append(row)
+
+        results: List[List[Dict]] = [[] for _ in range(len(query_embeddings))]
+        for rows in groups.values():
+            group_results = self._search_rows(query_embeddings[rows], filter_criteria[rows[0]], limit)
+            for row, row_results in zip(rows, group_results):
+                results[row] = row_results
+        return results
+
+    def _lexical_search(self, query: str, filter_criteria: Optional[Dict], limit: int) -> List[Dict]:
+        if self.lexical_index is None:
+            return []
+        hits = [record_id for record_id, _ in self.lexical_index.search(query, settings.LEXICAL_MAX_CANDIDATES)]
+        where = self._where_clause(filter_criteria)
+        if where is not None and hits:
+            # Keep the lexical ranking, drop the hits the filters exclude
+            allowed = set(self.collection.get(ids=hits, where=where, include=[])["ids"])
+            hits = [record_id for record_id in hits if record_id in allowed]
+        return self._hydrate([hits[:limit]])[0]
+
+    async def lexical_search(
+        self,
+        query: str,
+        filter_criteria: Optional[Dict] = None,
+        limit: int = 5
+    ) -> List[Dict]:
+        """Tickets sharing keys and terms with the query text, best lexical match first"""
+        try:
+            # Index lookups and Chroma reads block, keep them off the event loop
+            return await asyncio.to_thread(self._lexical_search, query, filter_criteria, limit)
+
+        except Exception as e:
+            logging.error(f"Error in lexical search: {str(e)}", exc_info=True)
+            raise
 
     async def search(
         self,
@@ -204,67 +1317,120 @@ class VectorStore:
         Search for similar vectors
         """
         try:
-            # Convert numpy array to list for ChromaDB
-            embedding_list = query_embedding.tolist()
-            
-            # Prepare filter
-            where_clause = None
-            if filter_criteria:
-                conditions = []
-                for key, value in filter_criteria.items():
-                    if value:
-                        conditions.append({key: {"$eq": value}})
-                
-                if conditions:
-                    where_clause = {"$and": conditions} if len(conditions) > 1 else conditions[0]
-            
-            # Perform search
-            results = self.collection.query(
-                query_embeddings=[embedding_list],
-                where=where_clause,
-                n_results=limit
-            )
-            
-            # Process results
-            processed_results = []
-            if results["ids"] and results["ids"][0]:
-                for i in range(len(results["ids"][0])):
-                    metadata = results["metadatas"][0][i]
-                    document = results["documents"][0][i]
-                    
-                    # Extract steps from metadata
-                    steps = []
-                    if metadata.get("Steps"):
-                        steps = [step for step in metadata["Steps"].split("|") if step]
-                    
-                    # Create ticket data
-                    ticket_data = {
-                        "id": metadata.get("id", f"unknown_{i}"),
-                        "title": metadata.get("Summary", "No Title"),
-                        "description": document,
-                        "issue_type": metadata.get("Issue Type", ""),
-                        "affected_system": metadata.get("Affected System", ""),
-                        "status": metadata.get("Status", "Unknown"),
-                        "resolution": metadata.get("Resolution", ""),
-                        "steps": steps,
-                        "created_at": self._parse_date(metadata.get("Created", "")),
-                        "updated_at": self._parse_date(metadata.get("Updated", ""))
-                    }
-                    processed_results.append(ticket_data)
-            
-            return processed_results
+            query = np.asarray(query_embedding).reshape(1, -1)
+            return (await asyncio.to_thread(self._search_rows, query, filter_criteria, limit))[0]
             
         except Exception as e:
             logging.error(f"Error in vector store search: {str(e)}", exc_info=True)
             raise
 
+    async def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        filter_criteria: Optional[List[Optional[Dict]]] = None,
+        limit: int = 5
+    ) -> List[List[Dict]]:
+        """
+        Search for a matrix of query embeddings, one result list per row.
+        filter_criteria holds one filter per row (or None for no filters); rows
+        sharing a filter are answered by a single query.
+        """
+        try:
+            return await asyncio.to_thread(self._search_batch, query_embeddings, filter_criteria, limit)
+            
+        except Exception as e:
+            logging.error(f"Error in vector store batch search: {str(e)}", exc_info=True)
+            raise
+
+    def warm_up(self) -> Dict:
+        """
+        Load the search structures and run a query through them with a stored
+        embedding, so the first search does not pay for reading them from disk
+        """
+        start = time.perf_counter()
+        segments = self._get_index_segments()
+        sample = self.collection.get(include=["embeddings"], limit=1)
+        if sample["ids"]:
+            query = np.asarray(sample["embeddings"], dtype=np.float32).reshape(1, -1)
+            # The numpy backend scans the whole matrix, which pages it in
+            self._search_rows(query, None, 1)
+            if self.lexical_index is not None:
+                self.lexical_index.search(sample["ids"][0], 1)
+        result = {
+            "index_segments": len(segments),
+            "records": self.collection.count(),
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+        logging.info(f"Warmed up vector store: {result}")
+        return result
+
+    # Record field returned by iter_records -> Chroma include name
+    RECORD_FIELDS = {
+        "document": "documents",
+        "metadata": "metadatas",
+        "embedding": "embeddings"
+    }
+
+    def iter_records(
+        self,
+        filter_criteria: Optional[Dict] = None,
+        fields: Sequence[str] = ("document", "metadata"),
+        offset: int = 0,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Stored records matching the search filters, read from the collection one
+        page at a time. Each record has its ID plus the requested fields; limit
+        None reads to the end. Unknown fields raise ValueError right away, and
+        every page is read from the collection version active at the call.
+        """
+        unknown = [field for field in fields if field not in self.RECORD_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown record fields {unknown}, expected any of {list(self.RECORD_FIELDS)}")
+        # Pin the collection version, a reindex may swap it while paging
+        return self._iter_pages(
+            self.collection,
+            self._where_clause(filter_criteria),
+            list(fields),
+            offset,
+            limit,
+            page_size or settings.VECTOR_STORE_INSPECT_PAGE_SIZE
+        )
+
+    def _iter_pages(
+        self,
+        collection,
+        where: Optional[Dict],
+        fields: List[str],
+        offset: int,
+        limit: Optional[int],
+        page_size: int
+    ) -> Iterator[Dict]:
+        include = [self.RECORD_FIELDS[field] for field in fields]
+        while limit is None or limit > 0:
+            size = page_size if limit is None else min(page_size, limit)
+            page = collection.get(where=where, limit=size, offset=offset, include=include)
+            for i, record_id in enumerate(page["ids"]):
+                record = {"id": record_id}
+                for field in fields:
+                    value = page[self.RECORD_FIELDS[field]][i]
+                    record[field] = np.asarray(value, dtype=float).tolist() if field == "embedding" else value
+                yield record
+            if len(page["ids"]) < size:
+                return
+            offset += size
+            if limit is not None:
+                limit -= size
+
     def get_stats(self) -> Dict:
         """
         Get statistics about the vector store
         """
         try:
-            # Update and return stats
-            return self._update_stats()
+            # Cached snapshot, no collection or file access on this path
+            with self._stats_lock:
+                return dict(self._stats)
             
         except Exception as e:
             logging.error(f"Error getting stats: {e}")
@@ -303,18 +1469,14 @@ class VectorStore:
             return []
 
     def clear_all_data(self):
-        """Clear all data from the vector store"""
+        """
+        Clear all data from the vector store by swapping in a new, empty
+        collection version; searches already running finish on the old one
+        """
         try:
-            # Delete the collection
-            self.client.delete_collection("support_tickets")
-            
-            # Recreate the collection
-            self.collection = self.client.create_collection(
-                name="support_tickets",
-                metadata={"hnsw:space": "cosine", "dimension": 1536},  # Azure OpenAI dimension
-                embedding_function=AzureOpenAIEmbeddingFunction()
-            )
-            
+            # A version being built would bring the data back when activated
+            self.discard_version()
+            self.activate_version(self.create_version())
             logging.info("Successfully cleared all data from vector store")
             return True
         except Exception as e:
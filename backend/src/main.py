@@ -1,9 +1,12 @@
+import asyncio
 import logging
 import sys
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routes import admin, auth, search
 from src.core.config import settings
+from src.services.container import ServiceContainer
 
 # Configure logging
 logging.basicConfig(
@@ -19,10 +22,24 @@ logging.getLogger('src').setLevel(logging.DEBUG)
 logging.getLogger('chromadb').setLevel(logging.INFO)
 logging.getLogger('uvicorn').setLevel(logging.INFO)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared services once per worker and release them on shutdown"""
+    app.state.services = ServiceContainer()
+    # Warm up in the background: the worker accepts requests right away and
+    # /health reports it not ready until warm-up completes
+    warm_up = asyncio.create_task(app.state.services.warm_up())
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        await app.state.services.aclose()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    description="API for searching and managing support tickets"
+    description="API for searching and managing support tickets",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -44,5 +61,11 @@ async def root():
     return {"message": "Welcome to Support Ticket Search API"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+async def health_check(response: Response):
+    """Readiness for the load balancer: 503 until the worker has warmed up, or if warm-up failed"""
+    services = app.state.services
+    if not services.ready:
+        response.status_code = 503
+        status = "unhealthy" if services.warm_up_status["state"] == "failed" else "warming_up"
+        return {"status": status, "warm_up": services.warm_up_status}
+    return {"status": "healthy", "warm_up": services.warm_up_status}
@@ -34,5 +34,16 @@ class TicketSearch(BaseModel):
     description: str
     issue_type: Optional[str] = None
     affected_system: Optional[str] = None
+    status: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
     additional_details: Optional[str] = None
     num_results: int = 5
+
+class BatchSearchItem(TicketSearch):
+    generate_answer: bool = False  # Add an AI-generated resolution to the top result
+
+class BatchTicketSearch(BaseModel):
+    queries: List[BatchSearchItem]
@@ -0,0 +1,137 @@
+"""
+Sweep HNSW parameters against the support_tickets corpus and report query
+latency and recall@k against exact (brute-force) cosine search.
+
+The live collection is measured for each --search-ef value. Values of --m and
+--construction-ef other than the ones the collection was built with need a
+rebuilt index, so those combinations are built in an in-memory copy.
+
+Usage (from backend/):
+    python -m src.scripts.hnsw_sweep --k 5 --queries 200 --search-ef 10,20,50,100
+    python -m src.scripts.hnsw_sweep --m 16,32 --construction-ef 100,200
+"""
+from typing import Dict, List
+import argparse
+import logging
+import time
+import numpy as np
+import chromadb
+from src.db.vector_store import VectorStore, get_index_segment, set_index_search_ef
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def load_corpus(vector_store: VectorStore, page_size: int = 5000):
+    """All IDs and unit-length embeddings of the collection, paged to bound memory"""
+    count = vector_store.collection.count()
+    ids: List[str] = []
+    embeddings = np.empty((count, vector_store.embedding_service.dimension), dtype=np.float32)
+    for offset in range(0, count, page_size):
+        page = vector_store.collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        embeddings[len(ids):len(ids) + len(page["ids"])] = page["embeddings"]
+        ids.extend(page["ids"])
+    embeddings = embeddings[:len(ids)]
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    return ids, embeddings
+
+def make_queries(embeddings: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    """Perturbed copies of random tickets, so queries are near but not on stored points"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(embeddings), size=min(count, len(embeddings)), replace=False)
+    queries = embeddings[rows] + noise * rng.standard_normal((len(rows), embeddings.shape[1])).astype(np.float32) / np.sqrt(embeddings.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+def exact_neighbours(embeddings: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the true top-k by cosine similarity"""
+    scores = queries @ embeddings.T
+    top = np.argpartition(-scores, min(k, scores.shape[1] - 1), axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+def measure(collection, queries: np.ndarray, truth: List[set], k: int) -> Dict:
+    """Latency and recall@k of the collection's index for the given queries"""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected.intersection(result["ids"][0]))
+    latencies = np.array(latencies)
+    return {
+        "recall": hits / (len(truth) * k),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "mean_ms": float(latencies.mean())
+    }
+
+def build_copy(ids: List[str], embeddings: np.ndarray, m: int, construction_ef: int):
+    """In-memory collection with the same vectors and different build parameters"""
+    client = chromadb.EphemeralClient(settings=chromadb.Settings(anonymized_telemetry=False))
+    name = f"hnsw_sweep_m{m}_ef{construction_ef}"
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    collection = client.create_collection(
+        name=name,
+        metadata={"hnsw:space": "cosine", "hnsw:M": m, "hnsw:construction_ef": construction_ef}
+    )
+    for start in range(0, len(ids), client.max_batch_size):
+        end = start + client.max_batch_size
+        collection.add(ids=ids[start:end], embeddings=embeddings[start:end].tolist())
+    return client, collection
+
+def print_row(m: int, construction_ef: int, search_ef: int, result: Dict):
+    print(
+        f"{m:>4} {construction_ef:>8} {search_ef:>9} "
+        f"{result['recall']:>9.3f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['mean_ms']:>8.2f}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW latency/recall sweep for the support_tickets collection")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    parser.add_argument("--noise", type=float, default=0.3, help="Perturbation applied to sampled tickets")
+    parser.add_argument("--search-ef", type=parse_ints, default=[10, 20, 50, 100, 200])
+    parser.add_argument("--m", type=parse_ints, default=None, help="M values to rebuild with")
+    parser.add_argument("--construction-ef", type=parse_ints, default=None, help="construction_ef values to rebuild with")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vector_store = VectorStore()
+    live_params = vector_store.get_index_params()
+    ids, embeddings = load_corpus(vector_store)
+    if not ids:
+        print("The collection is empty, upload tickets first")
+        return
+
+    queries = make_queries(embeddings, args.queries, args.noise, args.seed)
+    truth = [{ids[row] for row in rows} for rows in exact_neighbours(embeddings, queries, args.k)]
+    print(f"Corpus: {len(ids)} tickets, {len(queries)} queries, recall@{args.k} against exact search")
+    print(f"{'M':>4} {'constr_ef':>8} {'search_ef':>9} {'recall':>9} {'p50_ms':>8} {'p95_ms':>8} {'mean_ms':>8}")
+
+    builds = [
+        (m, construction_ef)
+        for m in (args.m or [live_params["M"]])
+        for construction_ef in (args.construction_ef or [live_params["construction_ef"]])
+    ]
+    for m, construction_ef in builds:
+        if (m, construction_ef) == (live_params["M"], live_params["construction_ef"]):
+            client, collection = vector_store.client, vector_store.collection
+        else:
+            client, collection = build_copy(ids, embeddings, m, construction_ef)
+        segment = get_index_segment(client, collection)
+        if segment is None:
+            print("HNSW index not accessible, only the configured search_ef can be measured")
+            print_row(m, construction_ef, live_params["search_ef"], measure(collection, queries, truth, args.k))
+            continue
+        for search_ef in args.search_ef:
+            set_index_search_ef(segment, search_ef)
+            print_row(m, construction_ef, search_ef, measure(collection, queries, truth, args.k))
+        if collection is vector_store.collection:
+            set_index_search_ef(segment, live_params["search_ef"])
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
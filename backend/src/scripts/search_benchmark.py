@@ -0,0 +1,93 @@
+"""
+Compare the two search backends on the support_tickets corpus: Chroma's HNSW
+index and the exact in-process numpy index. Both run through
+VectorStore.search, so the timings include reading the hits' documents and
+metadata. Recall@k is measured against exact cosine search.
+
+Usage (from backend/):
+    python -m src.scripts.search_benchmark --k 5 --queries 200
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from collections import Counter
+import numpy as np
+from src.core.config import settings
+from src.db.numpy_index import NumpySearchIndex
+from src.db.vector_store import VectorStore
+from src.scripts.hnsw_sweep import exact_neighbours, load_corpus, make_queries
+
+async def run(vector_store: VectorStore, index: Optional[NumpySearchIndex], queries: np.ndarray,
+              truth: List[set], filter_criteria: Optional[Dict], k: int) -> Dict:
+    """Latency and recall@k of VectorStore.search with the given search index"""
+    vector_store.search_index = index
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = await vector_store.search(query, filter_criteria, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected.intersection(result["id"] for result in results))
+    latencies = np.array(latencies)
+    return {
+        "recall": hits / max(1, sum(len(expected) for expected in truth)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "qps": 1000 / float(latencies.mean())
+    }
+
+def filtered_truth(embeddings: np.ndarray, ids: List[str], mask: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    rows = np.flatnonzero(mask)
+    neighbours = exact_neighbours(embeddings[rows], queries, min(k, len(rows)))
+    return [{ids[rows[i]] for i in row} for row in neighbours]
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chroma vs numpy search backend benchmark")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vector_store = VectorStore()
+    live_index = vector_store.search_index
+    ids, embeddings = load_corpus(vector_store)
+    if not ids:
+        print("The collection is empty, upload tickets first")
+        return
+    queries = make_queries(embeddings, args.queries, args.noise, args.seed)
+
+    # Filter on the most common affected system, as agents usually do
+    systems = []
+    for offset in range(0, len(ids), 5000):
+        page = vector_store.collection.get(include=["metadatas"], limit=5000, offset=offset)
+        systems.extend((metadata or {}).get("Affected System", "") for metadata in page["metadatas"])
+    system, _ = Counter(systems).most_common(1)[0]
+    scenarios = [
+        ("unfiltered", None, [{ids[row] for row in rows} for rows in exact_neighbours(embeddings, queries, args.k)]),
+        (f"affected_system={system!r}", {"affected_system": system},
+         filtered_truth(embeddings, ids, np.array(systems) == system, queries, args.k))
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = NumpySearchIndex(directory, settings.EMBEDDING_DIMENSION)
+        start = time.perf_counter()
+        index.sync(vector_store.collection)
+        print(f"Corpus: {len(ids)} tickets, {len(queries)} queries, numpy index built in {time.perf_counter() - start:.2f}s")
+        print(f"{'scenario':<40} {'backend':<8} {'recall':>7} {'p50_ms':>8} {'p95_ms':>8} {'qps':>8}")
+        for name, filter_criteria, truth in scenarios:
+            for backend, search_index in (("chroma", None), ("numpy", index)):
+                result = await run(vector_store, search_index, queries, truth, filter_criteria, args.k)
+                print(
+                    f"{name:<40} {backend:<8} {result['recall']:>7.3f} "
+                    f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['qps']:>8.1f}"
+                )
+        index.close()
+    vector_store.search_index = live_index
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
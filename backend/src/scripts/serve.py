@@ -0,0 +1,61 @@
+"""
+Run the API on several worker processes sharing one vector store: starts a
+local Chroma server on CHROMA_PERSIST_DIRECTORY, prepares the store once
+(metadata migrations, partition layout, leftover versions) and runs uvicorn
+with every worker connected to the server through CHROMA_SERVER_URL. The
+server is stopped when uvicorn exits.
+
+Usage (from backend/):
+    python -m src.scripts.serve --workers 4 --port 8080 --chroma-port 8001
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import uvicorn
+from src.core.config import settings
+from src.db.vector_store import VectorStore
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with a shared Chroma server")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--chroma-port", type=int, default=8001)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.chroma_port}"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "chromadb.cli.cli", "run",
+            "--path", settings.CHROMA_PERSIST_DIRECTORY,
+            "--host", "127.0.0.1",
+            "--port", str(args.chroma_port)
+        ],
+        env={**os.environ, "ANONYMIZED_TELEMETRY": "False"}
+    )
+    try:
+        # Workers read their settings from the environment
+        os.environ["CHROMA_SERVER_URL"] = url
+        settings.CHROMA_SERVER_URL = url
+        # Startup migrations run here once, instead of in every worker at the same time
+        vector_store = VectorStore()
+        # No worker runs yet, so a reindex recorded as running was cut short
+        vector_store.drop_unfinished_version()
+        vector_store.close()
+        uvicorn.run(
+            "src.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,39 @@
+"""
+Export the vector store to a binary snapshot, or restore one without
+re-embedding.
+
+Usage (from backend/):
+    python -m src.scripts.snapshot export data/snapshots/nightly
+    python -m src.scripts.snapshot import data/snapshots/nightly --replace
+"""
+import argparse
+import asyncio
+import logging
+from src.db.snapshot import export_snapshot, import_snapshot
+from src.db.vector_store import VectorStore
+
+async def main():
+    parser = argparse.ArgumentParser(description="Vector store snapshot export/import")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Write the collection to a snapshot directory")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--page-size", type=int, default=5000)
+    import_parser = subparsers.add_parser("import", help="Load a snapshot into the collection")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--replace", action="store_true", help="Replace the stored records with the snapshot")
+    args = parser.parse_args()
+
+    vector_store = VectorStore()
+    try:
+        if args.command == "export":
+            manifest = export_snapshot(vector_store, args.path, page_size=args.page_size)
+            print(f"Exported {manifest['count']} records to {args.path}")
+        else:
+            result = await import_snapshot(vector_store, args.path, replace=args.replace)
+            print(f"Imported {result['records']} records from {args.path} in {result['seconds']}s")
+    finally:
+        vector_store.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,21 +1,37 @@
 from src.core.config import settings
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 from datetime import datetime
+import asyncio
 import logging
+import re
 import tempfile
 from fastapi import UploadFile
 from src.db.vector_store import VectorStore
-from src.services.markdown_converter import MarkdownConverter
+from src.db.snapshot import export_snapshot, import_snapshot, read_manifest
+from src.services.data_processing import DataProcessingService
+from src.services.http_transport import get_shared_transport
+from src.services.query_cache import get_query_embedding_cache
+from src.services.rate_limiter import get_rate_limiter_stats
 from src.utils.file_utils import get_directory_size
 
 class AdminService:
-    def __init__(self):
-        self.vector_store = VectorStore()
-        self.markdown_converter = MarkdownConverter()
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        data_processing_service: Optional[DataProcessingService] = None
+    ):
+        self.vector_store = vector_store or VectorStore()
+        self.data_processing_service = data_processing_service or DataProcessingService(
+            embedding_service=self.vector_store.embedding_service,
+            vector_store=self.vector_store
+        )
         self.markdown_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "markdown")
         os.makedirs(self.markdown_dir, exist_ok=True)
+        self.snapshot_dir = settings.SNAPSHOT_DIRECTORY
+        self._reindex_task: Optional[asyncio.Task] = None
+        self._reindex_status: Dict = {"state": "idle"}
 
     def _count_markdown_files(self) -> int:
         """Count markdown files recursively"""
@@ -43,6 +59,12 @@ class AdminService:
                     "markdown_size_mb": markdown_size / (1024 * 1024),
                     "vector_store_size_mb": vector_store_size / (1024 * 1024)
                 },
+                "rate_limits": get_rate_limiter_stats(),
+                "query_cache": get_query_embedding_cache().get_stats(),
+                "http_transport": get_shared_transport().get_stats(),
+                "partitions": self.vector_store.get_partition_counts(),
+                "collection_version": self.vector_store.get_version_info(),
+                "lexical_index": self.vector_store.lexical_index.get_stats() if self.vector_store.lexical_index else None,
                 "last_updated": datetime.now().isoformat(),
                 "vector_store_healthy": True
             }
@@ -50,8 +72,8 @@ class AdminService:
             logging.error(f"Error getting stats: {str(e)}")
             raise
 
-    def process_file(self, file: UploadFile) -> Dict:
-        """Process uploaded file"""
+    async def process_file(self, file: UploadFile) -> Dict:
+        """Process uploaded file, embedding only new or changed tickets"""
         if not file.filename.endswith('.csv'):
             raise ValueError("Only CSV files are supported")
             
@@ -60,7 +82,7 @@ class AdminService:
             # Save uploaded file to temp file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
                 temp_file_path = temp_file.name
-                content = file.file.read()
+                content = await file.read()
                 temp_file.write(content)
             
             # Read CSV file
@@ -68,17 +90,14 @@ class AdminService:
             if df.empty:
                 raise ValueError("CSV file is empty")
                 
-            # Convert to markdown
-            markdown_chunks = self.markdown_converter.convert_dataframe(df)
-            if not markdown_chunks:
-                raise ValueError("No valid data found in CSV")
-                
-            # Add to vector store
-            self.vector_store.add_records(markdown_chunks)
+            # Upsert into vector store
+            result = await self.data_processing_service.process_csv(temp_file_path)
             
             return {
-                "success": True,
-                "processed_records": len(markdown_chunks)
+                "success": result["failed_records"] == 0,
+                "processed_records": result["processed_records"],
+                "skipped_records": result["skipped_records"],
+                "failed_records": result["failed_records"]
             }
             
         except Exception as e:
@@ -87,3 +106,113 @@ class AdminService:
         finally:
             if temp_file_path and os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
+
+    def _snapshot_path(self, name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", name) or name.startswith("."):
+            raise ValueError(f"Invalid snapshot name: {name}")
+        return os.path.join(self.snapshot_dir, name)
+
+    def list_snapshots(self) -> List[Dict]:
+        """Snapshots in the snapshot directory, newest first"""
+        snapshots = []
+        if not os.path.isdir(self.snapshot_dir):
+            return snapshots
+        for name in os.listdir(self.snapshot_dir):
+            path = os.path.join(self.snapshot_dir, name)
+            if name.endswith(".tmp") or not os.path.isdir(path):
+                continue
+            try:
+                manifest = read_manifest(path)
+            except Exception as e:
+                logging.warning(f"Skipping unreadable snapshot {name}: {str(e)}")
+                continue
+            snapshots.append({
+                "name": name,
+                "records": manifest["count"],
+                "dimension": manifest["dimension"],
+                "created_at": manifest["created_at"],
+                "size_mb": get_directory_size(path) / (1024 * 1024)
+            })
+        return sorted(snapshots, key=lambda snapshot: snapshot["created_at"], reverse=True)
+
+    async def create_snapshot(self, name: Optional[str] = None) -> Dict:
+        """Export the vector store to a new snapshot"""
+        name = name or datetime.now().strftime("snapshot-%Y%m%d-%H%M%S")
+        path = self._snapshot_path(name)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        manifest = await asyncio.to_thread(export_snapshot, self.vector_store, path)
+        return {
+            "name": name,
+            "records": manifest["count"],
+            "created_at": manifest["created_at"]
+        }
+
+    async def restore_snapshot(self, name: str, replace: bool = False) -> Dict:
+        """Load a snapshot into the vector store without re-embedding"""
+        path = self._snapshot_path(name)
+        if not os.path.isdir(path):
+            raise ValueError(f"Snapshot not found: {name}")
+        return await import_snapshot(self.vector_store, path, replace=replace)
+
+    async def start_reindex(self, file: Optional[UploadFile] = None, empty: bool = False) -> Dict:
+        """
+        Rebuild the vector store into a new collection version in the background,
+        from an uploaded CSV, empty, or, by default, from the stored vectors.
+        Searches keep using the active version until the new one is swapped in.
+        """
+        if self._reindex_task is not None and not self._reindex_task.done():
+            raise ValueError("A reindex is already running")
+
+        temp_file_path = None
+        if file is not None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
+                temp_file_path = temp_file.name
+                temp_file.write(await file.read())
+        try:
+            collection = await asyncio.to_thread(self.vector_store.create_version)
+        except Exception:
+            if temp_file_path:
+                os.unlink(temp_file_path)
+            raise
+
+        self._reindex_status = {
+            "state": "running",
+            "collection": collection.name,
+            "source": file.filename if file is not None else "empty" if empty else "stored vectors",
+            "started_at": datetime.now().isoformat()
+        }
+        self._reindex_task = asyncio.create_task(self._run_reindex(collection, temp_file_path, empty))
+        return dict(self._reindex_status)
+
+    async def _run_reindex(self, collection, file_path: Optional[str], empty: bool = False):
+        try:
+            if file_path:
+                result = await self.data_processing_service.process_csv(file_path, collection=collection)
+                if result["failed_records"]:
+                    raise ValueError(f"{result['failed_records']} records failed to load")
+                records = result["processed_records"]
+            elif empty:
+                records = 0
+            else:
+                records = await asyncio.to_thread(self.vector_store.copy_to_version, collection)
+            await asyncio.to_thread(self.vector_store.activate_version, collection)
+            self._reindex_status.update({"state": "completed", "records": records})
+            logging.info(f"Reindexed {records} records into {collection.name}")
+        except Exception as e:
+            logging.error(f"Error reindexing into {collection.name}: {str(e)}", exc_info=True)
+            await asyncio.to_thread(self.vector_store.discard_version)
+            self._reindex_status.update({"state": "failed", "error": str(e)})
+        finally:
+            self._reindex_status["finished_at"] = datetime.now().isoformat()
+            if file_path and os.path.exists(file_path):
+                os.unlink(file_path)
+
+    async def clear_data(self) -> Dict:
+        """Swap in an empty collection version and wait for the swap"""
+        await self.start_reindex(empty=True)
+        await self._reindex_task
+        return self.get_reindex_status()
+
+    def get_reindex_status(self) -> Dict:
+        """State of the last reindex and the active collection version"""
+        return {**self._reindex_status, "versions": self.vector_store.get_version_info()}
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from src.core.config import settings
+from src.db.vector_store import VectorStore
+from src.services.admin import AdminService
+from src.services.data_processing import DataProcessingService
+from src.services.embedding import EmbeddingService
+from src.services.http_transport import get_shared_transport
+from src.services.llm_providers import get_llm_provider
+from src.services.query_batcher import EmbeddingCoalescer
+from src.services.search import SearchService
+
+class ServiceContainer:
+    """
+    Application-scoped services, created once per worker at startup and shared
+    by every request. Building them per request meant a new Chroma client,
+    collection lookup and OpenAI clients on each call.
+    """
+    def __init__(self):
+        logging.info("Creating application services")
+        # Set once warm_up has run; /health reports not ready until then
+        self.ready = False
+        self.warm_up_status = {"state": "pending", "steps": {}}
+        self.embedding_service = EmbeddingService()
+        self.vector_store = VectorStore(embedding_service=self.embedding_service)
+        self.query_coalescer = EmbeddingCoalescer(
+            self.embedding_service,
+            window_ms=settings.QUERY_BATCH_WINDOW_MS,
+            max_batch=settings.QUERY_BATCH_MAX_SIZE
+        )
+        self.search_service = SearchService(
+            vector_store=self.vector_store,
+            embedding_service=self.embedding_service,
+            query_coalescer=self.query_coalescer
+        )
+        self.data_processing_service = DataProcessingService(
+            embedding_service=self.embedding_service,
+            vector_store=self.vector_store
+        )
+        self.admin_service = AdminService(
+            vector_store=self.vector_store,
+            data_processing_service=self.data_processing_service
+        )
+
+    async def warm_up(self):
+        """
+        Do the work the first search would otherwise pay for: open the OpenAI
+        connections, load the vector index and run a synthetic query through it,
+        and embed WARMUP_QUERY through the query path. Every step runs; the
+        worker reports ready only if none of them failed.
+        """
+        start = time.perf_counter()
+        self.warm_up_status["state"] = "running"
+        steps = self.warm_up_status["steps"]
+
+        async def run_step(name: str, step):
+            step_start = time.perf_counter()
+            try:
+                result = await step()
+                steps[name] = {"ok": True, "seconds": round(time.perf_counter() - step_start, 3)}
+                if isinstance(result, dict):
+                    steps[name].update(result)
+            except Exception as e:
+                logging.error(f"Error warming up {name}: {e}")
+                steps[name] = {"ok": False, "error": str(e)}
+
+        async def warm_up_query():
+            if not settings.WARMUP_QUERY:
+                return None
+            embedding = await self.query_coalescer.embed(settings.WARMUP_QUERY)
+            self.search_service.query_cache.put(settings.WARMUP_QUERY, embedding)
+            await self.vector_store.search(embedding, limit=1)
+            self.search_service.token_counter.count(settings.WARMUP_QUERY)
+
+        await run_step("connections", get_llm_provider().warm_up)
+        await run_step("vector_store", lambda: asyncio.to_thread(self.vector_store.warm_up))
+        await run_step("query", warm_up_query)
+
+        seconds = round(time.perf_counter() - start, 3)
+        failed = [name for name, step in steps.items() if not step["ok"]]
+        if failed:
+            # A worker that could not reach its dependencies stays out of rotation
+            self.warm_up_status.update({"state": "failed", "failed_steps": failed, "seconds": seconds})
+            logging.error(f"Warm-up failed in {seconds}s, steps: {failed}")
+            return
+        self.warm_up_status.update({"state": "completed", "seconds": seconds})
+        self.ready = True
+        logging.info(f"Warm-up completed in {seconds}s")
+
+    async def aclose(self):
+        """Release connections held by the services on shutdown"""
+        logging.info("Shutting down application services")
+        for name, close in [
+            ("search service", self.search_service.aclose),
+            ("embedding service", self.embedding_service.aclose),
+            ("vector store", lambda: asyncio.to_thread(self.vector_store.close)),
+            # The services' clients share its pools; closing them again is a no-op
+            ("HTTP transport", get_shared_transport().aclose)
+        ]:
+            try:
+                await close()
+            except Exception as e:
+                logging.error(f"Error closing {name}: {e}")
@@ -1,21 +1,128 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from collections import deque
+import asyncio
+import logging
 import pandas as pd
 from datetime import datetime
+from src.core.config import settings
 from src.services.embedding import EmbeddingService
 from src.db.vector_store import VectorStore
 import re
 
 class DataProcessingService:
-    def __init__(self):
-        self.embedding_service = EmbeddingService()
-        self.vector_store = VectorStore()
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        vector_store: Optional[VectorStore] = None
+    ):
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.vector_store = vector_store or VectorStore(embedding_service=self.embedding_service)
 
-    async def process_csv(self, file_path: str, chunk_size: int = 50) -> Dict[str, Any]:
+    @staticmethod
+    def _ticket_key(row: pd.Series) -> Optional[str]:
+        """Ticket key used as the stable record ID, if the export has one"""
+        for column in ('Issue id', 'Issue key'):
+            value = row.get(column)
+            if value is not None and pd.notna(value) and str(value).strip():
+                return value
+        return None
+
+    @staticmethod
+    def _issue_key(row: pd.Series) -> str:
+        """Human-readable ticket key (e.g. SUP-123), the one users search for"""
+        value = row.get('Issue key')
+        if value is None or not pd.notna(value):
+            return ''
+        return str(value).strip()
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> Any:
+        """Parse an export timestamp; missing values stay empty so the content hash is stable"""
+        if value is None or not pd.notna(value) or not str(value).strip():
+            return ''
+        return datetime.strptime(str(value), '%d-%m-%Y %H:%M')
+
+    def _build_record(self, row: pd.Series) -> Dict[str, Any]:
+        """Turn one CSV row into a vector store record, without the embedding"""
+        # Extract resolution information from multiple fields
+        resolution_note = row.get('Custom field (Resolution Note)', '')
+        root_cause_details = row.get('Custom field (Root Cause Details)', '')
+        bug_resolution = row.get('Custom field (Bug Resolution)', '')
+        root_cause = row.get('Custom field (Root Cause)', '')
+        
+        # Combine resolution information
+        resolution_text = "\n".join(filter(None, [
+            f"Resolution: {bug_resolution}" if bug_resolution else "",
+            f"Root Cause: {root_cause}" if root_cause else "",
+            resolution_note,
+            root_cause_details
+        ]))
+        
+        # Extract steps from resolution text
+        steps = []
+        
+        # Split text into potential steps
+        if resolution_note or root_cause_details:
+            text_to_parse = "\n".join(filter(None, [resolution_note, root_cause_details]))
+            # Split by common separators
+            sentences = re.split(r'(?<=[.!?])\s+|\n+|(?<=\d\.)\s+', text_to_parse)
+            
+            for sentence in sentences:
+                sentence = sentence.strip()
+                # Skip empty or very short sentences
+                if len(sentence) < 10:
+                    continue
+                # Skip greetings and common non-step text
+                if re.match(r'^(hi|hello|thank|regards|please find|attached)', sentence.lower()):
+                    continue
+                # Skip sentences that are just file names or paths
+                if sentence.lower().endswith(('.xlsx', '.pdf', '.doc')):
+                    continue
+                steps.append(sentence)
+        
+        # Add resolution type and root cause as context
+        if bug_resolution:
+            steps.insert(0, f"Issue Resolution Type: {bug_resolution}")
+        if root_cause:
+            steps.insert(1, f"Root Cause: {root_cause}")
+        
+        return {
+            "id": self._ticket_key(row),
+            "issue_key": self._issue_key(row),
+            "title": row['Summary'],
+            "description": resolution_text,
+            "issue_type": row.get('Issue Type', ''),
+            "affected_system": row.get('Custom field (Section/Asset Team)', ''),
+            "status": row['Status'],
+            "resolution": resolution_text,
+            "steps": steps,
+            "created_at": self._parse_timestamp(row.get('Created')),
+            "updated_at": self._parse_timestamp(row.get('Updated')),
+            "embedding_text": f"Title: {row['Summary']}\nDescription: {resolution_note}\n{root_cause_details}"
+        }
+
+    def _changed_records(self, chunk: pd.DataFrame, collection=None) -> List[Dict[str, Any]]:
+        """Build the records of a chunk, leaving out tickets whose content is already stored"""
+        records = [self._build_record(row) for _, row in chunk.iterrows()]
+        for record in records:
+            record["content_hash"] = self.vector_store.content_hash(record)
+        stored_hashes = self.vector_store.get_content_hashes(
+            [self.vector_store.record_id(record) for record in records],
+            collection
+        )
+        return [
+            record for record in records
+            if stored_hashes.get(self.vector_store.record_id(record)) != record["content_hash"]
+        ]
+
+    async def process_csv(self, file_path: str, chunk_size: Optional[int] = None, collection=None) -> Dict[str, Any]:
         """
         Process a CSV file containing support tickets
         Args:
             file_path: Path to the CSV file
-            chunk_size: Number of records to process at once
+            chunk_size: Number of records to process at once, by default one
+                embeddings request worth (EMBEDDING_MAX_BATCH_ITEMS)
+            collection: Collection version being built to load into, instead of the active one
         Returns:
             Dict containing processing statistics
         """
@@ -33,97 +140,75 @@ class DataProcessingService:
             stats = {
                 "total_records": len(df),
                 "processed_records": 0,
+                "skipped_records": 0,
                 "failed_records": 0,
                 "start_time": datetime.now()
             }
 
-            # Process in chunks
-            for i in range(0, len(df), chunk_size):
-                chunk = df.iloc[i:i + chunk_size]
-                
+            # A chunk fills one embeddings request; chunks over the token budget
+            # are packed into several full requests by the embedding service
+            chunk_size = chunk_size or settings.EMBEDDING_MAX_BATCH_ITEMS
+
+            # Writes go out in large batches, not one per chunk
+            async with self.vector_store.bulk_load(collection) as loader:
+                # Embedding requests of up to EMBEDDING_MAX_IN_FLIGHT chunks overlap;
+                # results are buffered in chunk order, so later rows still win
+                pending = deque()
+
+                async def finish_oldest():
+                    index, changed, embedding_task = pending.popleft()
+                    try:
+                        embeddings = await embedding_task
+                        for record, embedding in zip(changed, embeddings):
+                            record["embedding"] = embedding
+                        # Buffer for the next bulk write
+                        await loader.add_records(changed)
+                        stats["processed_records"] += len(changed)
+                    except Exception as e:
+                        logging.error(f"Error processing chunk {index}: {str(e)}")
+                        stats["failed_records"] += len(changed)
+
                 try:
-                    # Prepare texts for embedding
-                    texts = [
-                        f"Title: {row['Summary']}\nDescription: {row.get('Custom field (Resolution Note)', '')}\n{row.get('Custom field (Root Cause Details)', '')}"
-                        for _, row in chunk.iterrows()
-                    ]
-                    
-                    # Generate embeddings
-                    embeddings = await self.embedding_service.batch_generate_embeddings(texts)
-                    
-                    # Prepare records for vector store
-                    records = []
-                    for j, (_, row) in enumerate(chunk.iterrows()):
-                        # Extract resolution information from multiple fields
-                        resolution_note = row.get('Custom field (Resolution Note)', '')
-                        root_cause_details = row.get('Custom field (Root Cause Details)', '')
-                        bug_resolution = row.get('Custom field (Bug Resolution)', '')
-                        root_cause = row.get('Custom field (Root Cause)', '')
-                        
-                        # Combine resolution information
-                        resolution_text = "\n".join(filter(None, [
-                            f"Resolution: {bug_resolution}" if bug_resolution else "",
-                            f"Root Cause: {root_cause}" if root_cause else "",
-                            resolution_note,
-                            root_cause_details
-                        ]))
-                        
-                        # Extract steps from resolution text
-                        steps = []
-                        
-                        # Split text into potential steps
-                        if resolution_note or root_cause_details:
-                            text_to_parse = "\n".join(filter(None, [resolution_note, root_cause_details]))
-                            # Split by common separators
-                            sentences = re.split(r'(?<=[.!?])\s+|\n+|(?<=\d\.)\s+', text_to_parse)
-                            
-                            for sentence in sentences:
-                                sentence = sentence.strip()
-                                # Skip empty or very short sentences
-                                if len(sentence) < 10:
-                                    continue
-                                # Skip greetings and common non-step text
-                                if re.match(r'^(hi|hello|thank|regards|please find|attached)', sentence.lower()):
-                                    continue
-                                # Skip sentences that are just file names or paths
-                                if sentence.lower().endswith(('.xlsx', '.pdf', '.doc')):
-                                    continue
-                                steps.append(sentence)
-                        
-                        # Add resolution type and root cause as context
-                        if bug_resolution:
-                            steps.insert(0, f"Issue Resolution Type: {bug_resolution}")
-                        if root_cause:
-                            steps.insert(1, f"Root Cause: {root_cause}")
-                        
-                        record = {
-                            "id": row.get('Issue id', i + j),
-                            "title": row['Summary'],
-                            "description": resolution_text,
-                            "issue_type": row.get('Issue Type', ''),
-                            "affected_system": row.get('Custom field (Section/Asset Team)', ''),
-                            "status": row['Status'],
-                            "resolution": resolution_text,
-                            "steps": steps,
-                            "created_at": datetime.strptime(row['Created'], '%d-%m-%Y %H:%M') if row.get('Created') else datetime.now(),
-                            "updated_at": datetime.strptime(row['Updated'], '%d-%m-%Y %H:%M') if row.get('Updated') else datetime.now(),
-                            "embedding": embeddings[j]
-                        }
-                        records.append(record)
-                    
-                    # Add to vector store
-                    await self.vector_store.add_records(records)
-                    
-                    stats["processed_records"] += len(chunk)
-                    
-                except Exception as e:
-                    print(f"Error processing chunk {i//chunk_size}: {str(e)}")
-                    stats["failed_records"] += len(chunk)
+                    # Process in chunks
+                    for i in range(0, len(df), chunk_size):
+                        chunk = df.iloc[i:i + chunk_size]
+                        try:
+                            changed = await asyncio.to_thread(self._changed_records, chunk, collection)
+                        except Exception as e:
+                            logging.error(f"Error processing chunk {i//chunk_size}: {str(e)}")
+                            stats["failed_records"] += len(chunk)
+                            continue
+                        stats["skipped_records"] += len(chunk) - len(changed)
+                        if not changed:
+                            continue
+
+                        # Generate embeddings for new and modified tickets only
+                        texts = [record.pop("embedding_text") for record in changed]
+                        pending.append((
+                            i // chunk_size,
+                            changed,
+                            asyncio.create_task(self.embedding_service.batch_generate_embeddings(texts))
+                        ))
+                        if len(pending) >= settings.EMBEDDING_MAX_IN_FLIGHT:
+                            await finish_oldest()
+                    while pending:
+                        await finish_oldest()
+                finally:
+                    for _, _, embedding_task in pending:
+                        embedding_task.cancel()
+            
+            # Records buffered from earlier chunks can fail in a later write
+            stats["processed_records"] -= len(loader.failed_ids)
+            stats["failed_records"] += len(loader.failed_ids)
+            stats["write_throughput"] = loader.get_stats()
 
             # Calculate final statistics
             stats["end_time"] = datetime.now()
             stats["processing_time"] = (stats["end_time"] - stats["start_time"]).total_seconds()
-            stats["success_rate"] = (stats["processed_records"] / stats["total_records"]) * 100
+            stats["success_rate"] = (
+                (stats["processed_records"] + stats["skipped_records"]) / stats["total_records"] * 100
+                if stats["total_records"] else 100.0
+            )
             
             return stats
             
@@ -1,57 +1,414 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import numpy as np
-from openai import AzureOpenAI
-import httpx
+import openai
 import urllib3
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
 from src.core.config import settings
+from src.services.llm_providers import get_llm_provider
+from src.services.rate_limiter import get_rate_limiter
+from src.utils.token_utils import get_token_counter, pack_batches
+
+class EmbeddingCache:
+    """
+    Disk-backed, content-addressed cache of embedding vectors.
+    Keys are a hash of the model name and the normalized text, values are float32 blobs.
+    """
+    # SQLite limits the number of bound parameters per statement
+    _MAX_PARAMS = 500
+
+    def __init__(self, path: str, max_entries: int):
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        logging.info(f"Opened embedding cache at {path} with {self._count} entries")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so trivially different copies of a text share one entry"""
+        return " ".join(str(text).split())
+
+    @staticmethod
+    def make_key(normalized_text: str, model: str) -> str:
+        """Build the content-addressed key for a normalized text"""
+        return hashlib.sha256(f"{model}\x00{normalized_text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys, marking them as recently used"""
+        found = {}
+        if not keys:
+            return found
+
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), self._MAX_PARAMS):
+                chunk = keys[i:i + self._MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                if rows:
+                    hit_keys = [row[0] for row in rows]
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(hit_keys))})",
+                        [now, *hit_keys]
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Store vectors and evict the least recently used entries beyond the size limit"""
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows
+            )
+            self._count += self._conn.total_changes - before
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the oldest entries down to 90% of the limit so eviction is amortized"""
+        target = int(self.max_entries * 0.9)
+        excess = self._count - target
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        logging.info(f"Evicted {excess} entries from embedding cache, {self._count} remaining")
+
+    def count(self) -> int:
+        """Number of cached vectors"""
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache, or None when caching is disabled"""
+    global _embedding_cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                settings.EMBEDDING_CACHE_PATH,
+                settings.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+    return _embedding_cache
 
 class EmbeddingService:
-    def __init__(self):
-        self.client = AzureOpenAI(
-            api_key=settings.AZURE_OPENAI_API_KEY,
-            api_version=settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-            default_headers={"Accept": "application/json"},
-            http_client=httpx.Client(verify=False)  # Skip SSL verification for internal endpoints
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
+        self.model = "text-embedding-ada-002"
+        self.dimension = settings.EMBEDDING_DIMENSION
+        # Switched off for the lifetime of the service if the endpoint rejects base64
+        self.use_base64 = settings.EMBEDDING_BASE64_ENCODING
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.token_counter = get_token_counter(self.model)
+        self.rate_limiter = get_rate_limiter("embeddings")
+        self.max_in_flight = settings.EMBEDDING_MAX_IN_FLIGHT
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        provider = get_llm_provider()
+        # Synchronous client, used by Chroma's embedding function
+        self.client = provider.create_client()
+        # Asynchronous client, used from request handlers and ingestion
+        self.async_client = provider.create_async_client()
+
+    async def aclose(self):
+        """Release the HTTP connections held by the clients"""
+        self.client.close()
+        await self.async_client.close()
+
+    def _prepare_batch(self, texts: List[str]) -> Tuple[List[str], Dict[str, str], Dict[str, np.ndarray], List[str]]:
+        """
+        Map each input to its content key and look the unique keys up in the cache.
+        Returns the per-input keys, the text to send per unique key, the cached
+        vectors and the keys that still have to be requested.
+        """
+        # Disable SSL verification warnings since we may be using an internal endpoint
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        keys = []
+        unique_texts = {}
+        for text in texts:
+            normalized = EmbeddingCache.normalize(text)
+            key = EmbeddingCache.make_key(normalized, self.model)
+            keys.append(key)
+            unique_texts.setdefault(key, normalized)
+
+        vectors = self.cache.get_many(list(unique_texts)) if self.cache else {}
+        misses = [key for key in unique_texts if key not in vectors]
+        if len(texts) > 1:
+            logging.info(
+                f"Embedding {len(texts)} texts: {len(unique_texts)} unique, "
+                f"{len(unique_texts) - len(misses)} cached, {len(misses)} to request"
+            )
+        return keys, unique_texts, vectors, misses
+
+    def _plan_requests(self, unique_texts: Dict[str, str], misses: List[str], max_items: int) -> Tuple[List[str], List[str], List[int], List[List[int]]]:
+        """
+        Turn cache misses into request pieces and pack them into batches by token
+        count. Inputs longer than the model's context are split or truncated
+        according to EMBEDDING_OVERFLOW_STRATEGY.
+        Returns the piece texts, the key each piece belongs to, the token count per
+        piece and the batches as lists of piece indices.
+        """
+        max_input_tokens = settings.EMBEDDING_MAX_INPUT_TOKENS
+        pieces = []
+        owners = []
+        piece_tokens = []
+        for key in misses:
+            text = unique_texts[key]
+            tokens = self.token_counter.count(text)
+            if tokens <= max_input_tokens:
+                parts = [(text, tokens)]
+            elif settings.EMBEDDING_OVERFLOW_STRATEGY == "split":
+                logging.warning(f"Splitting input of {tokens} tokens into pieces of {max_input_tokens}")
+                parts = [
+                    (part, min(self.token_counter.count(part), max_input_tokens))
+                    for part in self.token_counter.split(text, max_input_tokens)
+                ]
+            else:
+                logging.warning(f"Truncating input of {tokens} tokens to {max_input_tokens}")
+                parts = [(self.token_counter.truncate(text, max_input_tokens), max_input_tokens)]
+
+            for part, part_tokens in parts:
+                pieces.append(part)
+                owners.append(key)
+                piece_tokens.append(part_tokens)
+
+        batches = pack_batches(piece_tokens, settings.EMBEDDING_MAX_BATCH_TOKENS, max_items)
+        if batches:
+            logging.info(
+                f"Packed {len(pieces)} inputs ({sum(piece_tokens)} tokens) into {len(batches)} requests"
+            )
+        return pieces, owners, piece_tokens, batches
+
+    def _combine_pieces(self, owners: List[str], piece_tokens: List[int], piece_vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Collect one vector per key. Inputs that were split get the token-weighted
+        mean of their pieces, rescaled to unit length like the model's own output.
+        """
+        grouped = {}
+        for key, tokens, vector in zip(owners, piece_tokens, piece_vectors):
+            grouped.setdefault(key, []).append((tokens, vector))
+
+        vectors = {}
+        for key, parts in grouped.items():
+            if len(parts) == 1:
+                vectors[key] = parts[0][1]
+                continue
+            weights = np.array([tokens for tokens, _ in parts], dtype=np.float32)
+            mean = np.average(np.stack([vector for _, vector in parts]), axis=0, weights=weights)
+            vectors[key] = (mean / np.linalg.norm(mean)).astype(np.float32)
+        return vectors
+
+    @staticmethod
+    def _decode_into(response, batch: List[int], out: np.ndarray):
+        """
+        Write the vectors of an embeddings response into their rows of a
+        preallocated float32 matrix. Base64 payloads are decoded with
+        np.frombuffer; endpoints that send float lists are handled too.
+        """
+        for data in response.data:
+            embedding = data.embedding
+            if isinstance(embedding, str):
+                out[batch[data.index]] = np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+            else:
+                out[batch[data.index]] = embedding
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray):
+        """Scale every row of a matrix to unit length, in place"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+    def _is_base64_rejection(self, error: Exception) -> bool:
+        """Whether an error means the endpoint does not accept encoding_format=base64"""
+        if isinstance(error, openai.BadRequestError) and "encoding_format" in str(error):
+            logging.warning("Embeddings endpoint rejected base64 encoding, falling back to float lists")
+            self.use_base64 = False
+            return True
+        return False
+
+    def _create_embeddings_sync(self, inputs: List[str], tokens: int):
+        """Call the embeddings API through the rate limiter, preferring base64 payloads"""
+        if self.use_base64:
+            try:
+                return self.rate_limiter.call(
+                    lambda: self.client.embeddings.create(
+                        input=inputs,
+                        model=self.model,
+                        encoding_format="base64"
+                    ),
+                    tokens=tokens
+                )
+            except Exception as e:
+                if not self._is_base64_rejection(e):
+                    raise
+        return self.rate_limiter.call(
+            # openai injects base64 itself when numpy is installed, ask for floats explicitly
+            lambda: self.client.embeddings.create(input=inputs, model=self.model, encoding_format="float"),
+            tokens=tokens
         )
 
+    async def _create_embeddings(self, inputs: List[str], tokens: int):
+        """Async counterpart of _create_embeddings_sync"""
+        if self.use_base64:
+            try:
+                return await self.rate_limiter.acall(
+                    lambda: self.async_client.embeddings.create(
+                        input=inputs,
+                        model=self.model,
+                        encoding_format="base64"
+                    ),
+                    tokens=tokens
+                )
+            except Exception as e:
+                if not self._is_base64_rejection(e):
+                    raise
+        return await self.rate_limiter.acall(
+            lambda: self.async_client.embeddings.create(input=inputs, model=self.model, encoding_format="float"),
+            tokens=tokens
+        )
+
+    def _assemble(self, keys: List[str], vectors: Dict[str, np.ndarray]) -> np.ndarray:
+        """Lay the vectors out as one contiguous float32 matrix in input order"""
+        dimension = len(next(iter(vectors.values()))) if vectors else self.dimension
+        matrix = np.empty((len(keys), dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            matrix[row] = vectors[key]
+        return matrix
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the in-flight limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
     def generate_embedding_sync(self, text: str) -> np.ndarray:
         """
-        Generate embeddings for a single text using Azure OpenAI (synchronous version)
+        Generate a unit-length float32 embedding for a single text using Azure OpenAI (synchronous version)
         """
         try:
-            # Disable SSL verification warnings since we're using an internal endpoint
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            response = self.client.embeddings.create(
-                input=text,
-                model="text-embedding-ada-002"
-            )
-            return np.array(response.data[0].embedding)
+            return self.batch_generate_embeddings_sync([text])[0]
         except Exception as e:
             raise Exception(f"Error generating embedding: {str(e)}")
 
-    def batch_generate_embeddings_sync(self, texts: List[str], batch_size: int = 50) -> List[np.ndarray]:
+    def batch_generate_embeddings_sync(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """
-        Generate embeddings for multiple texts in batches (synchronous version)
+        Generate embeddings for multiple texts in batches (synchronous version).
+        Identical texts are embedded once and cached vectors are reused, so only
+        cache misses are sent to Azure OpenAI. Requests are filled up to the
+        configured token and item limits; batch_size overrides the item limit.
+        Returns a (len(texts), dimension) float32 matrix of unit-length rows.
         """
-        embeddings = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        keys, unique_texts, vectors, misses = self._prepare_batch(texts)
+        pieces, owners, piece_tokens, batches = self._plan_requests(
+            unique_texts, misses, batch_size or settings.EMBEDDING_MAX_BATCH_ITEMS
+        )
+
+        piece_vectors = np.empty((len(pieces), self.dimension), dtype=np.float32)
+        for batch in batches:
             try:
-                response = self.client.embeddings.create(
-                    input=batch,
-                    model="text-embedding-ada-002"
+                response = self._create_embeddings_sync(
+                    [pieces[i] for i in batch],
+                    tokens=sum(piece_tokens[i] for i in batch)
                 )
-                batch_embeddings = [np.array(data.embedding) for data in response.data]
-                embeddings.extend(batch_embeddings)
+                self._decode_into(response, batch, piece_vectors)
             except Exception as e:
                 raise Exception(f"Error generating batch embeddings: {str(e)}")
-        return embeddings
+        self._normalize_rows(piece_vectors)
+
+        new_vectors = self._combine_pieces(owners, piece_tokens, piece_vectors)
+        if self.cache:
+            self.cache.put_many(new_vectors)
+        vectors.update(new_vectors)
+        return self._assemble(keys, vectors)
 
-    # Keep the async versions for other parts of the application
     async def generate_embedding(self, text: str) -> np.ndarray:
-        return self.generate_embedding_sync(text)
+        """
+        Generate a unit-length float32 embedding for a single text without blocking the event loop
+        """
+        try:
+            embeddings = await self.batch_generate_embeddings([text])
+            return embeddings[0]
+        except Exception as e:
+            raise Exception(f"Error generating embedding: {str(e)}")
+
+    async def batch_generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts, dispatching batches concurrently
+        up to EMBEDDING_MAX_IN_FLIGHT requests. Returns a (len(texts), dimension)
+        float32 matrix of unit-length rows in input order.
+        """
+        # The cache lookup is SQLite I/O, keep it off the event loop
+        keys, unique_texts, vectors, misses = await asyncio.to_thread(self._prepare_batch, texts)
+        pieces, owners, piece_tokens, batches = self._plan_requests(
+            unique_texts, misses, batch_size or settings.EMBEDDING_MAX_BATCH_ITEMS
+        )
+        semaphore = self._get_semaphore()
+        piece_vectors = np.empty((len(pieces), self.dimension), dtype=np.float32)
+
+        async def embed_batch(batch: List[int]):
+            async with semaphore:
+                response = await self._create_embeddings(
+                    [pieces[i] for i in batch],
+                    tokens=sum(piece_tokens[i] for i in batch)
+                )
+            self._decode_into(response, batch, piece_vectors)
+
+        try:
+            await asyncio.gather(*[embed_batch(batch) for batch in batches])
+        except Exception as e:
+            raise Exception(f"Error generating batch embeddings: {str(e)}")
+        self._normalize_rows(piece_vectors)
 
-    async def batch_generate_embeddings(self, texts: List[str], batch_size: int = 50) -> List[np.ndarray]:
-        return self.batch_generate_embeddings_sync(texts, batch_size)
+        new_vectors = self._combine_pieces(owners, piece_tokens, piece_vectors)
+        if self.cache:
+            await asyncio.to_thread(self.cache.put_many, new_vectors)
+        vectors.update(new_vectors)
+        return self._assemble(keys, vectors)
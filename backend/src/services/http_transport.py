@@ -0,0 +1,164 @@
+from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+import weakref
+import httpx
+from src.core.config import settings
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class SharedTransport:
+    """
+    One pooled pair of HTTP clients (blocking and async) for all OpenAI traffic
+    in the process, so every service shares keep-alive connections and TLS
+    sessions instead of opening its own pool.
+    Counts how many responses arrived on a newly opened connection versus a
+    reused one, using the network stream httpcore attaches to each response.
+    """
+    def __init__(
+        self,
+        http2: bool,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        connect_timeout: float,
+        read_timeout: float
+    ):
+        if http2 and not _http2_available():
+            logging.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._streams = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "http2_responses": 0,
+            "warmup_requests": 0
+        }
+
+    def _track(self, response: httpx.Response):
+        """Record whether the response came over a new or a reused connection"""
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.stats["requests"] += 1
+            if response.http_version == "HTTP/2":
+                self.stats["http2_responses"] += 1
+            if stream is None:
+                return
+            if stream in self._streams:
+                self.stats["reused_connections"] += 1
+            else:
+                self._streams.add(stream)
+                self.stats["new_connections"] += 1
+
+    async def _atrack(self, response: httpx.Response):
+        self._track(response)
+
+    @property
+    def client(self) -> httpx.Client:
+        """Blocking client, created on first use"""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    verify=False,  # Skip SSL verification for internal endpoints
+                    event_hooks={"response": [self._track]}
+                )
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Async client, created on first use"""
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    verify=False,  # Skip SSL verification for internal endpoints
+                    event_hooks={"response": [self._atrack]}
+                )
+            return self._async_client
+
+    async def warm_up(self, url: str, connections: int):
+        """
+        Open connections to the endpoint ahead of the first real request.
+        Any HTTP status is fine, only the TCP and TLS setup matter. Over HTTP/2
+        a single connection carries all concurrent requests.
+        """
+        if not url:
+            return
+        if self.http2:
+            connections = 1
+
+        async def touch_async():
+            await self.async_client.head(url)
+
+        def touch_sync():
+            self.client.head(url)
+
+        requests = [touch_async() for _ in range(connections)]
+        requests.append(asyncio.to_thread(touch_sync))
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        with self._lock:
+            self.stats["warmup_requests"] += len(results) - len(failures)
+        if failures:
+            logging.warning(f"Connection warm-up to {url} failed: {failures[0]}")
+        else:
+            logging.info(f"Warmed up {len(results)} connections to {url}")
+
+    def get_stats(self) -> Dict:
+        """Snapshot of the connection counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        opened = stats["new_connections"] + stats["reused_connections"]
+        stats["reuse_rate"] = round(stats["reused_connections"] / opened, 3) if opened else 0.0
+        stats["http2"] = self.http2
+        return stats
+
+    async def aclose(self):
+        """Close both pools"""
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+_shared_transport: Optional[SharedTransport] = None
+_shared_transport_lock = threading.Lock()
+
+def get_shared_transport() -> SharedTransport:
+    """Get the process-wide transport used by every OpenAI client"""
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = SharedTransport(
+                http2=settings.OPENAI_HTTP2,
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                connect_timeout=settings.OPENAI_CONNECT_TIMEOUT,
+                read_timeout=settings.OPENAI_READ_TIMEOUT
+            )
+    return _shared_transport
@@ -0,0 +1,240 @@
+from typing import Any, Dict, List, Union
+from abc import ABC, abstractmethod
+import asyncio
+import base64
+import hashlib
+import logging
+import random
+import time
+import uuid
+import httpx
+import numpy as np
+import openai
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from openai.types import CreateEmbeddingResponse, Embedding
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
+from openai.types.create_embedding_response import Usage
+from src.core.config import settings
+from src.services.http_transport import get_shared_transport
+
+class LLMProvider(ABC):
+    """
+    Source of OpenAI-compatible clients for embeddings and chat completions.
+    Clients expose the SDK surface the services use:
+    client.embeddings.create(...) and client.chat.completions.create(...).
+    """
+    name = "base"
+
+    @abstractmethod
+    def create_client(self) -> Any:
+        """Client for blocking calls"""
+
+    @abstractmethod
+    def create_async_client(self) -> Any:
+        """Client for calls from the event loop"""
+
+    async def warm_up(self):
+        """Open connections to the endpoint before the first request"""
+        pass
+
+class AzureOpenAIProvider(LLMProvider):
+    """Azure OpenAI endpoint configured through the AZURE_OPENAI_* settings"""
+    name = "azure"
+
+    def __init__(self):
+        missing = [
+            name for name in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_VERSION")
+            if not getattr(settings, name)
+        ]
+        if missing:
+            raise ValueError(f"Missing settings for the azure LLM provider: {', '.join(missing)}")
+        # Every client shares the process-wide connection pools
+        self.transport = get_shared_transport()
+
+    def create_client(self) -> AzureOpenAI:
+        return AzureOpenAI(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            default_headers={"Accept": "application/json"},
+            max_retries=0,  # Retries are handled by the shared rate limiter
+            http_client=self.transport.client
+        )
+
+    def create_async_client(self) -> AsyncAzureOpenAI:
+        return AsyncAzureOpenAI(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            default_headers={"Accept": "application/json"},
+            max_retries=0,  # Retries are handled by the shared rate limiter
+            http_client=self.transport.async_client
+        )
+
+    async def warm_up(self):
+        await self.transport.warm_up(
+            settings.AZURE_OPENAI_ENDPOINT,
+            settings.OPENAI_WARMUP_CONNECTIONS
+        )
+
+class OfflineBackend:
+    """
+    Deterministic stand-in for the remote API.
+    Embeddings are seeded from a hash of the text, so the same text always maps
+    to the same unit vector; chat completions are canned. Latency and failures
+    can be injected to exercise batching, rate limiting and retries.
+    """
+    def __init__(self, dimension: int, latency_ms: float, error_rate: float):
+        self.dimension = dimension
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self._request = httpx.Request("POST", "http://offline.invalid/openai")
+
+    def embed(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def maybe_fail(self):
+        """Raise a throttling or server error at the configured rate"""
+        if self.error_rate <= 0 or random.random() >= self.error_rate:
+            return
+        if random.random() < 0.5:
+            response = httpx.Response(429, headers={"retry-after-ms": "100"}, request=self._request)
+            raise openai.RateLimitError("Injected throttling error", response=response, body=None)
+        response = httpx.Response(500, request=self._request)
+        raise openai.InternalServerError("Injected server error", response=response, body=None)
+
+    def embeddings_response(self, input: Union[str, List[str]], model: str, encoding_format: Any) -> CreateEmbeddingResponse:
+        texts = [input] if isinstance(input, str) else list(input)
+        data = []
+        for index, text in enumerate(texts):
+            vector = self.embed(text)
+            if encoding_format == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append(Embedding.construct(embedding=embedding, index=index, object="embedding"))
+        tokens = sum(len(text.split()) for text in texts)
+        return CreateEmbeddingResponse.construct(
+            data=data,
+            model=model,
+            object="list",
+            usage=Usage(prompt_tokens=tokens, total_tokens=tokens)
+        )
+
+    def chat_response(self, model: str, messages: List[Dict]) -> ChatCompletion:
+        query = next(
+            (message["content"] for message in reversed(messages) if message["role"] == "user"),
+            ""
+        )
+        content = (
+            "1. Suggested resolution: apply the fix recorded on the most similar ticket.\n"
+            "2. Steps: reproduce the issue, check recent changes to the affected system, "
+            "then follow the resolution steps of the similar tickets.\n"
+            "3. Tips: confirm the fix with the reporter before closing.\n"
+            f"(Offline provider response to a prompt of {len(query)} characters)"
+        )
+        return ChatCompletion.construct(
+            id=f"offline-{uuid.uuid4().hex}",
+            choices=[Choice.construct(
+                finish_reason="stop",
+                index=0,
+                message=ChatCompletionMessage.construct(role="assistant", content=content)
+            )],
+            created=int(time.time()),
+            model=model,
+            object="chat.completion",
+            usage=CompletionUsage(
+                prompt_tokens=len(query.split()),
+                completion_tokens=len(content.split()),
+                total_tokens=len(query.split()) + len(content.split())
+            )
+        )
+
+class _OfflineEmbeddings:
+    def __init__(self, backend: OfflineBackend):
+        self._backend = backend
+
+    def create(self, *, input, model, encoding_format=None, **kwargs) -> CreateEmbeddingResponse:
+        time.sleep(self._backend.latency)
+        self._backend.maybe_fail()
+        return self._backend.embeddings_response(input, model, encoding_format)
+
+class _AsyncOfflineEmbeddings(_OfflineEmbeddings):
+    async def create(self, *, input, model, encoding_format=None, **kwargs) -> CreateEmbeddingResponse:
+        await asyncio.sleep(self._backend.latency)
+        self._backend.maybe_fail()
+        return self._backend.embeddings_response(input, model, encoding_format)
+
+class _OfflineCompletions:
+    def __init__(self, backend: OfflineBackend):
+        self._backend = backend
+
+    def create(self, *, model, messages, **kwargs) -> ChatCompletion:
+        time.sleep(self._backend.latency)
+        self._backend.maybe_fail()
+        return self._backend.chat_response(model, messages)
+
+class _AsyncOfflineCompletions(_OfflineCompletions):
+    async def create(self, *, model, messages, **kwargs) -> ChatCompletion:
+        await asyncio.sleep(self._backend.latency)
+        self._backend.maybe_fail()
+        return self._backend.chat_response(model, messages)
+
+class _OfflineChat:
+    def __init__(self, completions):
+        self.completions = completions
+
+class OfflineClient:
+    """Offline replacement for AzureOpenAI"""
+    def __init__(self, backend: OfflineBackend):
+        self.embeddings = _OfflineEmbeddings(backend)
+        self.chat = _OfflineChat(_OfflineCompletions(backend))
+
+    def close(self):
+        pass
+
+class AsyncOfflineClient:
+    """Offline replacement for AsyncAzureOpenAI"""
+    def __init__(self, backend: OfflineBackend):
+        self.embeddings = _AsyncOfflineEmbeddings(backend)
+        self.chat = _OfflineChat(_AsyncOfflineCompletions(backend))
+
+    async def close(self):
+        pass
+
+class OfflineProvider(LLMProvider):
+    """Deterministic local provider for load tests and isolated environments"""
+    name = "offline"
+
+    def __init__(self):
+        self.backend = OfflineBackend(
+            dimension=settings.EMBEDDING_DIMENSION,
+            latency_ms=settings.OFFLINE_PROVIDER_LATENCY_MS,
+            error_rate=settings.OFFLINE_PROVIDER_ERROR_RATE
+        )
+
+    def create_client(self) -> OfflineClient:
+        return OfflineClient(self.backend)
+
+    def create_async_client(self) -> AsyncOfflineClient:
+        return AsyncOfflineClient(self.backend)
+
+_PROVIDERS = {
+    AzureOpenAIProvider.name: AzureOpenAIProvider,
+    OfflineProvider.name: OfflineProvider
+}
+
+def get_llm_provider() -> LLMProvider:
+    """Create the provider selected by the LLM_PROVIDER setting"""
+    provider_cls = _PROVIDERS.get(settings.LLM_PROVIDER)
+    if provider_cls is None:
+        raise ValueError(
+            f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}', expected one of {sorted(_PROVIDERS)}"
+        )
+    if provider_cls is not AzureOpenAIProvider:
+        logging.info(f"Using {provider_cls.name} LLM provider")
+    return provider_cls()
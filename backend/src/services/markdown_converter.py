@@ -4,6 +4,7 @@ from datetime import datetime
 import os
 from pathlib import Path
 import logging
+from src.utils.token_utils import get_token_counter
 
 class MarkdownConverter:
     def __init__(self, chunk_size: int = 5):  
@@ -91,10 +92,9 @@ class MarkdownConverter:
 
     def estimate_token_count(self, text: str) -> int:
         """
-        Rough estimation of token count. This is an approximation.
-        OpenAI typically uses ~4 chars per token on average.
+        Count tokens using the embedding model's tokenizer.
         """
-        return len(text) // 4
+        return get_token_counter("text-embedding-ada-002").count(text)
 
     def split_content_by_tokens(self, content: str) -> List[str]:
         """
@@ -0,0 +1,104 @@
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+import numpy as np
+from src.core.config import settings
+from src.services.embedding import EmbeddingService
+
+class EmbeddingCoalescer:
+    """
+    Micro-batches query embeddings across concurrent requests.
+    Texts arriving within a short window are sent as one embeddings call and
+    the vectors are handed back to each waiting request.
+    """
+    def __init__(self, embedding_service: EmbeddingService, window_ms: float, max_batch: int):
+        self.embedding_service = embedding_service
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "queries": 0,
+            "batches": 0,
+            "largest_batch": 0
+        }
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one query text, sharing the request with other queries in the same window"""
+        if self.window <= 0:
+            return await self.embedding_service.generate_embedding(text)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.stats["queries"] += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything collected so far as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        # Keep a reference so the task is not garbage collected while running
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed a batch and resolve the waiting futures"""
+        try:
+            embeddings = await self.embedding_service.batch_generate_embeddings(
+                [text for text, _ in batch]
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                logging.error(f"Error embedding query: {e}")
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # One bad input must not fail the other requests, retry each on its own
+            logging.warning(f"Error embedding batch of {len(batch)} queries, retrying one by one: {e}")
+            await asyncio.gather(*(self._run([item]) for item in batch))
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            # The caller may have gone away (e.g. client disconnect). Copy the row so
+            # a cached query vector does not keep the whole batch matrix alive.
+            if not future.done():
+                future.set_result(embedding.copy())
+
+    def get_stats(self) -> Dict:
+        """Snapshot of the batching counters"""
+        stats = dict(self.stats)
+        stats["average_batch"] = round(stats["queries"] / stats["batches"], 2) if stats["batches"] else 0
+        return stats
+
+_query_coalescer: Optional[EmbeddingCoalescer] = None
+_query_coalescer_lock = threading.Lock()
+
+def get_query_coalescer() -> EmbeddingCoalescer:
+    """Get the process-wide coalescer used by the search path"""
+    global _query_coalescer
+    with _query_coalescer_lock:
+        if _query_coalescer is None:
+            _query_coalescer = EmbeddingCoalescer(
+                EmbeddingService(),
+                window_ms=settings.QUERY_BATCH_WINDOW_MS,
+                max_batch=settings.QUERY_BATCH_MAX_SIZE
+            )
+    return _query_coalescer
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import re
+import threading
+import time
+import numpy as np
+from src.core.config import settings
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU of query embeddings with a time-to-live.
+    Keys are the normalized query text, so re-running a search with different
+    filters or trivially different wording skips the embeddings call.
+    """
+    _PUNCTUATION = re.compile(r"[^\w\s]")
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Fold case, punctuation and whitespace"""
+        return " ".join(cls._PUNCTUATION.sub(" ", text.lower()).split())
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a query, or None"""
+        key = self.normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return embedding
+
+    def put(self, text: str, embedding: np.ndarray):
+        """Store the embedding for a query, evicting the least recently used entry if full"""
+        key = self.normalize(text)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide query embedding cache"""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryEmbeddingCache(
+                settings.QUERY_CACHE_MAX_ENTRIES,
+                settings.QUERY_CACHE_TTL_SECONDS
+            )
+    return _query_cache
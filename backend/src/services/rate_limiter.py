@@ -0,0 +1,200 @@
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import logging
+import random
+import threading
+import time
+import openai
+from src.core.config import settings
+
+T = TypeVar("T")
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per minute.
+    Callers reserve what they need up front; when the bucket goes into debt
+    they are told how long to wait before sending.
+    """
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A single request larger than the bucket could never be admitted
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class RateLimiter:
+    """
+    Client-side limiter for one Azure OpenAI deployment.
+    Paces calls against requests-per-minute and tokens-per-minute quotas and
+    retries throttled (429), timed out and 5xx calls with jittered exponential
+    backoff, honoring Retry-After when the service sends it.
+    """
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float
+    ):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "retries": 0,
+            "failures": 0,
+            "wait_seconds": 0.0
+        }
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve quota for one call and return how long to wait before sending it"""
+        wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+        with self._lock:
+            wait = max(wait, self._blocked_until - time.monotonic())
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["wait_seconds"] += wait
+        return max(wait, 0.0)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed call, or None if it should not be retried"""
+        if isinstance(error, openai.RateLimitError):
+            counter = "throttled"
+        elif isinstance(error, (openai.InternalServerError, openai.APIConnectionError)):
+            # APITimeoutError is a subclass of APIConnectionError
+            counter = "server_errors"
+        else:
+            return None
+
+        with self._lock:
+            self.stats[counter] += 1
+            if attempt >= self.max_retries:
+                self.stats["failures"] += 1
+                return None
+            self.stats["retries"] += 1
+
+        # Exponential backoff with jitter so throttled callers do not retry in lockstep
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        retry_after = self._get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+            # Hold back every caller sharing this deployment, not just this one
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+        logging.warning(
+            f"{self.name} call failed ({error.__class__.__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """Read the Retry-After hint from an error response, if any"""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            retry_after_ms = response.headers.get("retry-after-ms")
+            if retry_after_ms is not None:
+                return float(retry_after_ms) / 1000.0
+            retry_after = response.headers.get("retry-after")
+            if retry_after is not None:
+                return float(retry_after)
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def call(self, fn: Callable[[], T], tokens: int = 0) -> T:
+        """Run a blocking API call under the limiter"""
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                time.sleep(wait)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Run an async API call under the limiter without blocking the event loop"""
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def get_stats(self) -> Dict:
+        """Snapshot of the limiter counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(deployment: str) -> RateLimiter:
+    """
+    Get the process-wide limiter for a deployment ("embeddings" or "chat"),
+    so every client calling that deployment shares one quota.
+    """
+    with _rate_limiters_lock:
+        if deployment not in _rate_limiters:
+            if deployment == "embeddings":
+                rpm, tpm = settings.EMBEDDING_REQUESTS_PER_MINUTE, settings.EMBEDDING_TOKENS_PER_MINUTE
+            elif deployment == "chat":
+                rpm, tpm = settings.CHAT_REQUESTS_PER_MINUTE, settings.CHAT_TOKENS_PER_MINUTE
+            else:
+                raise ValueError(f"Unknown deployment: {deployment}")
+            _rate_limiters[deployment] = RateLimiter(
+                name=deployment,
+                requests_per_minute=rpm,
+                tokens_per_minute=tpm,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+                max_delay=settings.OPENAI_RETRY_MAX_DELAY
+            )
+        return _rate_limiters[deployment]
+
+def get_rate_limiter_stats() -> Dict[str, Dict]:
+    """Counters for every limiter created in this process"""
+    with _rate_limiters_lock:
+        limiters = list(_rate_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
@@ -1,29 +1,91 @@
-from typing import List, Optional, Dict
-from src.schemas.ticket import Ticket
+from typing import AsyncIterator, List, Optional, Dict, Tuple
+from datetime import datetime
+import asyncio
+import numpy as np
+from src.schemas.ticket import BatchSearchItem, Ticket
+from src.db.lexical_index import classify_query, reciprocal_rank_fusion
 from src.db.vector_store import VectorStore
 from src.services.embedding import EmbeddingService
-from openai import AzureOpenAI
-import httpx
+from src.services.llm_providers import get_llm_provider
+from src.services.query_batcher import EmbeddingCoalescer, get_query_coalescer
+from src.services.query_cache import get_query_embedding_cache
+from src.services.rate_limiter import get_rate_limiter
+from src.utils.token_utils import get_token_counter
 import logging
 from src.core.config import settings
 
 class SearchService:
-    def __init__(self):
-        self.vector_store = VectorStore()
-        self.embedding_service = EmbeddingService()
-        self.chat_client = AzureOpenAI(
-            api_key=settings.AZURE_OPENAI_API_KEY,
-            api_version=settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-            http_client=httpx.Client(verify=False)  # Skip SSL verification for internal endpoints
-        )
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        query_coalescer: Optional[EmbeddingCoalescer] = None
+    ):
+        self.vector_store = vector_store or VectorStore()
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.query_coalescer = query_coalescer or get_query_coalescer()
+        self.query_cache = get_query_embedding_cache()
+        provider = get_llm_provider()
+        self.chat_client = provider.create_client()
+        self.async_chat_client = provider.create_async_client()
+        self.chat_rate_limiter = get_rate_limiter("chat")
+        self.token_counter = get_token_counter("gpt-4")
+
+    async def aclose(self):
+        """Release the HTTP connections held by the chat clients"""
+        self.chat_client.close()
+        await self.async_chat_client.close()
+
+    def _estimate_chat_tokens(self, messages: List[Dict], max_tokens: int) -> int:
+        """Tokens a chat call counts against the quota: the prompt plus the completion budget"""
+        return sum(self.token_counter.count(message["content"]) for message in messages) + max_tokens
+
+    def _query_kind(self, description: str) -> str:
+        """How a query is answered: "identifier" (lexical index), "mixed" (fused) or "text" (vectors)"""
+        if self.vector_store.lexical_index is None:
+            return "text"
+        return classify_query(description)
+
+    async def _fuse_lexical(self, description: str, results: List[Dict], filter_criteria: Dict, limit: int) -> List[Dict]:
+        """Merge vector results with lexical matches by reciprocal rank"""
+        lexical_results = await self.vector_store.lexical_search(description, filter_criteria, limit)
+        return reciprocal_rank_fusion([results, lexical_results], limit, settings.LEXICAL_RRF_K)
+
+    @staticmethod
+    def build_filter_criteria(
+        issue_type: Optional[str] = None,
+        affected_system: Optional[str] = None,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None
+    ) -> Dict:
+        """Vector store filters for the provided, non-empty search fields"""
+        filter_criteria = {}
+        for key, value in (("issue_type", issue_type), ("affected_system", affected_system), ("status", status)):
+            if value and value.strip():
+                filter_criteria[key] = value
+        ranges = {
+            "created_after": created_after,
+            "created_before": created_before,
+            "updated_after": updated_after,
+            "updated_before": updated_before
+        }
+        filter_criteria.update({key: value for key, value in ranges.items() if value is not None})
+        return filter_criteria
 
     async def search_similar_tickets(
         self,
         description: str,
         issue_type: Optional[str] = None,
         affected_system: Optional[str] = None,
-        limit: int = 5
+        limit: int = 5,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None
     ) -> List[Ticket]:
         """
         Search for similar tickets using vector similarity
@@ -33,34 +95,43 @@ class SearchService:
             logging.info(f"Description: '{description}'")
             logging.info(f"Issue Type: '{issue_type}'")
             logging.info(f"Affected System: '{affected_system}'")
+            logging.info(f"Status: '{status}'")
+            logging.info(f"Created: {created_after} - {created_before}, Updated: {updated_after} - {updated_before}")
             logging.info(f"Limit: {limit}")
             
-            # Get store stats for debugging
-            stats = self.vector_store.get_stats()
-            logging.info("\n=== Vector Store Stats ===")
-            logging.info(f"Stats: {stats}")
-            
-            # Generate embedding for the query
-            logging.info("\n=== Generating Query Embedding ===")
-            query_embedding = await self.embedding_service.generate_embedding(description)
-            logging.info(f"Generated embedding with shape: {query_embedding.shape}")
-            logging.info(f"Embedding sample (first 5 values): {query_embedding[:5]}")
-            
-            # Search in vector store
-            logging.info("\n=== Executing Vector Store Search ===")
-            filter_criteria = {}
+            filter_criteria = self.build_filter_criteria(
+                issue_type, affected_system, status,
+                created_after, created_before, updated_after, updated_before
+            )
+            query_kind = self._query_kind(description)
             
-            # Add filters only if they are provided and not empty
-            if issue_type and issue_type.strip():
-                filter_criteria["issue_type"] = issue_type
-            if affected_system and affected_system.strip():
-                filter_criteria["affected_system"] = affected_system
+            results = []
+            if query_kind == "identifier":
+                # Ticket keys and error codes are answered from the lexical index, without an embedding
+                logging.info("\n=== Executing Lexical Search ===")
+                results = await self.vector_store.lexical_search(description, filter_criteria, limit)
             
-            results = await self.vector_store.search(
-                query_embedding,
-                filter_criteria=filter_criteria,
-                limit=limit
-            )
+            if not results:
+                # Generate embedding for the query
+                query_embedding = self.query_cache.get(description)
+                if query_embedding is None:
+                    logging.info("\n=== Generating Query Embedding ===")
+                    query_embedding = await self.query_coalescer.embed(description)
+                    self.query_cache.put(description, query_embedding)
+                else:
+                    logging.info("\n=== Using Cached Query Embedding ===")
+                logging.info(f"Generated embedding with shape: {query_embedding.shape}")
+                logging.info(f"Embedding sample (first 5 values): {query_embedding[:5]}")
+                
+                # Search in vector store
+                logging.info("\n=== Executing Vector Store Search ===")
+                results = await self.vector_store.search(
+                    query_embedding,
+                    filter_criteria=filter_criteria,
+                    limit=limit
+                )
+                if query_kind == "mixed":
+                    results = await self._fuse_lexical(description, results, filter_criteria, limit)
             logging.info(f"\n=== Search Results ===")
             logging.info(f"Number of results: {len(results)}")
             for i, result in enumerate(results):
@@ -92,6 +163,92 @@ class SearchService:
             logging.error(f"Error in search_similar_tickets: {str(e)}", exc_info=True)
             raise
 
+    async def _embed_queries(self, descriptions: List[str]) -> np.ndarray:
+        """Query embeddings from the query cache, embedding all misses in one batch"""
+        embeddings = [self.query_cache.get(description) for description in descriptions]
+        misses = list(dict.fromkeys(
+            description for description, embedding in zip(descriptions, embeddings) if embedding is None
+        ))
+        if misses:
+            new_embeddings = await self.embedding_service.batch_generate_embeddings(misses)
+            for description, embedding in zip(misses, new_embeddings):
+                self.query_cache.put(description, embedding)
+            by_description = dict(zip(misses, new_embeddings))
+            embeddings = [
+                embedding if embedding is not None else by_description[description]
+                for description, embedding in zip(descriptions, embeddings)
+            ]
+        return np.vstack(embeddings)
+
+    async def search_similar_tickets_batch(self, queries: List[BatchSearchItem]) -> List[List[Ticket]]:
+        """
+        Search for many descriptions at once: one embeddings request for the
+        uncached descriptions and one vector store query per distinct filter.
+        Identifier queries with lexical matches are not embedded.
+        """
+        try:
+            logging.info(f"\n=== Starting Batch Search Request: {len(queries)} queries ===")
+            if not queries:
+                return []
+            filter_criteria = [
+                self.build_filter_criteria(
+                    query.issue_type, query.affected_system, query.status,
+                    query.created_after, query.created_before, query.updated_after, query.updated_before
+                )
+                for query in queries
+            ]
+            limit = max(query.num_results for query in queries)
+            query_kinds = [self._query_kind(query.description) for query in queries]
+            results: List[List[Dict]] = [[] for _ in queries]
+            for row, (query, query_kind) in enumerate(zip(queries, query_kinds)):
+                if query_kind == "identifier":
+                    results[row] = await self.vector_store.lexical_search(query.description, filter_criteria[row], limit)
+            
+            vector_rows = [row for row in range(len(queries)) if not results[row]]
+            if vector_rows:
+                query_embeddings = await self._embed_queries([queries[row].description for row in vector_rows])
+                vector_results = await self.vector_store.search_batch(
+                    query_embeddings, [filter_criteria[row] for row in vector_rows], limit
+                )
+                for row, row_results in zip(vector_rows, vector_results):
+                    if query_kinds[row] == "mixed":
+                        row_results = await self._fuse_lexical(queries[row].description, row_results, filter_criteria[row], limit)
+                    results[row] = row_results
+            return [
+                await self.process_results(query_results[:query.num_results])
+                for query, query_results in zip(queries, results)
+            ]
+        except Exception as e:
+            logging.error(f"Error in search_similar_tickets_batch: {str(e)}", exc_info=True)
+            raise
+
+    async def answer_batch(
+        self,
+        queries: List[BatchSearchItem],
+        results: List[List[Ticket]]
+    ) -> AsyncIterator[Tuple[int, List[Ticket]]]:
+        """
+        Yield (query index, tickets) as each query is ready: queries without an
+        AI answer immediately, the others as their chat completions finish
+        """
+        async def answer(index: int) -> Tuple[int, List[Ticket]]:
+            tickets = results[index]
+            tickets[0].resolution = await self.generate_ai_response(queries[index].description, tickets)
+            return index, tickets
+
+        pending = []
+        for index, (query, tickets) in enumerate(zip(queries, results)):
+            if query.generate_answer and tickets:
+                pending.append(asyncio.create_task(answer(index)))
+            else:
+                yield index, tickets
+        try:
+            for task in asyncio.as_completed(pending):
+                yield await task
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def process_results(self, results: List[dict]) -> List[Ticket]:
         """
         Process and aggregate search results
@@ -145,15 +302,20 @@ Please provide:
 
 Response:"""
 
+            messages = [
+                {"role": "system", "content": "You are a helpful IT support assistant. Provide clear, actionable solutions based on similar support tickets."},
+                {"role": "user", "content": prompt}
+            ]
+
             # Get completion from Azure OpenAI
-            response = self.chat_client.chat.completions.create(
-                model="gpt-4",  # Using gpt-4 model as per working sample
-                messages=[
-                    {"role": "system", "content": "You are a helpful IT support assistant. Provide clear, actionable solutions based on similar support tickets."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=800
+            response = await self.chat_rate_limiter.acall(
+                lambda: self.async_chat_client.chat.completions.create(
+                    model="gpt-4",  # Using gpt-4 model as per working sample
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=800
+                ),
+                tokens=self._estimate_chat_tokens(messages, 800)
             )
 
             return response.choices[0].message.content
@@ -166,9 +328,13 @@ Response:"""
         Get chat completion from Azure OpenAI
         """
         try:
-            response = self.chat_client.chat.completions.create(
-                model="gpt-4",  # Using gpt-4 model as per working sample
-                messages=[{"role": "user", "content": prompt}]
+            messages = [{"role": "user", "content": prompt}]
+            response = self.chat_rate_limiter.call(
+                lambda: self.chat_client.chat.completions.create(
+                    model="gpt-4",  # Using gpt-4 model as per working sample
+                    messages=messages
+                ),
+                tokens=self._estimate_chat_tokens(messages, 0)
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
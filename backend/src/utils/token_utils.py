@@ -0,0 +1,76 @@
+from typing import List, Optional
+import logging
+import threading
+import tiktoken
+
+class TokenCounter:
+    """
+    Tokenizer-based token counting for OpenAI models.
+    Falls back to a conservative character estimate when the tokenizer
+    files cannot be loaded (e.g. on a box without internet access).
+    """
+    # Characters per token assumed by the fallback estimate. Real English text
+    # averages ~4 characters per token, so this overestimates on purpose.
+    FALLBACK_CHARS_PER_TOKEN = 3
+
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding: Optional[tiktoken.Encoding] = None
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            logging.warning(
+                f"Could not load tokenizer for {model}, falling back to estimated token counts: {e}"
+            )
+
+    def count(self, text: str) -> int:
+        """Number of tokens in a text"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return -(-len(text) // self.FALLBACK_CHARS_PER_TOKEN)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Split a text into consecutive pieces of at most max_tokens tokens"""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return [
+                self.encoding.decode(tokens[i:i + max_tokens])
+                for i in range(0, len(tokens), max_tokens)
+            ] or [text]
+        max_chars = max_tokens * self.FALLBACK_CHARS_PER_TOKEN
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)] or [text]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text down to its first max_tokens tokens"""
+        return self.split(text, max_tokens)[0]
+
+_token_counters = {}
+_token_counters_lock = threading.Lock()
+
+def get_token_counter(model: str) -> TokenCounter:
+    """Get the shared token counter for a model"""
+    with _token_counters_lock:
+        if model not in _token_counters:
+            _token_counters[model] = TokenCounter(model)
+        return _token_counters[model]
+
+def pack_batches(token_counts: List[int], max_batch_tokens: int, max_batch_items: int) -> List[List[int]]:
+    """
+    Group inputs into request batches without exceeding the per-request token
+    and item limits. Inputs keep their order; returns lists of input indices.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        if current and (
+            current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_items
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
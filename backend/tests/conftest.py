@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Settings are read when src.core.config is first imported: point every path
+# at a scratch directory and use the offline provider, so the tests need no
+# Azure OpenAI credentials and never touch a real store
+_data_dir = tempfile.mkdtemp(prefix="support-tool-tests-")
+os.environ.update({
+    "LLM_PROVIDER": "offline",
+    "CHROMA_PERSIST_DIRECTORY": os.path.join(_data_dir, "chroma"),
+    "SQLITE_DATABASE_URL": f"sqlite:///{os.path.join(_data_dir, 'app.db')}",
+    "EMBEDDING_CACHE_ENABLED": "false",
+    "SNAPSHOT_DIRECTORY": os.path.join(_data_dir, "snapshots"),
+    "EMBEDDING_DIMENSION": "8",
+    "VECTOR_STORE_RETIRE_GRACE_SECONDS": "0"
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def vector_store(tmp_path, monkeypatch):
+    """A VectorStore in its own scratch directory"""
+    from src.core.config import settings
+    from src.db.vector_store import VectorStore
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    store = VectorStore()
+    yield store
+    store.close()
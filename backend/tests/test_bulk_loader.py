@@ -0,0 +1,107 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.config import settings
+from src.services.data_processing import DataProcessingService
+
+def make_records(start: int, count: int):
+    return [
+        {
+            "id": f"SUP-{i}",
+            "title": f"Ticket {i}",
+            "description": "Printer offline",
+            "embedding": np.eye(8, dtype=np.float32)[i % 8]
+        }
+        for i in range(start, start + count)
+    ]
+
+def fail_writes(vector_store, monkeypatch, failing):
+    """Make the _write_rows calls whose 1-based number satisfies failing raise"""
+    write_rows = vector_store._write_rows
+    calls = []
+
+    def flaky(rows, collection=None):
+        calls.append(list(rows))
+        if failing(len(calls)):
+            raise RuntimeError("Chroma unavailable")
+        return write_rows(rows, collection)
+
+    monkeypatch.setattr(vector_store, "_write_rows", flaky)
+    return calls
+
+@pytest.fixture
+def batch_size(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BULK_BATCH_SIZE", 2)
+
+def test_failed_write_keeps_rows_buffered_for_the_next_flush(vector_store, monkeypatch, batch_size):
+    calls = fail_writes(vector_store, monkeypatch, lambda call: call == 1)
+
+    async def load():
+        async with vector_store.bulk_load() as loader:
+            await loader.add_records(make_records(0, 2))
+            await loader.add_records(make_records(2, 2))
+        return loader
+
+    loader = asyncio.run(load())
+
+    assert calls[0] == calls[1] == ["SUP-0", "SUP-1"]
+    assert loader.failed_ids == []
+    assert loader.get_stats()["failed_writes"] == 1
+    assert vector_store.collection.count() == 4
+    assert vector_store.get_stats()["total_records"] == 4
+
+def test_rows_that_never_get_written_are_reported(vector_store, monkeypatch, batch_size):
+    fail_writes(vector_store, monkeypatch, lambda call: True)
+
+    async def load():
+        async with vector_store.bulk_load() as loader:
+            await loader.add_records(make_records(0, 5))
+        return loader
+
+    # The final flush fails too, without escaping the context manager
+    loader = asyncio.run(load())
+
+    assert sorted(loader.failed_ids) == [f"SUP-{i}" for i in range(5)]
+    assert loader.get_stats()["failed_records"] == 5
+    assert vector_store.collection.count() == 0
+
+def test_upserting_existing_records_does_not_inflate_the_count(vector_store):
+    asyncio.run(vector_store.add_records(make_records(0, 3)))
+    asyncio.run(vector_store.add_records(make_records(1, 3)))
+
+    assert vector_store.get_stats()["total_records"] == 4
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "tickets.csv"
+    pd.DataFrame({
+        "Issue id": [f"SUP-{i}" for i in range(6)],
+        "Summary": [f"Ticket {i}" for i in range(6)],
+        "Status": ["Done"] * 6,
+        "Custom field (Resolution Note)": [f"Restarted the print spooler on host {i}." for i in range(6)]
+    }).to_csv(path, index=False)
+    return str(path)
+
+def test_process_csv_counts_records_lost_in_a_later_write(vector_store, monkeypatch, csv_file):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BULK_BATCH_SIZE", 4)
+    # The first batch (chunks 1-2) is written, the rest never is
+    fail_writes(vector_store, monkeypatch, lambda call: call > 1)
+    service = DataProcessingService(vector_store=vector_store)
+
+    result = asyncio.run(service.process_csv(csv_file, chunk_size=2))
+
+    assert result["processed_records"] == 4
+    assert result["failed_records"] == 2
+    assert vector_store.collection.count() == 4
+
+def test_process_csv_counts_every_record_when_all_writes_fail(vector_store, monkeypatch, csv_file):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BULK_BATCH_SIZE", 4)
+    fail_writes(vector_store, monkeypatch, lambda call: True)
+    service = DataProcessingService(vector_store=vector_store)
+
+    result = asyncio.run(service.process_csv(csv_file, chunk_size=2))
+
+    assert result["processed_records"] == 0
+    assert result["failed_records"] == 6
+    assert result["skipped_records"] == 0
@@ -0,0 +1,79 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from src.core.config import settings
+from src.services.data_processing import DataProcessingService
+from tests.test_embedding_service import AsyncBase64RejectingEmbeddings, make_service
+
+class SlowEmbeddings:
+    """Stands in for EmbeddingService; records how many calls overlap"""
+    def __init__(self, fail_call: int = 0):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_call = fail_call
+
+    async def batch_generate_embeddings(self, texts):
+        self.calls.append(len(texts))
+        call = len(self.calls)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if call == self.fail_call:
+                raise RuntimeError("Embedding endpoint unavailable")
+            return np.tile(np.eye(8, dtype=np.float32)[call % 8], (len(texts), 1))
+        finally:
+            self.in_flight -= 1
+
+def write_csv(path, ids, summaries=None):
+    pd.DataFrame({
+        "Issue id": ids,
+        "Summary": summaries or [f"Ticket {record_id}" for record_id in ids],
+        "Status": ["Done"] * len(ids),
+        "Custom field (Resolution Note)": [f"Restarted the print spooler for {record_id}." for record_id in ids]
+    }).to_csv(path, index=False)
+    return str(path)
+
+def test_chunks_are_embedded_concurrently(vector_store, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_IN_FLIGHT", 3)
+    embeddings = SlowEmbeddings()
+    service = DataProcessingService(embedding_service=embeddings, vector_store=vector_store)
+    path = write_csv(tmp_path / "tickets.csv", [f"SUP-{i}" for i in range(10)])
+
+    result = asyncio.run(service.process_csv(path, chunk_size=2))
+
+    assert embeddings.calls == [2] * 5
+    assert embeddings.max_in_flight == 3
+    assert result["processed_records"] == 10
+    assert vector_store.collection.count() == 10
+
+def test_later_rows_still_win_across_overlapping_chunks(vector_store, tmp_path):
+    service = DataProcessingService(embedding_service=SlowEmbeddings(), vector_store=vector_store)
+    path = write_csv(tmp_path / "tickets.csv", ["SUP-1", "SUP-2", "SUP-1"], ["First", "Other", "Second"])
+
+    asyncio.run(service.process_csv(path, chunk_size=1))
+
+    stored = vector_store.collection.get(ids=["SUP-1"], include=["metadatas"])["metadatas"][0]
+    assert stored["Summary"] == "Second"
+
+def test_a_failed_chunk_does_not_fail_the_others(vector_store, tmp_path):
+    service = DataProcessingService(embedding_service=SlowEmbeddings(fail_call=2), vector_store=vector_store)
+    path = write_csv(tmp_path / "tickets.csv", [f"SUP-{i}" for i in range(6)])
+
+    result = asyncio.run(service.process_csv(path, chunk_size=2))
+
+    assert (result["processed_records"], result["failed_records"]) == (4, 2)
+    assert sorted(vector_store.collection.get(include=[])["ids"]) == ["SUP-0", "SUP-1", "SUP-4", "SUP-5"]
+
+def test_a_200_row_csv_is_embedded_in_packed_requests(vector_store, tmp_path):
+    embeddings = AsyncBase64RejectingEmbeddings()
+    service = DataProcessingService(embedding_service=make_service(embeddings), vector_store=vector_store)
+    path = write_csv(tmp_path / "tickets.csv", [f"SUP-{i}" for i in range(200)])
+
+    result = asyncio.run(service.process_csv(path))
+
+    requests = [call for call in embeddings.calls if call["encoding_format"] == "float"]
+    assert 1 <= len(requests) <= 2
+    assert sum(len(call["input"]) for call in requests) == 200
+    assert result["processed_records"] == 200
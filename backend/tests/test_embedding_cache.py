@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from src.services.embedding import EmbeddingCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=10)
+    yield cache
+    cache.close()
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+def test_round_trip(cache):
+    key = EmbeddingCache.make_key(EmbeddingCache.normalize("  printer   offline "), "model")
+    cache.put_many({key: vector(1.0)})
+
+    found = cache.get_many([key, "missing"])
+
+    assert list(found) == [key]
+    assert found[key].dtype == np.float32
+    np.testing.assert_array_equal(found[key], vector(1.0))
+
+def test_normalized_texts_share_a_key():
+    assert EmbeddingCache.make_key(EmbeddingCache.normalize("a  b\n"), "m") == EmbeddingCache.make_key("a b", "m")
+    assert EmbeddingCache.make_key("a b", "m") != EmbeddingCache.make_key("a b", "other-model")
+
+def test_duplicate_puts_are_not_counted(cache):
+    cache.put_many({"k": vector(1.0)})
+    cache.put_many({"k": vector(2.0)})
+
+    assert cache.count() == 1
+
+def test_eviction_drops_least_recently_used_down_to_90_percent(cache, monkeypatch):
+    clock = iter(range(1000))
+    monkeypatch.setattr("src.services.embedding.time.time", lambda: float(next(clock)))
+    for i in range(10):
+        cache.put_many({f"k{i}": vector(i)})
+    # Reading k0 makes it the most recently used entry
+    cache.get_many(["k0"])
+
+    cache.put_many({"k10": vector(10)})
+
+    assert cache.count() == 9
+    remaining = cache.get_many([f"k{i}" for i in range(11)])
+    assert set(remaining) == {"k0", "k10"} | {f"k{i}" for i in range(3, 10)}
+
+def test_count_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache(path, max_entries=10)
+    cache.put_many({"a": vector(1.0), "b": vector(2.0)})
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_entries=10)
+    try:
+        assert reopened.count() == 2
+    finally:
+        reopened.close()
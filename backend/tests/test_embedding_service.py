@@ -0,0 +1,54 @@
+import asyncio
+import httpx
+import numpy as np
+import openai
+from types import SimpleNamespace
+from src.services.embedding import EmbeddingService
+
+class Base64RejectingEmbeddings:
+    """Embeddings resource of an endpoint that only accepts float payloads"""
+    def __init__(self):
+        self.calls = []
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("encoding_format") != "float":
+            request = httpx.Request("POST", "https://example.invalid/embeddings")
+            response = httpx.Response(400, request=request)
+            raise openai.BadRequestError("Unsupported encoding_format", response=response, body=None)
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[1.0] + [0.0] * 7) for i in range(len(kwargs["input"]))
+        ])
+
+    def create(self, **kwargs):
+        return self._create(**kwargs)
+
+class AsyncBase64RejectingEmbeddings(Base64RejectingEmbeddings):
+    async def create(self, **kwargs):
+        return self._create(**kwargs)
+
+def make_service(embeddings) -> EmbeddingService:
+    service = EmbeddingService()
+    service.client = SimpleNamespace(embeddings=embeddings)
+    service.async_client = SimpleNamespace(embeddings=embeddings)
+    return service
+
+def test_sync_fallback_requests_float_payloads():
+    embeddings = Base64RejectingEmbeddings()
+    service = make_service(embeddings)
+
+    vectors = service.batch_generate_embeddings_sync(["printer offline"])
+
+    assert [call["encoding_format"] for call in embeddings.calls] == ["base64", "float"]
+    assert service.use_base64 is False
+    np.testing.assert_array_equal(vectors[0], [1.0] + [0.0] * 7)
+
+def test_async_fallback_requests_float_payloads():
+    embeddings = AsyncBase64RejectingEmbeddings()
+    service = make_service(embeddings)
+
+    asyncio.run(service.batch_generate_embeddings(["printer offline"]))
+    asyncio.run(service.batch_generate_embeddings(["vpn drops"]))
+
+    # The rejection is remembered, later requests go straight to floats
+    assert [call["encoding_format"] for call in embeddings.calls] == ["base64", "float", "float"]
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src.core.config import settings
+from src.services import container
+
+class GatedProvider:
+    """LLM provider whose connection warm-up waits for the test, then succeeds or fails"""
+    def __init__(self, fail: bool = False):
+        self.release = threading.Event()
+        self.fail = fail
+
+    async def warm_up(self):
+        await asyncio.to_thread(self.release.wait, 10)
+        if self.fail:
+            raise ConnectionError("OpenAI unreachable")
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "WARMUP_QUERY", "")
+    provider = GatedProvider()
+    monkeypatch.setattr(container, "get_llm_provider", lambda: provider)
+    return provider
+
+def wait_for_warm_up(client):
+    deadline = time.monotonic() + 10
+    while client.app.state.services.warm_up_status["state"] in ("pending", "running"):
+        assert time.monotonic() < deadline, "warm-up did not finish"
+        time.sleep(0.01)
+
+def test_health_is_503_until_warm_up_completes(provider):
+    from src.main import app
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert (response.status_code, response.json()["status"]) == (503, "warming_up")
+
+        provider.release.set()
+        wait_for_warm_up(client)
+
+        response = client.get("/health")
+        assert (response.status_code, response.json()["status"]) == (200, "healthy")
+        assert response.json()["warm_up"]["state"] == "completed"
+
+def test_health_stays_503_after_a_failed_warm_up(provider):
+    from src.main import app
+    provider.fail = True
+    with TestClient(app) as client:
+        provider.release.set()
+        wait_for_warm_up(client)
+
+        response = client.get("/health")
+        assert (response.status_code, response.json()["status"]) == (503, "unhealthy")
+        assert response.json()["warm_up"]["failed_steps"] == ["connections"]
+        assert response.json()["warm_up"]["steps"]["connections"]["error"] == "OpenAI unreachable"
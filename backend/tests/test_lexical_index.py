@@ -0,0 +1,86 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from src.db.lexical_index import LexicalIndex, classify_query, reciprocal_rank_fusion, tokenize
+from src.services.data_processing import DataProcessingService
+
+def test_tokenize_keeps_identifiers_whole():
+    assert tokenize("Error E876 on SUP-12 after v1.2 upgrade") == ["error", "e876", "sup-12", "after", "v1.2", "upgrade"]
+
+@pytest.mark.parametrize("query, expected", [
+    ("SUP-12", "identifier"),
+    ("SUP-12 E876", "identifier"),
+    ("error E876 on the VPN", "mixed"),
+    ("VPN drops every hour", "text"),
+    # Digits alone are not enough, identifiers have at least 3 characters
+    ("vpn v2", "text"),
+    ("", "text")
+])
+def test_classify_query(query, expected):
+    assert classify_query(query) == expected
+
+def tickets(*ids):
+    return [{"id": record_id} for record_id in ids]
+
+def test_rrf_ranks_tickets_found_by_both_first():
+    fused = reciprocal_rank_fusion([tickets("A", "B", "C"), tickets("C", "D")], limit=10)
+
+    assert [ticket["id"] for ticket in fused] == ["C", "A", "B", "D"]
+
+def test_rrf_keeps_the_first_copy_of_a_ticket_and_applies_the_limit():
+    first = {"id": "A", "source": "vector"}
+
+    fused = reciprocal_rank_fusion([[first, {"id": "B"}], [{"id": "A", "source": "lexical"}]], limit=1)
+
+    assert fused == [first]
+
+def test_rrf_k_flattens_the_rank_difference():
+    # With a small k one first place beats two third places, with a large k it does not
+    rankings = [tickets("A", "X", "B"), tickets("Y", "Z", "B")]
+
+    assert reciprocal_rank_fusion(rankings, limit=1, k=1)[0]["id"] == "A"
+    assert reciprocal_rank_fusion(rankings, limit=1, k=60)[0]["id"] == "B"
+
+def test_issue_key_outweighs_the_summary(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical_index.json"))
+    index.upsert(["10001", "10002"], [
+        {"Issue key": "SUP-12", "Summary": "VPN drops", "content_hash": "a"},
+        {"Issue key": "SUP-13", "Summary": "Duplicate of SUP-12", "content_hash": "b"}
+    ])
+
+    assert [record_id for record_id, _ in index.search("SUP-12")] == ["10001", "10002"]
+    # The numeric record ID is not indexed
+    assert index.search("10001") == []
+
+def test_uploads_store_and_index_the_issue_key(vector_store, tmp_path):
+    path = tmp_path / "tickets.csv"
+    pd.DataFrame({
+        "Issue key": ["SUP-12", "SUP-13"],
+        "Issue id": [10001, 10002],
+        "Summary": ["VPN drops every hour", "Printer offline"],
+        "Status": ["Done", "Done"],
+        "Custom field (Resolution Note)": ["Renewed the VPN certificate.", "Restarted the print spooler."]
+    }).to_csv(path, index=False)
+    service = DataProcessingService(vector_store=vector_store)
+
+    asyncio.run(service.process_csv(str(path)))
+
+    stored = vector_store.collection.get(ids=["10001"], include=["metadatas"])["metadatas"][0]
+    assert stored["Issue key"] == "SUP-12"
+    results = asyncio.run(vector_store.lexical_search("sup-13", {}, 5))
+    assert [ticket["id"] for ticket in results] == ["10002"]
+
+def test_sync_ids_reads_only_the_given_records(vector_store, tmp_path):
+    asyncio.run(vector_store.add_records([
+        {"id": "10001", "issue_key": "SUP-12", "title": "VPN drops", "description": "", "embedding": np.eye(8, dtype=np.float32)[0]},
+        {"id": "10002", "issue_key": "SUP-13", "title": "Printer offline", "description": "", "embedding": np.eye(8, dtype=np.float32)[1]}
+    ]))
+    index = LexicalIndex(str(tmp_path / "lexical_index.json"))
+
+    assert index.sync_ids(vector_store.collection, ["10001", "10003"]) == 1
+
+    assert [record_id for record_id, _ in index.search("SUP-12 SUP-13")] == ["10001"]
+    vector_store.collection.delete(ids=["10001"])
+    index.sync_ids(vector_store.collection, ["10001"])
+    assert index.count == 0
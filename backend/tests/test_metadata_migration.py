@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime
+import numpy as np
+import pytest
+from src.core.config import settings
+from src.db.vector_store import METADATA_VERSION
+
+@pytest.fixture
+def numpy_backend(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", "numpy")
+
+@pytest.fixture
+def store(numpy_backend, vector_store):
+    return vector_store
+
+def old_format_row(record_id: str, embedding: np.ndarray):
+    """A row as stored before metadata version 2, e.g. from an old snapshot"""
+    metadata = {
+        "id": record_id,
+        "Summary": "VPN drops every hour",
+        "Status": "Done",
+        "Steps": "Reinstalled the client|Renewed the certificate",
+        "Created": "2024-03-05T10:00:00",
+        "Updated": "2024-03-06T09:30:00",
+        "content_hash": "old"
+    }
+    return {record_id: ("Title: VPN drops every hour", metadata, embedding)}
+
+def test_migration_updates_the_numpy_index(store):
+    embedding = np.eye(8, dtype=np.float32)[0]
+    store._write_rows(old_format_row("SUP-1", embedding))
+    created_after = {"created_after": datetime(2024, 1, 1)}
+    # String dates are not comparable, so the range filter misses the record
+    assert asyncio.run(store.search(embedding, created_after)) == []
+
+    assert store.migrate_metadata() == 1
+
+    results = asyncio.run(store.search(embedding, created_after))
+    assert [ticket["id"] for ticket in results] == ["SUP-1"]
+    assert results[0]["steps"] == ["Reinstalled the client", "Renewed the certificate"]
+    stored = store.collection.get(ids=["SUP-1"], include=["metadatas"])["metadatas"][0]
+    assert stored["metadata_version"] == METADATA_VERSION
+    assert stored["Created"] == int(datetime(2024, 3, 5, 10).timestamp())
+
+def test_migration_skips_current_records(store):
+    embedding = np.eye(8, dtype=np.float32)[1]
+    asyncio.run(store.add_records([
+        {"id": "SUP-2", "title": "Printer offline", "description": "", "steps": ["Power cycle"], "embedding": embedding}
+    ]))
+
+    assert store.migrate_metadata() == 0
+
+@pytest.mark.parametrize("stored, expected", [
+    ('["Restart the spooler", "Clear the queue"]', ["Restart the spooler", "Clear the queue"]),
+    ("Restart the spooler|Clear the queue", ["Restart the spooler", "Clear the queue"]),
+    ("Restart the spooler", ["Restart the spooler"]),
+    ("", []),
+    (None, [])
+])
+def test_steps_are_read_in_either_layout(vector_store, stored, expected):
+    ticket = vector_store._to_ticket({"Steps": stored}, "document", 0)
+
+    assert ticket["steps"] == expected
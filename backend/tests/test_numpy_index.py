@@ -0,0 +1,109 @@
+import asyncio
+import numpy as np
+import pytest
+from src.db.numpy_index import NumpySearchIndex
+
+DAY = 86400
+
+def unit_rows(count, seed=0):
+    rows = np.random.default_rng(seed).normal(size=(count, 8)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+def metadata(i):
+    return {
+        "Issue Type": "Bug" if i % 2 else "Incident",
+        "Status": "Done",
+        "Created": 1700000000 + i * DAY if i % 3 else "",
+        "content_hash": f"hash-{i}"
+    }
+
+@pytest.fixture
+def index(tmp_path):
+    index = NumpySearchIndex(str(tmp_path / "index"), 8)
+    yield index
+    index.close()
+
+def fill(index, count):
+    vectors = unit_rows(count)
+    ids = [f"SUP-{i}" for i in range(count)]
+    index.upsert(ids, vectors, [metadata(i) for i in range(count)])
+    return ids, vectors
+
+def test_top_k_matches_brute_force_cosine(index):
+    ids, vectors = fill(index, 50)
+    query = unit_rows(1, seed=1)[0]
+
+    results = index.search(query, limit=5)
+
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert [record_id for record_id, _ in results] == [ids[i] for i in expected]
+    np.testing.assert_allclose([score for _, score in results], (vectors @ query)[expected], rtol=1e-5)
+
+def test_equality_filters_mask_rows(index):
+    ids, vectors = fill(index, 20)
+
+    results = index.search(vectors[3], {"issue_type": "Bug"}, limit=20)
+
+    assert sorted(record_id for record_id, _ in results) == sorted(ids[1::2])
+    assert results[0][0] == "SUP-3"
+    assert index.search(vectors[3], {"issue_type": "Task"}) == []
+    assert len(index.search(vectors[3], {"issue_type": "Bug", "status": "Done"}, limit=20)) == 10
+
+def test_date_ranges_exclude_rows_without_a_date(index):
+    _, vectors = fill(index, 12)
+
+    results = index.search(vectors[0], {"created_after": 1700000000 + 4 * DAY, "created_before": 1700000000 + 10 * DAY}, limit=12)
+
+    # Rows 6 and 9 have no created date
+    assert sorted(record_id for record_id, _ in results) == ["SUP-4", "SUP-5", "SUP-7", "SUP-8"]
+
+def test_index_grows_past_its_initial_capacity(index):
+    ids, vectors = fill(index, 10)
+    assert index.capacity == 1024
+    more = unit_rows(2000, seed=2)
+    index.upsert([f"NEW-{i}" for i in range(2000)], more, [{} for _ in range(2000)])
+
+    assert (index.count, index.capacity) == (2010, 2048)
+    assert index.search(vectors[4], limit=1)[0][0] == ids[4]
+    assert index.search(more[1500], limit=1)[0][0] == "NEW-1500"
+
+def test_an_id_written_twice_is_returned_once(index):
+    vectors = unit_rows(3)
+    index.upsert(["SUP-1", "SUP-2"], vectors[:2], [{}, {}])
+    index.upsert(["SUP-1"], vectors[2:], [{"Issue Type": "Bug"}])
+    index.upsert(["SUP-3", "SUP-3"], vectors[:2], [{}, {}])
+
+    results = index.search(vectors[2], limit=10)
+
+    assert sorted(record_id for record_id, _ in results) == ["SUP-1", "SUP-2", "SUP-3"]
+    assert results[0] == ("SUP-1", pytest.approx(1.0))
+    assert index.search(vectors[2], {"issue_type": "Bug"}, limit=10)[0][0] == "SUP-1"
+
+def test_index_is_persisted_and_reopened(index):
+    ids, vectors = fill(index, 30)
+    index.flush()
+
+    reopened = NumpySearchIndex(index.directory, 8)
+    assert reopened._load()
+
+    assert reopened.ids == ids
+    assert reopened.search(vectors[7], {"issue_type": "Bug"}, limit=3) == index.search(vectors[7], {"issue_type": "Bug"}, limit=3)
+    reopened.close()
+
+def test_sync_rebuilds_after_records_change_behind_its_back(vector_store, tmp_path):
+    vectors = unit_rows(3)
+    asyncio.run(vector_store.add_records([
+        {"id": f"SUP-{i}", "title": f"Ticket {i}", "description": "", "embedding": vectors[i]} for i in range(3)
+    ]))
+    index = NumpySearchIndex(str(tmp_path / "index"), 8)
+    index.sync(vector_store.collection)
+    index.close()
+
+    vector_store.collection.delete(ids=["SUP-0"])
+    asyncio.run(vector_store.add_records([{"id": "SUP-9", "title": "Ticket 9", "description": "", "embedding": vectors[0]}]))
+    index = NumpySearchIndex(str(tmp_path / "index"), 8)
+    index.sync(vector_store.collection)
+
+    assert sorted(index.ids) == ["SUP-1", "SUP-2", "SUP-9"]
+    assert index.search(vectors[0], limit=1)[0][0] == "SUP-9"
+    index.close()
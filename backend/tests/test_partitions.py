@@ -0,0 +1,97 @@
+import chromadb
+import numpy as np
+import pytest
+from src.db.partitions import PartitionedCollection, partition_name, route_where
+
+@pytest.mark.parametrize("where, expected", [
+    (None, (None, None)),
+    ({"Affected System": "Billing"}, ("Billing", None)),
+    ({"Affected System": {"$eq": "Billing"}}, ("Billing", None)),
+    ({"Affected System": {"$ne": "Billing"}}, (None, {"Affected System": {"$ne": "Billing"}})),
+    ({"Status": {"$eq": "Done"}}, (None, {"Status": {"$eq": "Done"}})),
+    (
+        {"$and": [{"Affected System": {"$eq": "Billing"}}, {"Status": {"$eq": "Done"}}]},
+        ("Billing", {"Status": {"$eq": "Done"}})
+    ),
+    (
+        {"$and": [{"Status": {"$eq": "Done"}}, {"Affected System": "Billing"}, {"Created": {"$gt": 0}}]},
+        ("Billing", {"$and": [{"Status": {"$eq": "Done"}}, {"Created": {"$gt": 0}}]})
+    ),
+    (
+        {"$or": [{"Affected System": "Billing"}, {"Affected System": "Printing"}]},
+        (None, {"$or": [{"Affected System": "Billing"}, {"Affected System": "Printing"}]})
+    )
+])
+def test_route_where(where, expected):
+    assert route_where(where) == expected
+
+def test_partition_names_keep_similar_systems_apart():
+    assert partition_name("tickets", "Billing / EU") != partition_name("tickets", "Billing EU")
+    assert partition_name("tickets", "").startswith("tickets__unassigned_")
+
+def unit(*values):
+    vector = np.array(values + (0.0,) * (4 - len(values)), dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+@pytest.fixture
+def partitioned(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path), settings=chromadb.Settings(anonymized_telemetry=False))
+    collection = PartitionedCollection(client, "tickets", {"hnsw:space": "cosine"}, embedding_function=None)
+    collection.upsert(
+        ids=["B-1", "B-2", "P-1", "P-2", "N-1"],
+        embeddings=[unit(1, 0.1), unit(1, 0.5), unit(1, 0.2), unit(0, 1), unit(1, 0.3)],
+        metadatas=[
+            {"Affected System": "Billing", "Status": "Done"},
+            {"Affected System": "Billing", "Status": "Open"},
+            {"Affected System": "Printing", "Status": "Done"},
+            {"Affected System": "Printing", "Status": "Open"},
+            {"Affected System": "Network", "Status": "Done"}
+        ],
+        documents=["billing 1", "billing 2", "printing 1", "printing 2", "network 1"]
+    )
+    yield collection
+    collection.close()
+
+def test_writes_are_routed_by_affected_system(partitioned):
+    assert partitioned.get_partition_counts() == {"Billing": 2, "Printing": 2, "Network": 1}
+    assert partitioned.count() == 5
+
+def test_unfiltered_query_merges_partitions_by_distance(partitioned):
+    result = partitioned.query(query_embeddings=[unit(1, 0), unit(0, 1)], n_results=3)
+
+    assert result["ids"] == [["B-1", "P-1", "N-1"], ["P-2", "B-2", "N-1"]]
+    for row in range(2):
+        assert result["distances"][row] == sorted(result["distances"][row])
+    # Documents and metadata are read back for the merged hits, in the same order
+    assert result["documents"][0] == ["billing 1", "printing 1", "network 1"]
+    assert [metadata["Affected System"] for metadata in result["metadatas"][1]] == ["Printing", "Billing", "Network"]
+
+def test_filtered_query_searches_one_partition(partitioned):
+    where = {"$and": [{"Affected System": {"$eq": "Billing"}}, {"Status": {"$eq": "Open"}}]}
+
+    result = partitioned.query(query_embeddings=[unit(1, 0)], n_results=3, where=where)
+
+    assert result["ids"] == [["B-2"]]
+
+def test_query_for_an_unknown_system_is_empty(partitioned):
+    result = partitioned.query(query_embeddings=[unit(1, 0)], n_results=3, where={"Affected System": "Storage"})
+
+    assert result["ids"] == [[]]
+    assert result["documents"] == [[]]
+
+def test_changing_the_system_moves_the_record(partitioned):
+    partitioned.upsert(
+        ids=["N-1"],
+        embeddings=[unit(1, 0.3)],
+        metadatas=[{"Affected System": "Billing", "Status": "Done"}],
+        documents=["network 1"]
+    )
+
+    assert partitioned.get_partition_counts() == {"Billing": 3, "Printing": 2, "Network": 0}
+
+def test_get_pages_across_partitions(partitioned):
+    ids = []
+    for offset in range(0, 5, 2):
+        ids.extend(partitioned.get(limit=2, offset=offset, include=[])["ids"])
+
+    assert sorted(ids) == ["B-1", "B-2", "N-1", "P-1", "P-2"]
@@ -0,0 +1,75 @@
+import asyncio
+import numpy as np
+import pytest
+from src.services.query_batcher import EmbeddingCoalescer
+from tests.test_embedding_service import AsyncBase64RejectingEmbeddings, make_service
+
+class RecordingEmbeddings:
+    """Stands in for EmbeddingService; rejects any batch containing "bad" """
+    def __init__(self):
+        self.calls = []
+
+    async def batch_generate_embeddings(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if "bad" in texts:
+            raise ValueError("Input rejected")
+        return np.array([[float(len(text))] * 8 for text in texts], dtype=np.float32)
+
+async def embed_all(coalescer, texts, delay=0.0):
+    async def embed(text, i):
+        await asyncio.sleep(delay * i)
+        return await coalescer.embed(text)
+    return await asyncio.gather(*(embed(text, i) for i, text in enumerate(texts)), return_exceptions=True)
+
+def test_concurrent_queries_share_one_call():
+    embeddings = RecordingEmbeddings()
+    coalescer = EmbeddingCoalescer(embeddings, window_ms=20, max_batch=32)
+
+    vectors = asyncio.run(embed_all(coalescer, ["vpn drops", "vpn drops", "printer offline"]))
+
+    assert embeddings.calls == [["vpn drops", "vpn drops", "printer offline"]]
+    assert [vector[0] for vector in vectors] == [9.0, 9.0, 15.0]
+    assert coalescer.get_stats() == {"queries": 3, "batches": 1, "largest_batch": 3, "average_batch": 3.0}
+
+def test_queries_a_little_apart_share_the_window():
+    embeddings = RecordingEmbeddings()
+    coalescer = EmbeddingCoalescer(embeddings, window_ms=50, max_batch=32)
+
+    asyncio.run(embed_all(coalescer, ["vpn drops", "printer offline", "disk full"], delay=0.005))
+
+    assert len(embeddings.calls) == 1
+
+def test_a_full_batch_is_sent_without_waiting():
+    embeddings = RecordingEmbeddings()
+    coalescer = EmbeddingCoalescer(embeddings, window_ms=10000, max_batch=2)
+
+    asyncio.run(asyncio.wait_for(embed_all(coalescer, ["a", "b", "c", "d"]), timeout=5))
+
+    assert embeddings.calls == [["a", "b"], ["c", "d"]]
+
+def test_an_error_in_one_query_does_not_fail_the_others():
+    embeddings = RecordingEmbeddings()
+    coalescer = EmbeddingCoalescer(embeddings, window_ms=20, max_batch=32)
+
+    results = asyncio.run(embed_all(coalescer, ["vpn drops", "bad", "disk full"]))
+
+    assert isinstance(results[1], ValueError)
+    assert [results[0][0], results[2][0]] == [9.0, 9.0]
+    assert embeddings.calls[0] == ["vpn drops", "bad", "disk full"]
+
+def test_a_failed_single_query_raises():
+    coalescer = EmbeddingCoalescer(RecordingEmbeddings(), window_ms=5, max_batch=32)
+
+    with pytest.raises(ValueError):
+        asyncio.run(coalescer.embed("bad"))
+
+def test_identical_queries_are_requested_once():
+    embeddings = AsyncBase64RejectingEmbeddings()
+    coalescer = EmbeddingCoalescer(make_service(embeddings), window_ms=20, max_batch=32)
+
+    first, second = asyncio.run(embed_all(coalescer, ["vpn drops", "vpn drops"]))
+
+    requests = [call for call in embeddings.calls if call["encoding_format"] == "float"]
+    assert [call["input"] for call in requests] == [["vpn drops"]]
+    np.testing.assert_array_equal(first, second)
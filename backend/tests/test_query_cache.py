@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from src.services import query_cache
+from src.services.admin import AdminService
+from src.services.query_cache import QueryEmbeddingCache, get_query_embedding_cache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+def vector(i):
+    return np.eye(8, dtype=np.float32)[i]
+
+def test_hit_ignores_case_punctuation_and_spacing():
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put("VPN drops!", vector(0))
+
+    np.testing.assert_array_equal(cache.get("  vpn   drops "), vector(0))
+    assert cache.get("vpn drops daily") is None
+    assert (cache.stats["hits"], cache.stats["misses"]) == (1, 1)
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put("vpn drops", vector(0))
+
+    clock[0] += 60
+    assert cache.get("vpn drops") is not None
+    clock[0] += 1
+    assert cache.get("vpn drops") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["entries"]) == (1, 1, 1, 0)
+
+def test_least_recently_used_entry_is_evicted_at_capacity():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    cache.put("vpn drops", vector(0))
+    cache.put("printer offline", vector(1))
+    # Reading an entry makes it the most recently used
+    cache.get("vpn drops")
+
+    cache.put("disk full", vector(2))
+
+    assert cache.get("printer offline") is None
+    assert cache.get("vpn drops") is not None
+    assert cache.get("disk full") is not None
+    assert (cache.get_stats()["evictions"], cache.get_stats()["entries"]) == (1, 2)
+
+def test_admin_stats_report_the_search_cache_counters(vector_store, monkeypatch):
+    monkeypatch.setattr(query_cache, "_query_cache", None)
+    cache = get_query_embedding_cache()
+    cache.put("vpn drops", vector(0))
+    for query in ["vpn drops", "VPN drops", "printer offline"]:
+        cache.get(query)
+
+    reported = AdminService(vector_store=vector_store).get_stats()["query_cache"]
+
+    assert reported == cache.get_stats()
+    assert (reported["hits"], reported["misses"], reported["hit_rate"]) == (2, 1, 0.667)
@@ -0,0 +1,114 @@
+import asyncio
+import httpx
+import openai
+import pytest
+from src.services.rate_limiter import RateLimiter, TokenBucket
+
+def make_limiter(**overrides) -> RateLimiter:
+    options = {
+        "name": "test",
+        "requests_per_minute": 6000,
+        "tokens_per_minute": 1000000,
+        "max_retries": 3,
+        "base_delay": 0.01,
+        "max_delay": 0.02
+    }
+    options.update(overrides)
+    return RateLimiter(**options)
+
+def throttled(headers=None) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://example.invalid/embeddings")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Too Many Requests", response=response, body=None)
+
+class Flaky:
+    """Raises the given errors in turn, then returns "ok\""""
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr("src.services.rate_limiter.time.sleep", recorded.append)
+    return recorded
+
+def test_retry_after_header_sets_the_delay(sleeps):
+    limiter = make_limiter()
+    fn = Flaky(throttled({"retry-after": "7"}))
+
+    assert limiter.call(fn) == "ok"
+
+    assert fn.calls == 2
+    assert sleeps[0] == 7.0
+    stats = limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+    assert stats["failures"] == 0
+
+def test_retry_after_ms_takes_precedence():
+    error = throttled({"retry-after-ms": "1500", "retry-after": "9"})
+    assert RateLimiter._get_retry_after(error) == 1.5
+
+def test_unparseable_retry_after_falls_back_to_backoff(sleeps):
+    limiter = make_limiter()
+
+    assert limiter.call(Flaky(throttled({"retry-after": "soon"}))) == "ok"
+
+    assert 0.005 <= sleeps[0] <= 0.01
+
+def test_retry_after_holds_back_other_callers(sleeps):
+    limiter = make_limiter()
+    limiter.call(Flaky(throttled({"retry-after": "30"})))
+
+    # The next call of any caller waits out the rest of the server's hint
+    assert 29.0 < limiter._reserve(0) <= 30.0
+
+def test_gives_up_after_max_retries(sleeps):
+    limiter = make_limiter(max_retries=2)
+    fn = Flaky(throttled(), throttled(), throttled())
+
+    with pytest.raises(openai.RateLimitError):
+        limiter.call(fn)
+
+    assert fn.calls == 3
+    assert limiter.get_stats()["failures"] == 1
+
+def test_other_errors_are_not_retried(sleeps):
+    limiter = make_limiter()
+    fn = Flaky(ValueError("bad input"))
+
+    with pytest.raises(ValueError):
+        limiter.call(fn)
+
+    assert fn.calls == 1
+    assert sleeps == []
+
+def test_async_call_honors_retry_after(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("src.services.rate_limiter.asyncio.sleep", fake_sleep)
+    limiter = make_limiter()
+    fn = Flaky(throttled({"retry-after": "2"}))
+
+    async def call():
+        return fn()
+
+    assert asyncio.run(limiter.acall(call)) == "ok"
+    assert delays[0] == 2.0
+
+def test_token_bucket_reports_wait_when_in_debt():
+    bucket = TokenBucket(60)
+
+    assert bucket.reserve(60) == 0.0
+    # One token per second; the next 30 are half a minute away
+    assert 29.9 < bucket.reserve(30) <= 30.0
@@ -0,0 +1,48 @@
+import asyncio
+import numpy as np
+import pytest
+
+def make_records(ids, issue_type="Bug"):
+    return [
+        {"id": record_id, "title": f"Ticket {record_id}", "description": "VPN drops", "issue_type": issue_type, "embedding": np.eye(8, dtype=np.float32)[i % 8]}
+        for i, record_id in enumerate(ids)
+    ]
+
+@pytest.fixture
+def store(vector_store):
+    asyncio.run(vector_store.add_records(make_records([f"SUP-{i:02d}" for i in range(10)])))
+    asyncio.run(vector_store.add_records(make_records([f"INC-{i:02d}" for i in range(5)], issue_type="Incident")))
+    return vector_store
+
+def record_ids(records):
+    return [record["id"] for record in records]
+
+def test_limit_and_offset_page_through_every_record(store):
+    everything = record_ids(store.iter_records(limit=None, page_size=4))
+
+    pages = [record_ids(store.iter_records(offset=offset, limit=6, page_size=4)) for offset in (0, 6, 12)]
+
+    assert len(everything) == 15
+    assert [len(page) for page in pages] == [6, 6, 3]
+    assert sum(pages, []) == everything
+
+def test_filter_and_fields(store):
+    records = list(store.iter_records({"issue_type": "Incident"}, fields=["metadata", "embedding"], page_size=2))
+
+    assert sorted(record_ids(records)) == [f"INC-{i:02d}" for i in range(5)]
+    assert set(records[0]) == {"id", "metadata", "embedding"}
+    assert {record["metadata"]["Issue Type"] for record in records} == {"Incident"}
+    assert len(records[0]["embedding"]) == 8
+    assert record_ids(store.iter_records({"issue_type": "Incident"}, fields=[], offset=3)) == record_ids(records)[3:]
+
+def test_unknown_fields_are_rejected_before_reading(store):
+    with pytest.raises(ValueError):
+        store.iter_records(fields=["document", "vector"])
+
+def test_a_stream_keeps_reading_the_version_it_started_on(store):
+    records = store.iter_records(limit=None, page_size=4)
+    # An empty version is swapped in, as by a clear, before the first page is read
+    store.activate_version(store.create_version(), grace_seconds=60)
+
+    assert len(list(records)) == 15
+    assert record_ids(store.iter_records()) == []
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+import numpy as np
+import pytest
+from src.core.config import settings
+from src.db.vector_store import VectorStore
+
+@pytest.fixture(params=["chroma", "numpy"])
+def store(request, tmp_path, monkeypatch):
+    """A VectorStore with twelve tickets, on each search backend"""
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", request.param)
+    store = VectorStore()
+    vectors = np.random.default_rng(0).normal(size=(12, 8)).astype(np.float32)
+    asyncio.run(store.add_records([
+        {
+            "id": f"SUP-{i}",
+            "title": f"Ticket {i}",
+            "description": "VPN drops",
+            "issue_type": ["Bug", "Incident", "Task"][i % 3],
+            "status": "Done" if i < 6 else "Open",
+            "created_at": datetime(2024, 1, 1 + i),
+            "embedding": vectors[i]
+        }
+        for i in range(12)
+    ]))
+    yield store
+    store.close()
+
+def test_search_batch_matches_single_searches(store):
+    queries = np.random.default_rng(1).normal(size=(5, 8)).astype(np.float32)
+    filters = [
+        None,
+        {"issue_type": "Bug"},
+        {"issue_type": "Bug"},
+        {"status": "Open", "created_after": datetime(2024, 1, 9)},
+        {"issue_type": "Epic"}
+    ]
+
+    batched = asyncio.run(store.search_batch(queries, filters, limit=3))
+
+    for query, criteria, results in zip(queries, filters, batched):
+        single = asyncio.run(store.search(query, criteria, limit=3))
+        assert [ticket["id"] for ticket in results] == [ticket["id"] for ticket in single]
+    assert len(batched[0]) == 3
+    assert {ticket["issue_type"] for ticket in batched[1]} == {"Bug"}
+    assert {ticket["id"] for ticket in batched[3]} <= {"SUP-8", "SUP-9", "SUP-10", "SUP-11"}
+    assert batched[4] == []
+
+def test_search_batch_without_filters(store):
+    queries = np.random.default_rng(2).normal(size=(2, 8)).astype(np.float32)
+
+    batched = asyncio.run(store.search_batch(queries, limit=4))
+
+    assert [[ticket["id"] for ticket in results] for results in batched] == [
+        [ticket["id"] for ticket in asyncio.run(store.search(query, limit=4))] for query in queries
+    ]
@@ -0,0 +1,50 @@
+import asyncio
+import numpy as np
+import pytest
+from src.db import snapshot
+from src.db.snapshot import export_snapshot, import_snapshot
+
+def make_records(ids):
+    return [
+        {"id": record_id, "title": f"Ticket {record_id}", "description": "VPN drops", "issue_type": "Bug" if i % 2 else "Incident", "embedding": np.eye(8, dtype=np.float32)[i % 8]}
+        for i, record_id in enumerate(ids)
+    ]
+
+def stored_ids(collection):
+    return sorted(collection.get(include=[])["ids"])
+
+def test_replace_import_round_trip(vector_store, tmp_path):
+    asyncio.run(vector_store.add_records(make_records(["SUP-0", "SUP-1", "SUP-2"])))
+    path = str(tmp_path / "snapshot")
+    export_snapshot(vector_store, path)
+    asyncio.run(vector_store.add_records(make_records(["SUP-9"])))
+    before = vector_store.collection
+
+    result = asyncio.run(import_snapshot(vector_store, path, replace=True))
+
+    assert (result["records"], result["failed_records"], result["replaced"]) == (3, 0, True)
+    assert vector_store.collection is not before
+    info = vector_store.get_version_info()
+    assert (info["active"], info["building"]) == ("support_tickets_v1", None)
+    assert stored_ids(vector_store.collection) == ["SUP-0", "SUP-1", "SUP-2"]
+    results = asyncio.run(vector_store.search(np.eye(8, dtype=np.float32)[1], {"issue_type": "Bug"}, 3))
+    assert [ticket["id"] for ticket in results] == ["SUP-1"]
+    results = asyncio.run(vector_store.search(np.eye(8, dtype=np.float32)[2], limit=1))
+    assert [ticket["id"] for ticket in results] == ["SUP-2"]
+
+def test_failed_replace_import_keeps_the_active_version(vector_store, tmp_path, monkeypatch):
+    asyncio.run(vector_store.add_records(make_records(["SUP-0", "SUP-1"])))
+    path = str(tmp_path / "snapshot")
+    export_snapshot(vector_store, path)
+    active = vector_store.collection
+
+    def unreadable(*args):
+        raise OSError("Column file truncated")
+    monkeypatch.setattr(snapshot, "_read_rows", unreadable)
+
+    with pytest.raises(OSError):
+        asyncio.run(import_snapshot(vector_store, path, replace=True))
+
+    assert vector_store.collection is active
+    assert vector_store.get_version_info()["building"] is None
+    assert stored_ids(vector_store.collection) == ["SUP-0", "SUP-1"]
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from src.services.admin import AdminService
+
+def make_records(ids):
+    return [
+        {"id": record_id, "title": f"Ticket {record_id}", "description": "VPN drops", "embedding": np.eye(8, dtype=np.float32)[i % 8]}
+        for i, record_id in enumerate(ids)
+    ]
+
+def stored_ids(collection):
+    return sorted(collection.get(include=[])["ids"])
+
+def test_writes_go_to_both_versions_while_one_is_built(vector_store):
+    asyncio.run(vector_store.add_records(make_records(["SUP-1"])))
+    staging = vector_store.create_version()
+
+    asyncio.run(vector_store.add_records(make_records(["SUP-2"])))
+
+    assert staging.name == "support_tickets_v1"
+    assert vector_store.get_version_info()["building"] == staging.name
+    assert stored_ids(vector_store.collection) == ["SUP-1", "SUP-2"]
+    assert stored_ids(staging) == ["SUP-2"]
+
+def test_only_one_version_is_built_at_a_time(vector_store):
+    vector_store.create_version()
+
+    with pytest.raises(ValueError):
+        vector_store.create_version()
+
+def test_activate_swaps_the_version_in(vector_store):
+    asyncio.run(vector_store.add_records(make_records(["SUP-1", "SUP-2"])))
+    staging = vector_store.create_version()
+    assert vector_store.copy_to_version(staging) == 2
+
+    vector_store.activate_version(staging, grace_seconds=60)
+
+    assert vector_store.collection is staging
+    assert vector_store.get_stats()["total_records"] == 2
+    info = vector_store.get_version_info()
+    assert (info["active"], info["version"], info["building"]) == ("support_tickets_v1", 1, None)
+    with open(vector_store.versions_file) as f:
+        assert json.load(f)["active"] == "support_tickets_v1"
+    # The next version is numbered after the active one
+    assert vector_store.create_version().name == "support_tickets_v2"
+
+def test_only_the_version_being_built_can_be_activated(vector_store):
+    staging = vector_store.create_version()
+    vector_store.discard_version()
+
+    with pytest.raises(ValueError):
+        vector_store.activate_version(staging)
+    assert vector_store.get_version_info()["active"] == "support_tickets"
+
+def test_clear_swaps_in_an_empty_version(vector_store):
+    asyncio.run(vector_store.add_records(make_records(["SUP-1"])))
+    old = vector_store.collection
+
+    assert vector_store.clear_all_data()
+
+    assert vector_store.collection is not old
+    assert vector_store.collection.count() == 0
+    assert vector_store.get_stats()["total_records"] == 0
+
+def test_clear_data_goes_through_a_reindex(vector_store):
+    asyncio.run(vector_store.add_records(make_records(["SUP-1"])))
+    admin_service = AdminService(vector_store=vector_store)
+
+    status = asyncio.run(admin_service.clear_data())
+
+    assert (status["state"], status["source"], status["records"]) == ("completed", "empty", 0)
+    assert status["versions"]["active"] == "support_tickets_v1"
+    assert vector_store.collection.count() == 0
+
+def test_clear_data_is_refused_while_a_version_is_built(vector_store):
+    asyncio.run(vector_store.add_records(make_records(["SUP-1"])))
+    vector_store.create_version()
+    admin_service = AdminService(vector_store=vector_store)
+
+    # Reported as 409 by /admin/clear-embeddings
+    with pytest.raises(ValueError):
+        asyncio.run(admin_service.clear_data())
+    assert vector_store.collection.count() == 1
+
+@pytest.fixture
+def other_worker(vector_store):
+    """A second VectorStore on the same store, reading collections.json like a worker sharing a server"""
+    from src.db.vector_store import VectorStore
+    store = VectorStore()
+    store.remote = True
+    yield store
+    store.close()
+
+def test_other_workers_write_to_the_version_being_built(vector_store, other_worker):
+    staging = vector_store.create_version()
+    with open(vector_store.versions_file) as f:
+        assert json.load(f)["building"] == staging.name
+
+    asyncio.run(other_worker.add_records(make_records(["SUP-1"])))
+    assert stored_ids(staging) == ["SUP-1"]
+    # Only the worker building a version activates or drops it, and one is built at a time
+    with pytest.raises(ValueError):
+        other_worker.discard_version()
+    with pytest.raises(ValueError):
+        other_worker.create_version()
+
+    vector_store.activate_version(staging, grace_seconds=60)
+    # Written before the other worker refreshed, still reaches the new active version
+    asyncio.run(other_worker.add_records(make_records(["SUP-2"])))
+    assert stored_ids(staging) == ["SUP-1", "SUP-2"]
+
+def test_refresh_reads_changed_ids_without_reopening(vector_store, other_worker):
+    opened = other_worker.collection
+    asyncio.run(vector_store.add_records([{**make_records(["SUP-1"])[0], "issue_key": "KEY-1"}]))
+
+    other_worker.refresh(["SUP-1"])
+
+    assert other_worker.collection is opened
+    assert [ticket["id"] for ticket in asyncio.run(other_worker.lexical_search("KEY-1"))] == ["SUP-1"]
+    assert other_worker.get_stats()["total_records"] == 1
+
+def test_refresh_adopts_a_version_swapped_in_by_another_worker(vector_store, other_worker):
+    staging = vector_store.create_version()
+    asyncio.run(other_worker.add_records(make_records(["SUP-1"])))
+    vector_store.activate_version(staging, grace_seconds=60)
+
+    other_worker.refresh()
+
+    assert other_worker.collection.name == staging.name
+    assert other_worker.get_version_info()["building"] is None
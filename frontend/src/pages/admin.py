@@ -85,6 +85,48 @@ def show_data_upload():
     except Exception as e:
         st.error(f"Error in data upload: {str(e)}")
 
+def start_reindex(file=None, empty: bool = False):
+    """Start a reindex in the backend and report whether it started"""
+    try:
+        admin_service = AdminService()
+        result = admin_service.start_reindex(file=file, empty=empty)
+        if result.get("success"):
+            st.success(f"Building {result.get('collection')} from {result.get('source')}")
+        else:
+            st.error(f"Error starting reindex: {result.get('error')}")
+    except Exception as e:
+        st.error(f"Error starting reindex: {str(e)}")
+
+def show_reindex_status():
+    """Show the state of the last reindex and the active collection version"""
+    try:
+        admin_service = AdminService()
+        status = admin_service.get_reindex_status()
+        versions = status.get("versions", {})
+
+        st.subheader("Reindex Status")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Reindex", status.get("state", "unknown").capitalize())
+
+        with col2:
+            st.metric("Active Version", versions.get("active", "Unknown"))
+
+        with col3:
+            st.metric("Building", versions.get("building") or "None")
+
+        if status.get("state") == "completed":
+            st.info(f"Loaded {status.get('records', 0)} records from {status.get('source')} at {status.get('finished_at')}")
+        elif status.get("state") == "failed":
+            st.error(f"Reindex from {status.get('source')} failed: {status.get('error')}")
+
+        if st.button("Refresh Status", key="refresh_reindex_status"):
+            st.rerun()
+
+    except Exception as e:
+        st.error(f"Error fetching reindex status: {str(e)}")
+
 def show_user_management():
     """Show user management section"""
     st.subheader("User Management")
@@ -127,20 +169,30 @@ def show_admin():
                             st.error(f"Error processing file: {str(e)}")
         
         with col2:
-            # Clear Embeddings
-            st.subheader("Clear Data")
+            # Replace Data: builds a new collection version and swaps it in,
+            # so searches keep working until the new data is ready
+            st.subheader("Replace Data")
+            replacement_file = st.file_uploader("Replace all data with a CSV file", type="csv", key="reindex_uploader")
+            if replacement_file is not None:
+                if st.button("Replace With CSV", type="primary"):
+                    start_reindex(file=replacement_file)
+            if st.button("Rebuild From Stored Vectors", type="secondary"):
+                start_reindex()
             if st.button("Clear All Embeddings", type="secondary"):
-                if st.warning("This will delete all embeddings. Are you sure?"):
-                    try:
-                        admin_service = AdminService()
-                        response = admin_service.clear_embeddings()
-                        if response.get("success"):
-                            st.success("Successfully cleared all embeddings")
-                            st.rerun()
-                        else:
-                            st.error(f"Failed to clear embeddings: {response.get('error')}")
-                    except Exception as e:
-                        st.error(f"Error clearing embeddings: {str(e)}")
+                st.session_state.confirm_clear = True
+            if st.session_state.get("confirm_clear"):
+                st.warning("This will delete all embeddings. Are you sure?")
+                confirm_col, cancel_col = st.columns(2)
+                with confirm_col:
+                    if st.button("Yes, Clear Everything", type="primary"):
+                        st.session_state.confirm_clear = False
+                        start_reindex(empty=True)
+                with cancel_col:
+                    if st.button("Cancel"):
+                        st.session_state.confirm_clear = False
+                        st.rerun()
+
+        show_reindex_status()
         
     with tab2:
         show_system_stats()
@@ -103,25 +103,56 @@ class AdminService:
             }
 
     def clear_embeddings(self) -> Dict:
-        """Clear all embeddings from the vector store"""
+        """Clear all embeddings by swapping in an empty collection version"""
+        return self.start_reindex(empty=True)
+
+    def start_reindex(self, file=None, empty: bool = False) -> Dict:
+        """
+        Rebuild the vector store into a new collection version in the background:
+        from a CSV file, empty, or from the stored vectors. Searches keep using
+        the current data until the new version is swapped in.
+        """
         try:
             if not self.api_client:
                 raise ValueError("API client not initialized")
-                
-            response = self.api_client.post("/admin/clear-embeddings")
+
+            if file is not None:
+                # Read CSV file to verify it's valid
+                df = pd.read_csv(file)
+                if df.empty:
+                    return {
+                        "success": False,
+                        "error": "CSV file is empty"
+                    }
+                file.seek(0)
+
+            response = self.api_client.start_reindex(file, empty=empty)
             if not response:
                 return {
                     "success": False,
-                    "error": "Failed to clear embeddings"
+                    "error": "Failed to start reindex"
                 }
-                
+
             return {
-                "success": True
+                "success": True,
+                **response
             }
-            
+
         except Exception as e:
-            logging.error(f"Error clearing embeddings: {e}")
+            logging.error(f"Error starting reindex: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
+
+    def get_reindex_status(self) -> Dict:
+        """Get the state of the last reindex and the active collection version"""
+        try:
+            if not self.api_client:
+                raise ValueError("API client not initialized")
+
+            return self.api_client.get_reindex_status() or {"state": "unknown"}
+
+        except Exception as e:
+            logging.error(f"Error getting reindex status: {e}")
+            return {"state": "unknown"}
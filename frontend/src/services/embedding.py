@@ -1,21 +1,51 @@
 from openai import AzureOpenAI
+from dotenv import load_dotenv
 import numpy as np
+import hashlib
 import os
 
+load_dotenv()
+
+class OfflineEmbeddingClient:
+    """
+    Deterministic local stand-in for the embeddings API, selected with
+    LLM_PROVIDER=offline. Vectors are seeded from a hash of the text.
+    """
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+
+    def embed(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
 class EmbeddingService:
     def __init__(self):
-        self.client = AzureOpenAI(
-            api_key="cc1f5e10eee54bd7b7a35d4bc8d412ee",
-            api_version="2023-05-15",
-            azure_endpoint="https://davinci-dev-openai-api.corp.hpicloud.net/salesly"
-        )
         self.model = "text-embedding-ada-002"
+        self.provider = os.getenv("LLM_PROVIDER", "azure")
+        if self.provider == "offline":
+            self.client = OfflineEmbeddingClient(int(os.getenv("EMBEDDING_DIMENSION", "1536")))
+        else:
+            # Same AZURE_OPENAI_* settings as the backend
+            missing = [
+                name for name in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_VERSION")
+                if not os.getenv(name)
+            ]
+            if missing:
+                raise ValueError(f"Missing settings for the azure LLM provider: {', '.join(missing)}")
+            self.client = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            )
 
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embeddings for a single text using Azure OpenAI
         """
         try:
+            if self.provider == "offline":
+                return self.client.embed(text)
             response = self.client.embeddings.create(
                 input=text,
                 model=self.model
@@ -28,6 +58,9 @@ class EmbeddingService:
         """
         Generate embeddings for multiple texts in batches
         """
+        if self.provider == "offline":
+            return [self.client.embed(text) for text in texts]
+
         embeddings = []
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
@@ -223,3 +223,44 @@ class APIClient:
         except Exception as e:
             logging.error(f"Failed to get system stats: {str(e)}")
             return None
+
+    def start_reindex(self, file=None, empty: bool = False) -> Dict:
+        """
+        Rebuild the vector store into a new collection version: from a CSV file,
+        empty, or from the stored vectors. Returns the reindex status.
+        """
+        try:
+            response = requests.post(
+                f"{self.base_url}/admin/reindex",
+                params={"empty": "true"} if empty else None,
+                files={"file": file} if file is not None else None,
+                headers=self._get_multipart_headers()
+            )
+            if response.status_code == 401:
+                logging.error("Unauthorized - token may have expired")
+                self._handle_unauthorized()
+                return None
+            if response.status_code != 200:
+                logging.error(f"Reindex failed with status {response.status_code}: {response.text}")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logging.error(f"Failed to start reindex: {str(e)}")
+            return None
+
+    def get_reindex_status(self) -> Dict:
+        """Get the state of the last reindex and the active collection version"""
+        try:
+            response = requests.get(
+                f"{self.base_url}/admin/reindex",
+                headers=self._get_headers()
+            )
+            if response.status_code == 401:
+                logging.error("Unauthorized - token may have expired")
+                self._handle_unauthorized()
+                return None
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logging.error(f"Failed to get reindex status: {str(e)}")
+            return None